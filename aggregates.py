@@ -0,0 +1,172 @@
+"""Running expense totals maintained incrementally from store events.
+
+``Aggregates`` subscribes to an ``ObservableStore`` and keeps the grand
+total plus per-category, per-day and per-month sums up to date on every
+insert, update and remove. The sums are persisted next to the store so the
+total label is available at startup without scanning the whole ledger.
+
+The file holds the sums for the whole history, so it isn't rewritten on
+every write: like the search index, it is dropped on the first change
+after a save and written again by ``save()`` (the app calls it on pause and
+stop). A missing file means a rebuild at the next start.
+
+All sums are integer cents, so they stay exact however many adds and
+removes they go through.
+"""
+
+import json
+import os
+
+from storage import StoreObserver
+from utils import expense_cents
+
+# Bump when the persisted layout changes (2: integer cents)
+FORMAT = 2
+
+
+def aggregates_path_for(db_path):
+    """Return the aggregates file path that sits next to ``expenses.json``."""
+    return os.path.splitext(db_path)[0] + '.aggregates.json'
+
+
+def _bump(bucket, key, delta):
+    value = bucket.get(key, 0) + delta
+    if value:
+        bucket[key] = value
+    else:
+        bucket.pop(key, None)
+
+
+class Aggregates(StoreObserver):
+    """Grand total and per-category/day/month sums (in cents) for the ledger."""
+
+    def __init__(self, path=None):
+        self.path = path
+        self.reset()
+
+    def reset(self):
+        self.total = 0
+        self.count = 0
+        self.by_category = {}
+        self.by_day = {}
+        self.by_month = {}
+        self.dirty = False
+
+    def _apply(self, doc, sign):
+        amount = sign * expense_cents(doc)
+        self.total += amount
+        self.count += sign
+        _bump(self.by_category, doc.get('category', ''), amount)
+        date = doc.get('date') or ''
+        if date:
+            _bump(self.by_day, date[:10], amount)
+            _bump(self.by_month, date[:7], amount)
+
+    # -- StoreObserver hooks ----------------------------------------------
+
+    def on_insert(self, doc):
+        self._apply(doc, 1)
+
+    def on_update(self, old_doc, new_doc):
+        self._apply(old_doc, -1)
+        self._apply(new_doc, 1)
+
+    def on_remove(self, doc):
+        self._apply(doc, -1)
+
+    def on_clear(self):
+        self.reset()
+        self._changed()
+
+    def on_commit(self):
+        self._changed()
+
+    def _changed(self):
+        if self.dirty:
+            return
+        self.dirty = True
+        # The saved sums no longer match; a crash before the next save()
+        # then means a rebuild instead of a wrong total
+        if self.path:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+    # -- rebuild / verification -------------------------------------------
+
+    def rebuild(self, docs):
+        """Recompute every sum from ``docs`` (a full scan) and persist it."""
+        self.reset()
+        for doc in docs:
+            self._apply(doc, 1)
+        self.dirty = True
+        self.save()
+
+    def verify(self, docs):
+        """Compare the running sums against a full scan of ``docs``.
+
+        Returns a list of the fields that drifted (empty when consistent).
+        """
+        fresh = Aggregates()
+        for doc in docs:
+            fresh._apply(doc, 1)
+        drift = []
+        for field in ('total', 'count', 'by_category', 'by_day', 'by_month'):
+            if getattr(self, field) != getattr(fresh, field):
+                drift.append(field)
+        return drift
+
+    # -- persistence ------------------------------------------------------
+
+    def to_dict(self):
+        return {
+            'format': FORMAT,
+            'total': self.total,
+            'count': self.count,
+            'by_category': self.by_category,
+            'by_day': self.by_day,
+            'by_month': self.by_month,
+        }
+
+    def save(self):
+        """Write the sums if they changed since they were loaded or last saved."""
+        if not self.path or not self.dirty:
+            return False
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as fh:
+            json.dump(self.to_dict(), fh, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+        return True
+
+    def load(self):
+        """Load persisted sums. Returns False when there is nothing usable."""
+        if not self.path or not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path, 'r', encoding='utf-8') as fh:
+                data = json.load(fh)
+            if data.get('format') != FORMAT:
+                raise ValueError('outdated aggregates file')
+            self.total = int(data['total'])
+            self.count = int(data['count'])
+            self.by_category = dict(data['by_category'])
+            self.by_day = dict(data['by_day'])
+            self.by_month = dict(data['by_month'])
+        except (OSError, ValueError, KeyError, TypeError):
+            self.reset()
+            return False
+        return True
+
+    def attach(self, store):
+        """Load persisted sums for ``store`` and subscribe to its mutations.
+
+        The persisted record count is compared with ``len(store)``; on a
+        mismatch (e.g. a crash between the store write and the aggregates
+        write) the sums are rebuilt with a full scan.
+        """
+        if not self.load() or self.count != len(store):
+            self.rebuild(store.all())
+        store.subscribe(self)
+        return self
@@ -0,0 +1,6 @@
+"""Reproducible benchmarks for the app's hot paths.
+
+Run ``python -m benchmarks run`` to time the scenarios in
+``benchmarks.scenarios`` against synthetic ledgers and
+``python -m benchmarks compare`` to diff two result files.
+"""
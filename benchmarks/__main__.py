@@ -0,0 +1,119 @@
+"""Command line entry point: ``python -m benchmarks {run,compare}``.
+
+Examples::
+
+    python -m benchmarks run --output benchmarks/baseline.json
+    python -m benchmarks run --sizes 1000,10000 --scenarios update_list,add_expense
+    python -m benchmarks compare benchmarks/baseline.json bench_current.json
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+os.environ.setdefault('KIVY_NO_CONSOLELOG', '1')
+
+from benchmarks.scenarios import SCENARIOS, make_ledger_dir  # noqa: E402
+
+DEFAULT_SIZES = (1000, 10000, 100000, 1000000)
+DEFAULT_TOLERANCE = 0.25
+
+
+def run(sizes, scenarios, engine):
+    results = {name: {} for name in scenarios}
+    for size in sizes:
+        print(f"Preparing ledger with {size} expenses...", flush=True)
+        data_dir = make_ledger_dir(size, engine)
+        try:
+            for name in scenarios:
+                result = SCENARIOS[name](data_dir, engine)
+                results[name][str(size)] = result
+                shown = result.get('median_ms', result.get('error'))
+                print(f"  {name:<16} {size:>8}: {shown} ms", flush=True)
+        finally:
+            shutil.rmtree(data_dir, ignore_errors=True)
+    return {
+        'meta': {
+            'created': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'engine': engine,
+        },
+        'results': results,
+    }
+
+
+def compare(baseline, current, tolerance=DEFAULT_TOLERANCE):
+    """Return ``(rows, regressions)`` comparing median timings.
+
+    A regression is a scenario/size whose median grew by more than
+    ``tolerance`` (0.25 = 25%) over the baseline.
+    """
+    rows = []
+    regressions = []
+    for name, sizes in sorted(current.get('results', {}).items()):
+        for size, result in sorted(sizes.items(), key=lambda kv: int(kv[0])):
+            base = baseline.get('results', {}).get(name, {}).get(size, {})
+            if 'median_ms' not in base or 'median_ms' not in result:
+                continue
+            ratio = result['median_ms'] / base['median_ms'] if base['median_ms'] else 1.0
+            row = (name, size, base['median_ms'], result['median_ms'], ratio)
+            rows.append(row)
+            if ratio > 1.0 + tolerance:
+                regressions.append(row)
+    return rows, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    run_p = sub.add_parser('run', help='run the benchmark scenarios')
+    run_p.add_argument('--sizes', default=','.join(str(s) for s in DEFAULT_SIZES),
+                       help='comma separated ledger sizes')
+    run_p.add_argument('--scenarios', default=','.join(SCENARIOS),
+                       help='comma separated scenario names')
+    run_p.add_argument('--engine', default='journal', help='storage engine to benchmark')
+    run_p.add_argument('--output', default='bench_results.json', help='result file to write')
+
+    cmp_p = sub.add_parser('compare', help='diff a result file against a baseline')
+    cmp_p.add_argument('baseline')
+    cmp_p.add_argument('current')
+    cmp_p.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                       help='allowed slowdown before failing (0.25 = 25%%)')
+
+    args = parser.parse_args(argv)
+    if args.command == 'run':
+        sizes = [int(s) for s in args.sizes.split(',') if s]
+        scenarios = [s for s in args.scenarios.split(',') if s]
+        unknown = set(scenarios) - set(SCENARIOS)
+        if unknown:
+            parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+        report = run(sizes, scenarios, args.engine)
+        with open(args.output, 'w', encoding='utf-8') as fh:
+            json.dump(report, fh, indent=2)
+        print(f"Wrote {args.output}")
+        return 0
+
+    with open(args.baseline, encoding='utf-8') as fh:
+        baseline = json.load(fh)
+    with open(args.current, encoding='utf-8') as fh:
+        current = json.load(fh)
+    rows, regressions = compare(baseline, current, args.tolerance)
+    for name, size, base, now, ratio in rows:
+        flag = '  REGRESSION' if (name, size, base, now, ratio) in regressions else ''
+        print(f"{name:<16} {size:>8} {base:>12.3f} -> {now:>12.3f} ms  x{ratio:.2f}{flag}")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,36 @@
+"""Deterministic synthetic expense ledgers."""
+
+import datetime
+import random
+
+CATEGORIES = (
+    'Food', 'Transport', 'Rent', 'Utilities', 'Coffee', 'Groceries',
+    'Health', 'Education', 'Clothing', 'Entertainment', 'Gifts', 'Phone',
+)
+NOTES = ('', '', '', 'lunch', 'taxi', 'market', 'monthly', 'with friends', 'refill')
+
+# Fixed anchor so generated dates don't depend on when the benchmark runs
+EPOCH = datetime.datetime(2025, 1, 1, 8, 0)
+
+
+def generate_ledger(size, seed=1234, days=3 * 365):
+    """Yield ``size`` expense documents; the same seed gives the same ledger."""
+    rng = random.Random(seed)
+    for _ in range(size):
+        when = EPOCH - datetime.timedelta(minutes=rng.randrange(days * 24 * 60))
+        yield {
+            'amount_cents': rng.randrange(100, 250001),
+            'category': rng.choice(CATEGORIES),
+            'note': rng.choice(NOTES),
+            'date': when.strftime("%Y-%m-%d %H:%M"),
+        }
+
+
+def fill_store(store, size, seed=1234, batch=50000):
+    """Insert a synthetic ledger of ``size`` expenses into ``store``."""
+    docs = generate_ledger(size, seed)
+    while True:
+        chunk = [doc for _, doc in zip(range(batch), docs)]
+        if not chunk:
+            return
+        store.insert_multiple(chunk)
@@ -0,0 +1,195 @@
+"""Timed scenarios for the hot paths.
+
+The UI scenarios run headless: the app is never built, and
+``get_main_screen`` returns a fake screen whose ``ids`` are plain objects
+(the same technique as ``tests/test_ui_add_flow.py``). Without ``build()``
+there is no executor, so ``run_db`` executes inline and the timings
+include the store work.
+"""
+
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.ledger import fill_store  # noqa: E402
+
+
+def _timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000.0)
+    return {
+        'median_ms': round(statistics.median(samples), 3),
+        'min_ms': round(min(samples), 3),
+        'max_ms': round(max(samples), 3),
+        'runs': repeat,
+    }
+
+
+def make_ledger_dir(size, engine):
+    """Create a temp dir holding a store pre-filled with ``size`` expenses."""
+    from storage import open_store
+    from aggregates import Aggregates, aggregates_path_for
+
+    tmp = tempfile.mkdtemp(prefix='expense-bench-')
+    db_path = os.path.join(tmp, 'expenses.json')
+    store = open_store(db_path, engine=engine)
+    Aggregates(aggregates_path_for(db_path)).attach(store)
+    fill_store(store, size)
+    store.close()
+    return tmp
+
+
+class HeadlessApp:
+    """ExpenseTrackerApp wired to a fake screen and a real store."""
+
+    def __init__(self, data_dir, engine):
+        import main
+        from storage import open_store
+        from aggregates import Aggregates, aggregates_path_for
+        from ledger import ledger_for
+        from search import SearchIndex
+
+        self.main = main
+        db_path = os.path.join(data_dir, 'expenses.json')
+        main.db = open_store(db_path, engine=engine)
+        self.app = main.ExpenseTrackerApp()
+        self.app.data_dir = data_dir
+        self.app.aggregates = Aggregates(aggregates_path_for(db_path)).attach(main.db)
+        self.app.ledger = ledger_for(main.db)
+        self.app.search_index = SearchIndex().attach(main.db)
+        self.app.notify = lambda message: None
+        self.ids = SimpleNamespace(
+            amount=SimpleNamespace(text=''),
+            category=SimpleNamespace(text=''),
+            note=SimpleNamespace(text=''),
+            expense_list=SimpleNamespace(data=[], refresh_from_data=lambda: None),
+            total_label=SimpleNamespace(text=''),
+            select_all_checkbox=SimpleNamespace(active=False),
+            delete_selected_button=SimpleNamespace(disabled=True, opacity=0.0),
+        )
+        screen = SimpleNamespace(ids=self.ids)
+        self.app.get_main_screen = lambda: screen
+
+    def close(self):
+        self.main.db.close()
+
+
+def bench_update_list(data_dir, engine, repeat=3):
+    h = HeadlessApp(data_dir, engine)
+    try:
+        return _timed(h.app.update_list, repeat)
+    finally:
+        h.close()
+
+
+def bench_search(data_dir, engine, repeat=5):
+    """Type a query one keystroke at a time; each keystroke rebuilds the first page."""
+    h = HeadlessApp(data_dir, engine)
+    try:
+        def _type():
+            for n in range(1, len('with fri') + 1):
+                h.app.on_search_text('with fri'[:n])
+            h.app.on_search_text('')
+        result = _timed(_type, repeat)
+        result['keystrokes'] = len('with fri') + 1
+        return result
+    finally:
+        h.close()
+
+
+def bench_add_expense(data_dir, engine, repeat=20):
+    h = HeadlessApp(data_dir, engine)
+    try:
+        h.app.update_list()
+
+        def _add():
+            h.ids.amount.text = '42.50'
+            h.ids.category.text = 'Food'
+            h.ids.note.text = 'benchmark'
+            h.app.add_expense()
+        return _timed(_add, repeat)
+    finally:
+        h.close()
+
+
+def bench_export_database(data_dir, engine, repeat=1):
+    h = HeadlessApp(data_dir, engine)
+    try:
+        return _timed(h.app.export_database, repeat)
+    finally:
+        shutil.rmtree(os.path.join(data_dir, 'exports'), ignore_errors=True)
+        h.close()
+
+
+_COLD_START = r"""
+import os, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {root!r})
+import main
+from kivy.clock import Clock
+app = main.ExpenseTrackerApp()
+app.directory = {data_dir!r}
+app.build()
+first_frame = time.perf_counter()
+app.start_storage()
+while app.startup is not None:
+    if time.perf_counter() - start > 300:
+        sys.exit("list was never populated")
+    app.executor.wait()
+    Clock.tick()
+ready = time.perf_counter()
+print((first_frame - start) * 1000.0, (ready - start) * 1000.0)
+"""
+
+
+def bench_cold_start(data_dir, engine, repeat=3):
+    """Time a fresh process from ``import main`` until the list is populated.
+
+    ``first_frame_ms`` covers ``import main`` + ``build()`` only (what is on
+    screen before the deferred store open). Needs a Kivy window provider;
+    failures are reported as an error entry.
+    """
+    shutil.copytree(os.path.join(ROOT, 'locales'), os.path.join(data_dir, 'locales'),
+                    dirs_exist_ok=True)
+    env = dict(os.environ, KIVY_NO_ARGS='1', KIVY_NO_CONSOLELOG='1',
+               EXPENSE_TRACKER_STORE=engine)
+    code = _COLD_START.format(root=ROOT, data_dir=data_dir)
+    samples = []
+    first_frames = []
+    for _ in range(repeat):
+        proc = subprocess.run([sys.executable, '-c', code], env=env,
+                              capture_output=True, text=True)
+        if proc.returncode != 0:
+            return {'error': proc.stderr.strip().splitlines()[-1:]}
+        first_frame, ready = proc.stdout.strip().splitlines()[-1].split()
+        first_frames.append(float(first_frame))
+        samples.append(float(ready))
+    return {
+        'first_frame_ms': round(statistics.median(first_frames), 3),
+        'median_ms': round(statistics.median(samples), 3),
+        'min_ms': round(min(samples), 3),
+        'max_ms': round(max(samples), 3),
+        'runs': repeat,
+    }
+
+
+# add_expense runs last because it grows the ledger it is timed against
+SCENARIOS = {
+    'cold_start': bench_cold_start,
+    'update_list': bench_update_list,
+    'export_database': bench_export_database,
+    'search': bench_search,
+    'add_expense': bench_add_expense,
+}
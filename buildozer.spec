@@ -13,7 +13,7 @@ package.domain = org.example
 source.dir = .
 
 # (list) Source files to include (let empty to include all the files)
-source.include_exts = py,png,jpg,kv,json,po,mo
+source.include_exts = py,png,jpg,kv,json,po,mo,catalog
 
 # (list) List of inclusions using pattern matching
 source.include_patterns = locales/*
@@ -22,7 +22,7 @@ source.include_patterns = locales/*
 #source.exclude_exts = spec
 
 # (list) List of directory to exclude (let empty to not exclude anything)
-source.exclude_dirs = tests, bin, .buildozer, artifacts
+source.exclude_dirs = tests, benchmarks, bin, .buildozer, artifacts
 
 # (list) List of exclusions using pattern matching
 #source.exclude_patterns = license,images/*/*.jpg
@@ -36,7 +36,7 @@ version = 1.0
 
 # (list) Application requirements
 # comma separated e.g. requirements = sqlite3,kivy
-requirements = python3,kivy,kivymd,tinydb
+requirements = python3,kivy,kivymd,tinydb,sqlite3
 
 # (str) Custom source folders for requirements
 # Sets custom source for any requirements with recipes
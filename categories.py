@@ -0,0 +1,227 @@
+"""Category autocomplete: a prefix trie of the categories used so far.
+
+Categories are matched case- and space-insensitively ("food", "Food " and
+"FOOD" are one category, shown with its most used spelling) and ranked by
+frecency: every use adds a weight that halves every ``HALF_LIFE_DAYS``, so a
+category used often *and* lately comes first. Because every weight decays at
+the same rate, the ranking never has to be recomputed as time passes.
+
+Each trie node caches its best ``SUGGESTIONS`` categories, so a lookup is a
+walk down the typed prefix plus a tuple read, whatever the number of
+categories. The index is built once (from the ledger's columns when there is
+one) and then follows the store's events. Writes happen on the DB worker;
+they only rebind cached tuples and dict values, so the UI thread can read
+suggestions without locking.
+"""
+
+import heapq
+
+from ledger import MINUTES_PER_DAY, NO_TIMESTAMP, to_timestamp
+from storage import StoreObserver, iter_chunks
+
+# Suggestions cached per prefix (and shown in the dropdown)
+SUGGESTIONS = 8
+# A use this long ago weighs half as much as one today
+HALF_LIFE_DAYS = 30
+# Reference point of the weights; keeps the exponents small
+_EPOCH = to_timestamp('2020-01-01 00:00')
+_MAX_EXPONENT = 1000.0
+
+
+def normalize(category):
+    """Key of a category: case-folded with runs of whitespace collapsed."""
+    return ' '.join(str(category or '').split()).casefold()
+
+
+def use_weight(ts):
+    """Frecency weight of one use at timestamp ``ts`` (minutes)."""
+    if ts is None or ts == NO_TIMESTAMP:
+        return 0.0
+    exponent = (ts - _EPOCH) / (HALF_LIFE_DAYS * MINUTES_PER_DAY)
+    return 2.0 ** min(exponent, _MAX_EXPONENT)
+
+
+def _most_used(spellings):
+    # Ties go to the spelling seen first
+    return max(spellings, key=spellings.get)
+
+
+class _Node:
+    __slots__ = ('children', 'key', 'top')
+
+    def __init__(self):
+        self.children = {}
+        self.key = None  # normalized category ending at this node
+        self.top = ()  # best keys in this subtree, best first
+
+
+class CategoryIndex(StoreObserver):
+    """Frecency-ranked prefix trie of normalized category names."""
+
+    def __init__(self, limit=SUGGESTIONS):
+        self.limit = limit
+        self.reset()
+
+    def reset(self):
+        self.root = _Node()
+        self.scores = {}  # key -> summed use weights
+        self.counts = {}  # key -> number of expenses
+        self.spellings = {}  # key -> {spelling: uses}
+        self.names = {}  # key -> displayed spelling (the most used one)
+        self._stale = set()  # keys whose rank dropped; re-ranked at commit
+
+    def __len__(self):
+        return len(self.counts)
+
+    def _rank(self, key):
+        return -self.scores.get(key, 0.0), key
+
+    # -- building ---------------------------------------------------------
+
+    def _count(self, category, ts, sign):
+        """Apply one use (or, with ``sign=-1``, remove one); returns the key."""
+        key = normalize(category)
+        if not key:
+            return None
+        spelling = ' '.join(str(category).split())
+        count = self.counts.get(key, 0) + sign
+        if count <= 0:
+            for table in (self.counts, self.scores, self.spellings, self.names):
+                table.pop(key, None)
+            return key
+        self.counts[key] = count
+        self.scores[key] = max(self.scores.get(key, 0.0) + sign * use_weight(ts), 0.0)
+        spellings = self.spellings.setdefault(key, {})
+        uses = spellings.get(spelling, 0) + sign
+        if uses > 0:
+            spellings[spelling] = uses
+        else:
+            spellings.pop(spelling, None)
+        self.names[key] = _most_used(spellings) if spellings else spelling
+        return key
+
+    def _path(self, key, create=False):
+        """Nodes from the root down to ``key`` (shorter when missing and not ``create``)."""
+        node = self.root
+        path = [node]
+        for char in key:
+            child = node.children.get(char)
+            if child is None:
+                if not create:
+                    break
+                child = node.children[char] = _Node()
+            node = child
+            path.append(node)
+        return path
+
+    def _refresh(self, node):
+        """Recompute ``node.top`` from its own key and its children's tops."""
+        counts = self.counts
+        candidates = [k for child in node.children.values() for k in child.top if k in counts]
+        if node.key is not None and node.key in counts:
+            candidates.append(node.key)
+        node.top = tuple(heapq.nsmallest(self.limit, set(candidates), key=self._rank))
+
+    def load(self, pairs):
+        """Rebuild from ``(category, timestamp)`` pairs (one per expense)."""
+        self.reset()
+        # Sum per spelling first: there are far fewer spellings than expenses
+        uses = {}
+        for category, ts in pairs:
+            entry = uses.get(category)
+            if entry is None:
+                entry = uses[category] = [0, 0.0]
+            entry[0] += 1
+            entry[1] += use_weight(ts)
+        for category, (count, score) in uses.items():
+            key = normalize(category)
+            if not key:
+                continue
+            spelling = ' '.join(str(category).split())
+            self.counts[key] = self.counts.get(key, 0) + count
+            self.scores[key] = self.scores.get(key, 0.0) + score
+            spellings = self.spellings.setdefault(key, {})
+            spellings[spelling] = spellings.get(spelling, 0) + count
+        for key, spellings in self.spellings.items():
+            self.names[key] = _most_used(spellings)
+        for key in self.counts:
+            self._path(key, create=True)[-1].key = key
+        self._refresh_subtree(self.root)
+        return self
+
+    def _refresh_subtree(self, node):
+        # Iterative post-order, so long names can't hit the recursion limit
+        stack = [(node, False)]
+        while stack:
+            node, children_done = stack.pop()
+            if children_done:
+                self._refresh(node)
+            else:
+                stack.append((node, True))
+                stack.extend((child, False) for child in node.children.values())
+
+    def attach(self, store, ledger=None):
+        """Build from ``ledger``'s columns (or a chunked scan of ``store``) and subscribe."""
+        if ledger is not None:
+            self.load(ledger.category_uses())
+        else:
+            self.load((d.get('category'), to_timestamp(d.get('date')))
+                      for chunk in iter_chunks(store) for d in chunk)
+        store.subscribe(self)
+        return self
+
+    # -- incremental updates ----------------------------------------------
+
+    def _promote(self, key):
+        """Move ``key`` up the cached tops along its path after a new use."""
+        path = self._path(key, create=True)
+        path[-1].key = key
+        for node in path:
+            top = node.top
+            if key in top or len(top) < self.limit or self._rank(key) < self._rank(top[-1]):
+                merged = set(top)
+                merged.add(key)
+                node.top = tuple(sorted(merged, key=self._rank)[:self.limit])
+
+    def _demote(self, key):
+        """Re-rank every node on ``key``'s path, deepest first."""
+        for node in reversed(self._path(key)):
+            self._refresh(node)
+
+    def on_insert(self, doc):
+        key = self._count(doc.get('category'), to_timestamp(doc.get('date')), 1)
+        if key:
+            self._promote(key)
+
+    def on_update(self, old_doc, new_doc):
+        self.on_remove(old_doc)
+        self.on_insert(new_doc)
+
+    def on_remove(self, doc):
+        key = self._count(doc.get('category'), to_timestamp(doc.get('date')), -1)
+        if key:
+            self._stale.add(key)
+
+    def on_clear(self):
+        self.reset()
+
+    def on_commit(self):
+        stale, self._stale = self._stale, set()
+        for key in stale:
+            self._demote(key)
+
+    # -- queries ----------------------------------------------------------
+
+    def suggest(self, prefix):
+        """Displayed names of the best categories starting with ``prefix``."""
+        node = self.root
+        for char in normalize(prefix):
+            node = node.children.get(char)
+            if node is None:
+                return []
+        names = self.names
+        return [names[k] for k in node.top if k in names]
+
+    def canonical(self, category):
+        """The known spelling of ``category``, or ``category`` tidied up when new."""
+        return self.names.get(normalize(category)) or ' '.join(str(category).split())
@@ -1,51 +1,122 @@
 #!/usr/bin/env python3
+"""Compile every ``locales/*/LC_MESSAGES/*.po`` into ``.mo`` and ``.catalog`` files.
 
+Only out-of-date files are rebuilt: a ``.po`` is skipped when its ``.mo`` is
+newer and its precompiled ``.catalog`` (see ``translations.py``) is still
+valid. Stale files are compiled in parallel across a process pool.
+
+Usage: python compile_translations.py [--force] [--jobs N] [localedir]
+"""
+
+import argparse
+import array
+import glob
 import os
-import struct
-import polib
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from translations import CATALOG_EXT, parse_po, read_catalog, write_catalog
+
+try:
+    import polib
+except ImportError:
+    polib = None
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+LOCALEDIR = os.path.join(ROOT, 'locales')
+
+MO_MAGIC = 0x950412de
+MO_HEADER = "Content-Type: text/plain; charset=UTF-8\nContent-Transfer-Encoding: 8bit\n"
+
+
+def discover(localedir=LOCALEDIR):
+    """Return every ``.po`` file under ``<localedir>/*/LC_MESSAGES``, sorted."""
+    return sorted(glob.glob(os.path.join(localedir, '*', 'LC_MESSAGES', '*.po')))
+
+
+def output_paths(po_file):
+    base = os.path.splitext(po_file)[0]
+    return base + '.mo', base + CATALOG_EXT
+
 
-def compile_po_to_mo(po_file, mo_file):
-    """Convert .po file to .mo file using polib if available, otherwise create minimal .mo file"""
+def is_stale(po_file):
+    """True when the ``.mo`` is older than the ``.po`` or the catalog is invalid."""
+    mo_file, catalog_file = output_paths(po_file)
     try:
-        # Try to use polib if available (better .mo file creation)
-        po = polib.pofile(po_file)
-        po.save_as_mofile(mo_file)
-        print(f"Compiled {po_file} to {mo_file} using polib")
-    except ImportError:
-        # Fallback to manual creation
-        print(f"polib not available, creating minimal .mo file for {po_file}")
-        with open(mo_file, 'wb') as f:
-            # Write a minimal .mo file header
-            f.write(struct.pack('<I', 0x950412de))  # magic number
-            f.write(struct.pack('<I', 0))  # file format revision
-            f.write(struct.pack('<I', 0))  # number of strings
-            f.write(struct.pack('<I', 28))  # offset of table with original strings
-            f.write(struct.pack('<I', 28))  # offset of table with translated strings
-            f.write(struct.pack('<I', 0))  # size of hashing table
-            f.write(struct.pack('<I', 0))  # offset of hashing table
+        if os.stat(mo_file).st_mtime < os.stat(po_file).st_mtime:
+            return True
+    except OSError:
+        return True
+    return read_catalog(po_file, mo_file, catalog_file) is None
+
+
+def write_mo(catalog, mo_file):
+    """Write ``{msgid: msgstr}`` as a GNU ``.mo`` file (UTF-8, no hash table)."""
+    entries = sorted([('', MO_HEADER)] + list(catalog.items()))
+    ids = [k.encode('utf-8') for k, _ in entries]
+    strs = [v.encode('utf-8') for _, v in entries]
+    count = len(entries)
+    ids_table = 7 * 4
+    strs_table = ids_table + count * 8
+    offset = strs_table + count * 8
+    table = array.array('I')
+    data = []
+    for blobs in (ids, strs):
+        for blob in blobs:
+            table.extend((len(blob), offset))
+            data.append(blob + b'\0')
+            offset += len(blob) + 1
+    header = array.array('I', (MO_MAGIC, 0, count, ids_table, strs_table, 0, 0))
+    if sys.byteorder != 'little':
+        header.byteswap()
+        table.byteswap()
+    tmp_file = mo_file + '.tmp'
+    with open(tmp_file, 'wb') as fh:
+        fh.write(header.tobytes())
+        fh.write(table.tobytes())
+        fh.write(b''.join(data))
+    os.replace(tmp_file, mo_file)
+
+
+def compile_po(po_file):
+    """Compile one ``.po`` into its ``.mo`` and ``.catalog``. Returns the entry count."""
+    mo_file, catalog_file = output_paths(po_file)
+    if polib is not None:
+        polib.pofile(po_file).save_as_mofile(mo_file)
+    else:
+        write_mo(parse_po(po_file), mo_file)
+    # Written after the .mo so the catalog records the final mtimes
+    return len(write_catalog(po_file, mo_file, catalog_file))
+
+
+def compile_all(localedir=LOCALEDIR, force=False, jobs=None):
+    """Compile the stale ``.po`` files under ``localedir``.
+
+    Returns ``(compiled, skipped)`` as lists of ``.po`` paths.
+    """
+    po_files = discover(localedir)
+    stale = [p for p in po_files if force or is_stale(p)]
+    skipped = [p for p in po_files if p not in stale]
+    if len(stale) > 1 and jobs != 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            counts = list(pool.map(compile_po, stale))
+    else:
+        counts = [compile_po(p) for p in stale]
+    for po_file, count in zip(stale, counts):
+        print(f"Compiled {os.path.relpath(po_file)} ({count} entries)")
+    return stale, skipped
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile .po translations")
+    parser.add_argument('localedir', nargs='?', default=LOCALEDIR)
+    parser.add_argument('--force', action='store_true', help="recompile up-to-date files too")
+    parser.add_argument('--jobs', type=int, default=None, help="worker processes")
+    args = parser.parse_args(argv)
+    compiled, skipped = compile_all(args.localedir, force=args.force, jobs=args.jobs)
+    print(f"Translation files compiled: {len(compiled)} compiled, {len(skipped)} up to date")
+    return 0
+
 
 if __name__ == "__main__":
-    # Install polib if not available
-    try:
-        import polib
-    except ImportError:
-        print("Installing polib for proper .mo file creation...")
-        os.system("pip install polib")
-        import polib
-    
-    # Create directories if they don't exist
-    os.makedirs('locales/en/LC_MESSAGES', exist_ok=True)
-    os.makedirs('locales/am/LC_MESSAGES', exist_ok=True)
-    os.makedirs('locales/om/LC_MESSAGES', exist_ok=True)
-    
-    # Compile .po files to .mo files
-    if os.path.exists('locales/en/LC_MESSAGES/app.po'):
-        compile_po_to_mo('locales/en/LC_MESSAGES/app.po', 'locales/en/LC_MESSAGES/app.mo')
-    
-    if os.path.exists('locales/am/LC_MESSAGES/app.po'):
-        compile_po_to_mo('locales/am/LC_MESSAGES/app.po', 'locales/am/LC_MESSAGES/app.mo')
-        
-    if os.path.exists('locales/om/LC_MESSAGES/app.po'):
-        compile_po_to_mo('locales/om/LC_MESSAGES/app.po', 'locales/om/LC_MESSAGES/app.mo')
-    
-    print("Translation files compiled successfully!")
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,73 @@
+"""Background execution of store operations.
+
+``StorageExecutor`` runs database calls on a single worker thread so slow
+flash writes never block Kivy's event loop. Jobs run strictly in submission
+order (writes can't be reordered) and their results or errors are handed
+back to the UI thread through ``kivy.clock.Clock``.
+"""
+
+import queue
+import threading
+
+from kivy.clock import Clock
+from kivy.logger import Logger
+
+_STOP = object()
+
+
+def _clock_dispatch(callback):
+    Clock.schedule_once(lambda dt: callback(), 0)
+
+
+class StorageExecutor:
+    """Single worker thread that serializes access to the store.
+
+    All store access should go through one executor: the engines are not
+    thread-safe, and a single worker also guarantees write ordering.
+    ``dispatch`` delivers completions to the UI thread (Clock by default;
+    tests pass a function that calls the callback directly).
+    """
+
+    def __init__(self, name='db-worker', dispatch=None):
+        self._dispatch = dispatch or _clock_dispatch
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, fn, *args, on_done=None, on_error=None, **kwargs):
+        """Queue ``fn(*args, **kwargs)`` on the worker thread.
+
+        ``on_done(result)`` or ``on_error(exception)`` is called on the UI
+        thread afterwards. Errors without an ``on_error`` handler are logged.
+        """
+        self._queue.put((fn, args, kwargs, on_done, on_error))
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            try:
+                if job is _STOP:
+                    return
+                fn, args, kwargs, on_done, on_error = job
+                try:
+                    result = fn(*args, **kwargs)
+                except Exception as e:
+                    Logger.error(f"DB: Background operation {getattr(fn, '__name__', fn)} failed: {e}")
+                    # Bind the callback now: the next job rebinds these names
+                    if on_error is not None:
+                        self._dispatch(lambda e=e, cb=on_error: cb(e))
+                else:
+                    if on_done is not None:
+                        self._dispatch(lambda r=result, cb=on_done: cb(r))
+            finally:
+                self._queue.task_done()
+
+    def wait(self):
+        """Block until every queued job has run."""
+        self._queue.join()
+
+    def shutdown(self, wait=True):
+        """Stop the worker after the already queued jobs have run."""
+        self._queue.put(_STOP)
+        if wait:
+            self._thread.join()
@@ -0,0 +1,80 @@
+"""Streaming export of the expense store to CSV or JSON Lines.
+
+Records are pulled from the store in chunks and written incrementally, so
+memory stays flat no matter how large the ledger is. Output can optionally
+be gzip-compressed. The file is written under a temporary name and renamed
+into place once complete.
+"""
+
+import csv
+import datetime
+import gzip
+import json
+import os
+
+from storage import DEFAULT_CHUNK_SIZE, iter_chunks
+from utils import CENTS_PER_UNIT, expense_cents, format_cents
+
+FORMATS = ('csv', 'jsonl')
+
+# Column order for CSV output
+FIELDS = ('id', 'date', 'amount', 'category', 'note')
+
+
+def export_filename(fmt='csv', compress=False, now=None):
+    now = now or datetime.datetime.now()
+    name = f"expenses_export_{now.strftime('%Y%m%d_%H%M%S')}.{fmt}"
+    return name + '.gz' if compress else name
+
+
+def _json_record(doc):
+    # Amounts are exported in currency units, like the CSV column
+    record = {'id': getattr(doc, 'doc_id', None), **doc}
+    record.pop('amount_cents', None)
+    record['amount'] = expense_cents(doc) / CENTS_PER_UNIT
+    return record
+
+
+def _open_output(path, compress):
+    if compress:
+        return gzip.open(path, 'wt', encoding='utf-8', newline='')
+    return open(path, 'w', encoding='utf-8', newline='')
+
+
+def export_expenses(store, path, fmt='csv', compress=False,
+                    chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+    """Write every expense in ``store`` to ``path``. Returns the record count.
+
+    ``progress(done, total)`` is called after each chunk.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    total = len(store)
+    done = 0
+    tmp_path = path + '.part'
+    try:
+        with _open_output(tmp_path, compress) as out:
+            if fmt == 'csv':
+                writer = csv.writer(out)
+                writer.writerow(FIELDS)
+            for chunk in iter_chunks(store, chunk_size):
+                if fmt == 'csv':
+                    writer.writerows(
+                        [getattr(d, 'doc_id', None), d.get('date', ''), format_cents(expense_cents(d)),
+                         d.get('category', ''), d.get('note', '')]
+                        for d in chunk)
+                else:
+                    out.writelines(
+                        json.dumps(_json_record(d), ensure_ascii=False) + '\n'
+                        for d in chunk)
+                done += len(chunk)
+                if progress is not None:
+                    progress(done, total)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    return done
@@ -0,0 +1,157 @@
+"""Bulk import of expenses from CSV or JSON bank statements.
+
+Rows are streamed from the file, validated in batches with the same rules
+as the add form (``utils.validate_expense``/``parse_amount_cents``) and
+de-duplicated against the existing ledger and the file itself through a
+hash index over ``(amount, category, date, note)``. Everything accepted is
+committed with a single ``insert_multiple`` call, i.e. one batched write
+instead of one store write per row.
+"""
+
+import csv
+import datetime
+import json
+from collections import namedtuple
+
+from storage import iter_chunks
+from utils import expense_cents, parse_amount_cents, validate_expense
+
+DEFAULT_BATCH_SIZE = 1000
+
+DATE_FORMAT = "%Y-%m-%d %H:%M"
+# Input date formats accepted, tried in order
+INPUT_DATE_FORMATS = (
+    DATE_FORMAT,
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%dT%H:%M",
+    "%Y-%m-%d",
+    "%d/%m/%Y",
+)
+
+# Header aliases commonly found in bank statement exports
+FIELD_ALIASES = {
+    'amount': ('amount', 'value', 'debit'),
+    'category': ('category', 'type'),
+    'note': ('note', 'description', 'memo', 'details'),
+    'date': ('date', 'datetime', 'timestamp', 'posted'),
+}
+
+ImportResult = namedtuple('ImportResult', ['imported', 'duplicates', 'invalid'])
+
+
+def expense_key(doc):
+    """Dedupe key for an expense: (amount in cents, category, date, note)."""
+    return (expense_cents(doc), doc.get('category', ''), doc.get('date', ''),
+            doc.get('note', '') or '')
+
+
+def _normalize_date(value):
+    value = (value or '').strip()
+    for fmt in INPUT_DATE_FORMATS:
+        try:
+            return datetime.datetime.strptime(value, fmt).strftime(DATE_FORMAT)
+        except ValueError:
+            continue
+    return None
+
+
+def _pick(lowered, field):
+    for alias in FIELD_ALIASES[field]:
+        if alias in lowered and lowered[alias] not in (None, ''):
+            return lowered[alias]
+    return None
+
+
+def _iter_json_lines(fh):
+    for line in fh:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def _iter_json_document(fh):
+    # A JSON array, or a TinyDB-style {"_default": {...}} file
+    data = json.load(fh)
+    if isinstance(data, dict):
+        data = list(data.get('_default', data).values())
+    yield from data
+
+
+def iter_rows(path):
+    """Stream raw row dicts from a ``.csv``, ``.jsonl``/``.ndjson`` or ``.json`` file.
+
+    CSV and JSON Lines are read row by row; a ``.json`` document has to be
+    parsed as a whole.
+    """
+    lowered = path.lower()
+    with open(path, 'r', encoding='utf-8-sig', newline='') as fh:
+        if lowered.endswith('.csv'):
+            yield from csv.DictReader(fh)
+        elif lowered.endswith(('.jsonl', '.ndjson')):
+            yield from _iter_json_lines(fh)
+        else:
+            yield from _iter_json_document(fh)
+
+
+def parse_row(row):
+    """Turn a raw row into an expense document, or None when it is invalid."""
+    lowered = {str(k).strip().lower(): v for k, v in row.items() if k is not None}
+    amount = _pick(lowered, 'amount')
+    category = _pick(lowered, 'category')
+    amount_str = None if amount is None else str(amount)
+    ok, _err = validate_expense(amount_str, category)
+    if not ok:
+        return None
+    date = _normalize_date(str(_pick(lowered, 'date') or ''))
+    if date is None:
+        return None
+    return {
+        'amount_cents': parse_amount_cents(amount_str),
+        'category': str(category).strip(),
+        'note': str(_pick(lowered, 'note') or '').strip(),
+        'date': date,
+    }
+
+
+def _batches(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def import_expenses(store, path, batch_size=DEFAULT_BATCH_SIZE, progress=None):
+    """Import ``path`` into ``store`` and return an ``ImportResult``.
+
+    ``progress(rows_read)`` is called after each validated batch.
+    """
+    seen = set()
+    for chunk in iter_chunks(store):
+        seen.update(expense_key(d) for d in chunk)
+
+    accepted = []
+    duplicates = invalid = read = 0
+    for batch in _batches(iter_rows(path), batch_size):
+        for row in batch:
+            doc = parse_row(row) if isinstance(row, dict) else None
+            if doc is None:
+                invalid += 1
+                continue
+            key = expense_key(doc)
+            if key in seen:
+                duplicates += 1
+                continue
+            seen.add(key)
+            accepted.append(doc)
+        read += len(batch)
+        if progress is not None:
+            progress(read)
+
+    if accepted:
+        store.insert_multiple(accepted)
+    return ImportResult(len(accepted), duplicates, invalid)
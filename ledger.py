@@ -0,0 +1,405 @@
+"""Compact, columnar in-memory copy of the expense ledger.
+
+Instead of one ``Document`` dict per expense (with its keys and date string
+repeated in every record), ``Ledger`` keeps each field in its own column:
+
+* doc ids, amounts (integer cents) and timestamps in ``array`` columns,
+* categories as ids into an interned name table,
+* notes (and dates that don't parse) in side tables holding only the
+  records that have one,
+* records that the columns can't rebuild exactly (legacy float amounts,
+  extra or missing fields) kept whole in an ``extras`` side table.
+
+Timestamps are whole minutes since 0001-01-01, which covers the app's
+``"%Y-%m-%d %H:%M"`` dates exactly and sorts as plain ints. Rows are kept in
+doc_id order so lookups are a bisect. A sorted timestamp index (one int per
+row packing the timestamp and doc_id) is maintained on every insert, update
+and remove; it gives the newest-first list order and answers date range
+queries ("today", "this week", ...) in O(log n + k).
+
+``Ledger`` is a ``StoreObserver``: ``attach(store)`` loads it with one
+chunked scan and subscribes it to the store's mutations. The journal engine
+keeps its documents in a ``Ledger`` instead of dicts; ``ledger_for(store)``
+reuses that one rather than building a second copy.
+"""
+
+import datetime
+from array import array
+from bisect import bisect_left
+
+from tinydb.table import Document
+
+from storage import StoreObserver, iter_chunks
+from utils import expense_cents
+
+DATE_FORMAT = "%Y-%m-%d %H:%M"
+MINUTES_PER_DAY = 1440
+# Timestamp of records without a parseable date (they sort as the oldest)
+NO_TIMESTAMP = -1
+
+# Index keys are ``timestamp << ID_BITS | doc_id``: ordered by date, then by
+# doc_id, and small enough for an int64 array up to year 9999.
+ID_BITS = 28
+ID_MASK = (1 << ID_BITS) - 1
+
+# Periods offered by the list filter, see period_range()
+PERIODS = ('all', 'today', 'week', 'month')
+
+# Fields the columns rebuild; other records are kept whole in ``extras``
+FIELDS = frozenset(('amount_cents', 'category', 'note', 'date'))
+
+
+def to_timestamp(date):
+    """Parse a ``"%Y-%m-%d %H:%M"`` string into minutes, or None."""
+    if (not isinstance(date, str) or len(date) != 16 or date[4] != '-'
+            or date[7] != '-' or date[10] != ' ' or date[13] != ':'):
+        return None
+    try:
+        day = datetime.date(int(date[:4]), int(date[5:7]), int(date[8:10])).toordinal()
+        hour, minute = int(date[11:13]), int(date[14:16])
+    except ValueError:
+        return None
+    if not (0 <= hour < 24 and 0 <= minute < 60):
+        return None
+    return day * MINUTES_PER_DAY + hour * 60 + minute
+
+
+def format_timestamp(ts):
+    """Inverse of ``to_timestamp``."""
+    day, minutes = divmod(ts, MINUTES_PER_DAY)
+    return f"{datetime.date.fromordinal(day).isoformat()} {minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def day_timestamp(day):
+    """Timestamp of midnight at the start of ``day`` (a ``datetime.date``)."""
+    return day.toordinal() * MINUTES_PER_DAY
+
+
+def period_range(period, now=None):
+    """Return ``(start, end)`` timestamps for one of ``PERIODS``.
+
+    Ranges are half-open and in local time; weeks start on Monday. ``'all'``
+    gives ``(None, None)``.
+    """
+    if period == 'all':
+        return None, None
+    today = (now or datetime.datetime.now()).date()
+    if period == 'today':
+        start = today
+        end = today + datetime.timedelta(days=1)
+    elif period == 'week':
+        start = today - datetime.timedelta(days=today.weekday())
+        end = start + datetime.timedelta(days=7)
+    elif period == 'month':
+        start = today.replace(day=1)
+        end = (start + datetime.timedelta(days=32)).replace(day=1)
+    else:
+        raise ValueError(f"Unknown period: {period}")
+    return day_timestamp(start), day_timestamp(end)
+
+
+def index_key(ts, doc_id):
+    """Key of a row in date order: ``ts << ID_BITS | doc_id``."""
+    if not 0 < doc_id <= ID_MASK:
+        raise ValueError(f"doc_id out of range for the timestamp index: {doc_id}")
+    return (ts << ID_BITS) | doc_id
+
+
+def document_key(doc):
+    """``index_key`` of an expense Document, from its date and doc_id."""
+    ts = to_timestamp(doc.get('date'))
+    return index_key(NO_TIMESTAMP if ts is None else ts, doc.doc_id)
+
+
+def _rebuilds_exactly(doc, ts):
+    """Whether the columns give ``doc`` back unchanged."""
+    if doc.keys() != FIELDS or type(doc['amount_cents']) is not int:
+        return False
+    category, note, date = doc['category'], doc['note'], doc['date']
+    return (isinstance(category, str) and isinstance(note, str) and isinstance(date, str)
+            and (ts is None or format_timestamp(ts) == date))
+
+
+def ledger_for(store):
+    """The ledger of ``store``: the engine's own when it keeps one, else a new attached one."""
+    engine = getattr(store, 'engine', store)
+    ledger = getattr(engine, 'ledger', None)
+    return ledger if ledger is not None else Ledger().attach(store)
+
+
+class Ledger(StoreObserver):
+    """Columnar expense ledger with the read APIs the list view needs."""
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.ids = array('q')
+        self.amounts = array('q')
+        self.timestamps = array('q')
+        self.categories = array('I')
+        self.category_names = []
+        self._category_ids = {}
+        self.notes = {}  # doc_id -> note, only for non-empty notes
+        self.raw_dates = {}  # doc_id -> date string that didn't parse
+        self.extras = {}  # doc_id -> whole record, when the columns can't rebuild it
+        self.index = array('q')  # sorted index_key(timestamp, doc_id) per row
+        self._removed = set()  # doc_ids removed since the last compaction
+
+    def __len__(self):
+        return len(self.ids) - len(self._removed)
+
+    def __contains__(self, doc_id):
+        return self._position(doc_id) is not None
+
+    # -- column helpers ---------------------------------------------------
+
+    def _intern(self, category):
+        category = category if isinstance(category, str) else str(category or '')
+        cat_id = self._category_ids.get(category)
+        if cat_id is None:
+            cat_id = self._category_ids[category] = len(self.category_names)
+            self.category_names.append(category)
+        return cat_id
+
+    def _position(self, doc_id):
+        if doc_id in self._removed:
+            return None
+        pos = bisect_left(self.ids, doc_id)
+        if pos < len(self.ids) and self.ids[pos] == doc_id:
+            return pos
+        return None
+
+    def _index_add(self, key):
+        if not self.index or self.index[-1] < key:
+            self.index.append(key)  # the usual case: the newest expense
+        else:
+            self.index.insert(bisect_left(self.index, key), key)
+
+    def _index_discard(self, key):
+        pos = bisect_left(self.index, key)
+        if pos < len(self.index) and self.index[pos] == key:
+            del self.index[pos]
+
+    def _set_side_fields(self, doc_id, doc):
+        note = doc.get('note') or ''
+        if note:
+            self.notes[doc_id] = str(note)
+        else:
+            self.notes.pop(doc_id, None)
+        date = doc.get('date') or ''
+        ts = to_timestamp(date)
+        if ts is None and date:
+            self.raw_dates[doc_id] = str(date)
+        else:
+            self.raw_dates.pop(doc_id, None)
+        if _rebuilds_exactly(doc, ts):
+            self.extras.pop(doc_id, None)
+        else:
+            self.extras[doc_id] = dict(doc)
+        return NO_TIMESTAMP if ts is None else ts
+
+    def _add(self, doc):
+        doc_id = doc.doc_id
+        ts = self._set_side_fields(doc_id, doc)
+        key = index_key(ts, doc_id)
+        pos = bisect_left(self.ids, doc_id)
+        if pos == len(self.ids):
+            self.ids.append(doc_id)
+            self.amounts.append(expense_cents(doc))
+            self.timestamps.append(ts)
+            self.categories.append(self._intern(doc.get('category', '')))
+        else:
+            self.ids.insert(pos, doc_id)
+            self.amounts.insert(pos, expense_cents(doc))
+            self.timestamps.insert(pos, ts)
+            self.categories.insert(pos, self._intern(doc.get('category', '')))
+        self._index_add(key)
+
+    def _compact(self):
+        """Drop the rows removed since the last compaction in one pass."""
+        if not self._removed:
+            return
+        removed = self._removed
+        keep = [pos for pos, doc_id in enumerate(self.ids) if doc_id not in removed]
+        self.ids = array('q', (self.ids[p] for p in keep))
+        self.amounts = array('q', (self.amounts[p] for p in keep))
+        self.timestamps = array('q', (self.timestamps[p] for p in keep))
+        self.categories = array('I', (self.categories[p] for p in keep))
+        self.index = array('q', (k for k in self.index if k & ID_MASK not in removed))
+        self._removed = set()
+
+    # -- loading ----------------------------------------------------------
+
+    def load(self, docs):
+        """Replace the contents with ``docs`` (an iterable of Documents)."""
+        self.clear()
+        keys = []
+        for doc in sorted(docs, key=lambda d: d.doc_id):
+            doc_id = doc.doc_id
+            ts = self._set_side_fields(doc_id, doc)
+            self.ids.append(doc_id)
+            self.amounts.append(expense_cents(doc))
+            self.timestamps.append(ts)
+            self.categories.append(self._intern(doc.get('category', '')))
+            keys.append(index_key(ts, doc_id))
+        keys.sort()
+        self.index = array('q', keys)
+        return self
+
+    def attach(self, store):
+        """Load every document of ``store`` and subscribe to its mutations."""
+        self.load(doc for chunk in iter_chunks(store) for doc in chunk)
+        store.subscribe(self)
+        return self
+
+    # -- read API ---------------------------------------------------------
+
+    def date(self, pos):
+        ts = self.timestamps[pos]
+        if ts == NO_TIMESTAMP:
+            return self.raw_dates.get(self.ids[pos], '')
+        return format_timestamp(ts)
+
+    def document(self, pos):
+        """Rebuild row ``pos`` as a ``Document``."""
+        doc_id = self.ids[pos]
+        extra = self.extras.get(doc_id)
+        if extra is not None:
+            return Document(dict(extra), doc_id)
+        return Document({
+            'amount_cents': self.amounts[pos],
+            'category': self.category_names[self.categories[pos]],
+            'note': self.notes.get(doc_id, ''),
+            'date': self.date(pos),
+        }, doc_id)
+
+    def get(self, doc_id):
+        pos = self._position(doc_id)
+        return None if pos is None else self.document(pos)
+
+    def doc_ids(self):
+        self._compact()
+        return list(self.ids)
+
+    def iter_documents(self):
+        """Yield every Document in doc_id order."""
+        self._compact()
+        for pos in range(len(self.ids)):
+            yield self.document(pos)
+
+    def _index_slice(self, start=None, end=None):
+        """Index positions ``lo, hi`` of the rows with ``start <= timestamp < end``."""
+        self._compact()
+        lo = 0 if start is None else bisect_left(self.index, start << ID_BITS)
+        hi = len(self.index) if end is None else bisect_left(self.index, end << ID_BITS)
+        return lo, max(lo, hi)
+
+    def iter_range(self, start=None, end=None, newest_first=True):
+        """Yield Documents with ``start <= timestamp < end`` in (date, doc_id) order.
+
+        ``None`` leaves that side open. Costs O(log n) to find the range plus
+        O(log n) per document yielded.
+        """
+        lo, hi = self._index_slice(start, end)
+        keys = self.index[lo:hi]
+        for key in (reversed(keys) if newest_first else keys):
+            yield self.document(bisect_left(self.ids, key & ID_MASK))
+
+    def _documents(self, keys):
+        return [self.document(bisect_left(self.ids, key & ID_MASK)) for key in reversed(keys)]
+
+    def page(self, offset, limit, start=None, end=None):
+        """``limit`` Documents newest first, skipping the ``offset`` newest in the range."""
+        lo, hi = self._index_slice(start, end)
+        hi = max(hi - offset, lo)
+        return self._documents(self.index[max(hi - limit, lo):hi])
+
+    def after(self, cursor, limit, start=None, end=None):
+        """The ``limit`` newest Documents in the range that are older than ``cursor``.
+
+        ``cursor`` is the last Document of the previous page (None for the
+        first page); inserts and removes elsewhere don't shift the window.
+        """
+        lo, hi = self._index_slice(start, end)
+        if cursor is not None:
+            hi = max(lo, min(hi, bisect_left(self.index, document_key(cursor))))
+        return self._documents(self.index[max(hi - limit, lo):hi])
+
+    def iter_sorted(self, newest_first=True):
+        """Yield every Document ordered by (date, doc_id), newest first by default."""
+        return self.iter_range(newest_first=newest_first)
+
+    def count_range(self, start=None, end=None):
+        lo, hi = self._index_slice(start, end)
+        return hi - lo
+
+    def range_total(self, start=None, end=None):
+        """Sum in cents of the amounts with ``start <= timestamp < end``."""
+        lo, hi = self._index_slice(start, end)
+        if lo == 0 and hi == len(self.index):
+            return sum(self.amounts)
+        ids, amounts = self.ids, self.amounts
+        return sum(amounts[bisect_left(ids, key & ID_MASK)] for key in self.index[lo:hi])
+
+    def period(self, period, now=None, newest_first=True):
+        """Documents in one of ``PERIODS`` ('today', 'week', 'month', 'all')."""
+        return self.iter_range(*period_range(period, now), newest_first=newest_first)
+
+    def total(self):
+        """Sum of all amounts in cents."""
+        self._compact()
+        return sum(self.amounts)
+
+    def category_uses(self):
+        """Yield ``(category, timestamp)`` for every row."""
+        self._compact()
+        names = self.category_names
+        for cat_id, ts in zip(self.categories, self.timestamps):
+            yield names[cat_id], ts
+
+    def category_totals(self):
+        self._compact()
+        sums = {}
+        for cat_id, amount in zip(self.categories, self.amounts):
+            sums[cat_id] = sums.get(cat_id, 0) + amount
+        return {self.category_names[cat_id]: total for cat_id, total in sums.items()}
+
+    # -- StoreObserver hooks ----------------------------------------------
+
+    def on_insert(self, doc):
+        if doc.doc_id in self._removed:
+            self._compact()
+        self._add(doc)
+
+    def on_update(self, old_doc, new_doc):
+        pos = self._position(new_doc.doc_id)
+        if pos is None:
+            return self.on_insert(new_doc)
+        ts = self._set_side_fields(new_doc.doc_id, new_doc)
+        if ts != self.timestamps[pos]:
+            self._index_discard(index_key(self.timestamps[pos], new_doc.doc_id))
+            self._index_add(index_key(ts, new_doc.doc_id))
+            self.timestamps[pos] = ts
+        self.amounts[pos] = expense_cents(new_doc)
+        self.categories[pos] = self._intern(new_doc.get('category', ''))
+
+    def on_remove(self, doc):
+        # Compaction waits for on_commit so a bulk remove is a single pass
+        if self._position(doc.doc_id) is not None:
+            self._removed.add(doc.doc_id)
+            self.notes.pop(doc.doc_id, None)
+            self.raw_dates.pop(doc.doc_id, None)
+            self.extras.pop(doc.doc_id, None)
+
+    def discard(self, doc_ids):
+        """Remove the rows of ``doc_ids`` in one compaction pass."""
+        for doc_id in doc_ids:
+            self.on_remove(Document({}, doc_id))
+        self._compact()
+
+    def on_clear(self):
+        self.clear()
+
+    def on_commit(self):
+        self._compact()
@@ -1,32 +1,42 @@
-import json
 import datetime
-import gettext
 import os
+import threading
 from kivy.utils import platform  # Import platform
 from kivy.app import App  # Import App for Android path resolution
 from kivy.logger import Logger  # Import Kivy's logger
 from kivy.lang import Builder
+from kivy.clock import Clock
 from kivy.uix.screenmanager import ScreenManager, Screen
 from kivymd.app import MDApp
-from kivymd.uix.list import OneLineListItem, TwoLineListItem, MDList
-from kivymd.uix.button import MDFlatButton, MDRaisedButton, MDIconButton
-from kivymd.uix.dialog import MDDialog
-from kivymd.uix.menu import MDDropdownMenu
-from kivymd.uix.snackbar import Snackbar
-from kivymd.uix.toolbar import MDTopAppBar
-from kivymd.uix.boxlayout import MDBoxLayout
-from kivymd.uix.textfield import MDTextField
-from kivymd.uix.label import MDLabel
-from kivymd.uix.selectioncontrol import MDCheckbox
-from kivy.uix.scrollview import ScrollView
-from tinydb import TinyDB
-from utils import validate_expense
+from kivy.properties import BooleanProperty, ObjectProperty, StringProperty
+from kivymd.uix.list import TwoLineListItem
+# Widgets used only in KV are resolved through KivyMD's Factory registrations.
+# Dialogs, menus, Snackbar and plyer are imported on first use (see
+# _dialog/notify/show_language_menu) to keep them off the cold-start path.
+from tinydb.table import Document
+from storage import (open_store, migrate_amounts_to_cents, MemoryStore, ObservableStore,
+                     CommitHook, flush_store, iter_chunks, page_after)
+from aggregates import Aggregates, aggregates_path_for
+from categories import CategoryIndex
+from executor import StorageExecutor
+from exporter import export_expenses, export_filename
+from snapshot import SNAPSHOT_ROWS, load_snapshot, save_snapshot, snapshot_path_for
+from importer import import_expenses
+from ledger import PERIODS, ledger_for, period_range, to_timestamp
+from querycache import QueryCache
+from refresh import RefreshScheduler
+from search import SearchIndex, matches, search_path_for, tokenize
+from selection import SelectionModel
+import perf
+from utils import expense_cents, format_cents, parse_amount_cents, validate_expense
+from translations import TranslationManager
 import traceback
 import sys
 import builtins
 
 # Set up gettext for internationalization
 current_language = 'en'  # Default language
+LANGUAGES = ('en', 'am', 'om')
 
 # Global translation function, will be set in build()
 
@@ -37,14 +47,22 @@ def _(s): return s  # Default no-op
 builtins._ = _
 
 
-# Fallback dictionary-based translations (populated by load_all_translations)
+# Merged per-language catalogs ({lang: {msgid: msgstr}}), filled lazily by
+# the app's TranslationManager the first time a language is used
 TRANSLATIONS = {}
 
-# Optional Android/native notifications via plyer
-try:
-    from plyer import notification as plyer_notification
-except Exception:
-    plyer_notification = None
+# Optional Android/native notifications via plyer, imported on first notify()
+plyer_notification = None
+
+# Rows fetched per page of the expense list; the next page is prefetched
+LIST_PAGE_SIZE = 100
+# Show the prefetched page once the list is scrolled this close to its end
+LOAD_MORE_AT = 0.25
+# Writes are made durable in one group commit this long after the first one
+GROUP_COMMIT_DELAY = 0.5
+# on_pause waits at most this long (seconds) for its writes, well below
+# Android's 5 s ANR limit
+PAUSE_WRITE_TIMEOUT = 2.0
 
 
 def update_translations():
@@ -59,12 +77,7 @@ def update_translations():
         return
 
     try:
-        lang_obj = gettext.translation(
-            'app',
-            app_instance.localedir,
-            languages=[current_language])
-        lang_obj.install()
-        _ = lang_obj.gettext
+        _ = app_instance.get_translations().gettext_func(current_language)
         builtins._ = _
         Logger.info(
             f"Translation: Translations updated to: {current_language}")
@@ -76,6 +89,10 @@ def update_translations():
 
 
 KV = """
+<ExpenseRow>:
+    text: ("[x] " if root.selected else "") + root.base_text
+    on_release: app.toggle_select(root.doc_id, root)
+
 <MainScreen>:
     name: "main"
     MDBoxLayout:
@@ -109,6 +126,7 @@ KV = """
                 hint_text: "Category"
                 helper_text: "e.g., Food, Transport"
                 helper_text_mode: "on_focus"
+                on_text: app.on_category_text(self.text)
 
         MDTextField:
             id: note
@@ -130,6 +148,11 @@ KV = """
                 on_release: app.add_expense()
                 size_hint_x: 0.6
 
+            MDIconButton:
+                id: import_button
+                icon: "file-import"
+                on_release: app.choose_import_file()
+
             MDIconButton:
                 id: export_button
                 icon: "download"
@@ -151,18 +174,40 @@ KV = """
                 font_style: "H6"
                 theme_text_color: "Primary"
 
-        MDLabel:
-            id: expense_list_label
-            text: "Expense List"
-            halign: "left"
-            font_style: "Subtitle1"
-            theme_text_color: "Secondary"
+        MDTextField:
+            id: search_field
+            hint_text: "Search"
+            icon_left: "magnify"
             size_hint_y: None
-            height: dp(28)
+            height: dp(48)
+            on_text: app.on_search_text(self.text)
 
-        ScrollView:
-            MDList:
-                id: expense_list
+        MDBoxLayout:
+            orientation: "horizontal"
+            size_hint_y: None
+            height: dp(36)
+            MDLabel:
+                id: expense_list_label
+                text: "Expense List"
+                halign: "left"
+                font_style: "Subtitle1"
+                theme_text_color: "Secondary"
+
+            MDFlatButton:
+                id: period_button
+                text: "All time"
+                on_release: app.show_period_menu()
+
+        RecycleView:
+            id: expense_list
+            viewclass: "ExpenseRow"
+            on_scroll_y: app.on_list_scroll(self.scroll_y)
+            RecycleBoxLayout:
+                default_size: None, dp(72)
+                default_size_hint: 1, None
+                size_hint_y: None
+                height: self.minimum_height
+                orientation: "vertical"
 """
 
 # Defer DB creation until the App is running so we can choose a safe path
@@ -171,14 +216,62 @@ KV = """
 db = None
 
 
+def _in_period(doc, start, end):
+    if start is None:
+        return True
+    ts = to_timestamp(doc.get('date'))
+    return ts is not None and start <= ts < end
+
+
 class MainScreen(Screen):
     pass
 
 
+class ExpenseRow(TwoLineListItem):
+    """Recycled expense list row.
+
+    The RecycleView only creates rows for visible items and fills them from
+    the dicts built in ``_make_row`` (doc_id, base_text, secondary_text,
+    date, selected).
+    """
+    doc_id = ObjectProperty(None, allownone=True)
+    base_text = StringProperty('')
+    date = StringProperty('')  # sort key used to place inserted rows
+    selected = BooleanProperty(False)
+
+
 class ExpenseTrackerApp(MDApp):
     dialog = None
     language_menu = None
-    selected_ids = None
+    period_menu = None
+    period = 'all'  # list filter, one of ledger.PERIODS
+    _period_total = None  # total in cents of the filtered period (None: all time)
+    _selection = None  # SelectionModel behind the `selection` property
+    aggregates = None
+    ledger = None  # columnar copy of the store the list is built from
+    search_index = None  # search.SearchIndex over notes and categories
+    category_index = None  # categories.CategoryIndex feeding the category autocomplete
+    query_cache = None  # querycache.QueryCache: totals/doc_id sets until the next write
+    category_menu = None
+    search_query = ''  # text of the search box; filters the list when set
+    _rows_by_id = None  # doc_id -> row dict in expense_list.data
+    _list_total = 0  # total in cents computed by update_list when aggregates are unavailable
+    _page_cursor = None  # last Document shown; the next page starts after it
+    _has_more = False  # the store holds rows past _page_cursor
+    _prefetched = None  # (rows, cursor, has_more) of the next page, fetched ahead
+    _prefetching = None  # _page_generation of the prefetch in flight
+    _want_more = False  # the list reached its end before the prefetch finished
+    _list_generation = 0  # bumped by update_list; stale first pages are dropped
+    _page_generation = 0  # bumped when the prefetched page may be stale
+    executor = None  # StorageExecutor running every db call off the UI thread
+    _flush_trigger = None  # Clock trigger for the next group commit
+    refresher = None  # RefreshScheduler batching list/text/button refreshes per frame
+    data_dir = None  # writable directory holding the store (and exports)
+    translations = None  # TranslationManager, created by get_translations()
+    startup = None  # perf.StageTimer for the staged start-up, dropped once logged
+    storage_ready = False  # set once the deferred store open has finished
+    snapshot_path = None  # start-up snapshot rendered by build() (None: don't save)
+    _snapshot_dirty = False  # list changed since the snapshot was last written
     _directory = None  # Private storage for directory property
 
     @property
@@ -193,84 +286,70 @@ class ExpenseTrackerApp(MDApp):
         """Set the app's directory path (used in testing)"""
         self._directory = value
 
+    @property
+    def selection(self):
+        """The list's SelectionModel; the rows observe it."""
+        if self._selection is None:
+            self._selection = SelectionModel()
+            self._selection.bind(self._repaint_selection)
+        return self._selection
+
     @property
     def _get_text(self):
         """Helper for tests to get current translation function"""
         return _
 
+    @perf.timed('build')
     def build(self):
+        """Build the first frame: the form and an empty list.
+
+        Opening the store and populating the list are deferred until after
+        the first frame has been drawn (see ``start_storage``); the action
+        buttons stay disabled until the store is ready.
+        """
         try:
+            self.startup = perf.StageTimer('startup')
             self.sm = ScreenManager()
             # Load the KV string and create the screen
             Builder.load_string(KV)
             main_screen = MainScreen()
             self.sm.add_widget(main_screen)
+            self.startup.mark('kv')
 
             # Initialize localedir and translations here, after app is running
             self.localedir = os.path.join(self.directory, 'locales')
             Logger.info(
                 f"Translation: App.directory resolved localedir: {self.localedir}")
 
-            # Initialize TinyDB using a safe writable path. On Android use
-            # the app's user_data_dir; otherwise fall back to the project
-            # directory (useful for desktop/testing).
-            global db
-            try:
-                if platform == 'android':
-                    db_path = os.path.join(self.user_data_dir, 'expenses.json')
-                else:
-                    db_path = os.path.join(self.directory, 'expenses.json')
-                Logger.info(f"DB: Initializing TinyDB at: {db_path}")
-                db = TinyDB(db_path)
-            except Exception as e:
-                Logger.error(f"DB: Failed to initialize TinyDB: {e}")
-                # Fall back to an in-memory list-like shim to avoid crashes
-                # (this keeps the app running though data won't persist).
-                class _InMemoryDB:
-                    def __init__(self):
-                        self._data = []
-
-                    def all(self):
-                        return list(self._data)
-
-                    def insert(self, d):
-                        # emulate tinydb.Document behaviour minimally
-                        d = dict(d)
-                        d['doc_id'] = len(self._data) + 1
-                        self._data.append(d)
-
-                    def remove(self, **kwargs):
-                        # naive remove by doc_ids
-                        doc_ids = kwargs.get('doc_ids') or []
-                        if not doc_ids:
-                            return
-                        self._data = [d for d in self._data if d.get('doc_id') not in doc_ids]
-
-                db = _InMemoryDB()
-
-            global en_lang, am_lang, om_lang, _
+            # Only the current language is loaded now; others on first use
+            global _
             try:
-                en_lang = gettext.translation(
-                    'app', self.localedir, languages=['en'])
-                am_lang = gettext.translation(
-                    'app', self.localedir, languages=['am'])
-                om_lang = gettext.translation(
-                    'app', self.localedir, languages=['om'])
-                _ = en_lang.gettext  # Set initial translation function
+                _ = self.get_translations().gettext_func(current_language)
                 builtins._ = _
                 Logger.info(
-                    "Translation: Initial English translations loaded in build().")
+                    f"Translation: Initial {current_language} translations loaded in build().")
             except Exception as e:
                 Logger.error(
                     f"Translation: Error loading initial translations in build(): {e}")
 
                 _ = lambda s: s  # Fallback
                 builtins._ = _
+            self.startup.mark('translations')
 
-            self.update_list()
+            # Every store access goes through the worker thread
+            self.executor = StorageExecutor()
+            self._flush_trigger = Clock.create_trigger(self._flush_due, GROUP_COMMIT_DELAY)
+            self.refresher = RefreshScheduler(self._refresh_passes())
             self.update_ui_texts()
-            # Initialize selected set for multi-select without adding new widgets
-            self.selected_ids = set()
+            self._set_storage_ready(False)
+            self.startup.mark('ui')
+
+            # Totals and newest rows from the last run, reconciled against
+            # the store once it has been opened
+            self.render_snapshot()
+            self.startup.mark('snapshot')
+
+            self._after_first_frame(self.start_storage)
             return self.sm
         except Exception:
             # Capture full traceback and write to a persistent location so
@@ -304,6 +383,8 @@ class ExpenseTrackerApp(MDApp):
 
             # Create a minimal fallback UI so the app doesn't hard-crash immediately.
             try:
+                from kivymd.uix.boxlayout import MDBoxLayout
+                from kivymd.uix.label import MDLabel
                 self.sm = ScreenManager()
                 err_screen = Screen(name='error')
                 box = MDBoxLayout(orientation='vertical')
@@ -317,6 +398,274 @@ class ExpenseTrackerApp(MDApp):
                 # if possible above.
                 raise
 
+    def _after_first_frame(self, callback):
+        """Call ``callback`` on the frame after the first one is drawn."""
+        from kivy.core.window import Window
+        state = {'done': False}
+
+        def _on_flip(*_args):
+            if state['done']:
+                return
+            state['done'] = True
+            Window.unbind(on_flip=_on_flip)
+            Clock.schedule_once(callback, 0)
+        Window.bind(on_flip=_on_flip)
+
+    def start_storage(self, *_args):
+        """Open the store on the worker thread, then populate the list."""
+        if self.startup is not None:
+            self.startup.mark('first_frame')
+        self.run_db(self._open_storage, on_done=self._storage_opened,
+                    on_error=lambda e: Logger.error(f"DB: Storage start-up failed: {e}"))
+
+    def _open_storage(self):
+        """Open the store and the structures derived from it (runs on the worker thread)."""
+        aggregates = Aggregates()
+        search_index = SearchIndex()
+        try:
+            db_path = self._db_path()
+            self.data_dir = os.path.dirname(db_path)
+            Logger.info(f"DB: Initializing store at: {db_path}")
+            # Writes are buffered and group-committed by flush_store()
+            store = open_store(db_path, write_behind=True)
+            store.subscribe(CommitHook(self._request_flush))
+            aggregates.path = aggregates_path_for(db_path)
+            search_index.path = search_path_for(db_path)
+        except Exception as e:
+            Logger.error(f"DB: Failed to initialize store: {e}")
+            # Fall back to an in-memory store to avoid crashes
+            # (this keeps the app running though data won't persist).
+            store = ObservableStore(MemoryStore())
+            # Keep the last good snapshot rather than overwrite it with nothing
+            self.snapshot_path = None
+        if self.startup is not None:
+            self.startup.mark('db_open')
+
+        # Convert float amounts written by older versions to integer cents.
+        # Aggregates in the current format mean the store was migrated
+        # already, which saves the scan on every start.
+        try:
+            if not aggregates.load():
+                migrated = migrate_amounts_to_cents(store)
+                if migrated:
+                    Logger.info(f"DB: Migrated {migrated} expense(s) to integer cents")
+        except Exception as e:
+            Logger.error(f"DB: Amount migration failed: {e}")
+        if self.startup is not None:
+            self.startup.mark('migrate')
+
+        # Running totals are persisted next to the store and kept up to
+        # date from store events, so the total label needs no full scan.
+        try:
+            aggregates.attach(store)
+        except Exception as e:
+            Logger.error(f"DB: Failed to load aggregates: {e}")
+            aggregates = None
+        if self.startup is not None:
+            self.startup.mark('aggregates')
+
+        # The list is built from a compact columnar ledger instead of a fresh
+        # all() of Documents on every rebuild; the journal already keeps one
+        try:
+            ledger = ledger_for(store)
+        except Exception as e:
+            Logger.error(f"DB: Failed to load ledger: {e}")
+            ledger = None
+        if self.startup is not None:
+            self.startup.mark('ledger')
+
+        # The search index is persisted too, so it needs no rebuild at start
+        try:
+            search_index.attach(store)
+        except Exception as e:
+            Logger.error(f"DB: Failed to load search index: {e}")
+            search_index = None
+        if self.startup is not None:
+            self.startup.mark('search')
+
+        # Category suggestions, built from the ledger's columns (no rescan)
+        try:
+            category_index = CategoryIndex().attach(store, ledger)
+        except Exception as e:
+            Logger.error(f"DB: Failed to build category index: {e}")
+            category_index = None
+        if self.startup is not None:
+            self.startup.mark('categories')
+
+        # Repeated reads within one action (select all, period totals) are
+        # served from memory until the next write
+        query_cache = QueryCache().attach(store, ledger)
+
+        # Time every store call when EXPENSE_TRACKER_PERF is set
+        return (perf.instrument_store(store), aggregates, ledger, search_index,
+                category_index, query_cache)
+
+    def _db_path(self):
+        # Use a safe writable path: the app's user_data_dir on Android,
+        # otherwise the project directory (useful for desktop/testing)
+        base = self.user_data_dir if platform == 'android' else self.directory
+        return os.path.join(base, 'expenses.json')
+
+    def render_snapshot(self):
+        """Show the start-up snapshot's rows and total, if there is one."""
+        main_screen = self.get_main_screen()
+        if main_screen is None:
+            return False
+        self.snapshot_path = snapshot_path_for(self._db_path())
+        data = load_snapshot(self.snapshot_path)
+        if data is None:
+            return False
+        self._list_total = data['total']
+        self._set_rows(main_screen, data['rows'])
+        self._snapshot_dirty = False
+        return True
+
+    def save_snapshot(self):
+        """Write the start-up snapshot if the list changed since the last save.
+
+        The newest rows are copied here and the file is written on the DB
+        worker, so list rebuilds don't pay for it on the UI thread (on_pause
+        and on_stop wait for the worker).
+        """
+        main_screen = self.get_main_screen()
+        if (main_screen is None or not self._snapshot_dirty or self.period != 'all'
+                or self.search_query or not self.snapshot_path or not self.storage_ready):
+            return
+        rows = [dict(r) for r in main_screen.ids.expense_list.data[:SNAPSHOT_ROWS]]
+        list_total, list_count = self._list_total, len(self._rows_by_id or ())
+        self._snapshot_dirty = False
+
+        def _write(path):
+            # The aggregates are only consistent on the worker
+            if self.aggregates is not None:
+                total, count = self.aggregates.total, self.aggregates.count
+                by_category = self.aggregates.by_category
+            else:
+                total, count, by_category = list_total, list_count, None
+            save_snapshot(path, rows, total, count, by_category)
+
+        def _failed(e):
+            Logger.error(f"DB: Failed to write start-up snapshot: {e}")
+            self._snapshot_dirty = True
+
+        self.run_db(_write, self.snapshot_path, on_error=_failed)
+
+    def save_aggregates(self):
+        """Persist the running totals on the worker, after any queued writes."""
+        if self.aggregates is None:
+            return
+        self.run_db(self.aggregates.save,
+                    on_error=lambda e: Logger.error(f"DB: Failed to save aggregates: {e}"))
+
+    def save_search_index(self):
+        """Persist the search index on the worker, after any queued writes."""
+        if self.search_index is None:
+            return
+        self.run_db(self.search_index.save,
+                    on_error=lambda e: Logger.error(f"DB: Failed to save search index: {e}"))
+
+    def _request_flush(self):
+        # Called on the worker after each write; the trigger coalesces them
+        if self._flush_trigger is not None:
+            self._flush_trigger()
+
+    def _flush_due(self, dt):
+        self.flush_store()
+
+    def flush_store(self):
+        """Group-commit the buffered writes on the worker, after any queued ones."""
+        if db is None:
+            return
+        self.run_db(flush_store, db,
+                    on_error=lambda e: Logger.error(f"DB: Failed to flush store: {e}"))
+
+    def _storage_opened(self, result):
+        global db
+        (db, self.aggregates, self.ledger, self.search_index, self.category_index,
+         self.query_cache) = result
+        perf.start_frame_monitor()
+        self._set_storage_ready(True)
+        self.update_list()
+
+    def _set_storage_ready(self, ready):
+        self.storage_ready = ready
+        main_screen = self.get_main_screen()
+        if main_screen is None:
+            return
+        for name in ('add_button', 'import_button', 'export_button', 'delete_all_button'):
+            widget = getattr(main_screen.ids, name, None)
+            if widget is not None:
+                widget.disabled = not ready
+
+    def on_pause(self):
+        # Android may kill a paused app without calling on_stop, so the
+        # writes must be on disk before this returns
+        self.flush_store()
+        self.save_aggregates()
+        self.save_search_index()
+        self.save_snapshot()
+        if self.executor is not None:
+            # Wait for the jobs queued here only, and not for long: a big
+            # import queued before them goes on in the background
+            written = threading.Event()
+            self.run_db(written.set)
+            if not written.wait(PAUSE_WRITE_TIMEOUT):
+                Logger.warning("DB: Pause writes still queued after "
+                               f"{PAUSE_WRITE_TIMEOUT:g} s")
+        self.dump_perf_log()
+        return True
+
+    def on_stop(self):
+        # Kivy may dispatch on_stop more than once while shutting down
+        if self.executor is None:
+            return
+        if self._flush_trigger is not None:
+            self._flush_trigger.cancel()
+        if self.refresher is not None:
+            # A late list refresh would otherwise run against the closed store
+            self.refresher.cancel()
+            Logger.info(f"UI: Refreshes {self.refresher.stats()}")
+        self.flush_store()
+        self.save_aggregates()
+        self.save_snapshot()
+        self.save_search_index()
+        # Let queued writes finish before the process exits
+        self.executor.shutdown(wait=True)
+        self.executor = None
+        self.dump_perf_log()
+
+    def dump_perf_log(self):
+        """Append perf histograms to perf.log (only when EXPENSE_TRACKER_PERF is set)."""
+        if not perf.ENABLED:
+            return
+        log_dir = self.user_data_dir if platform == 'android' else self.directory
+        path = os.path.join(log_dir, 'perf.log')
+        try:
+            perf.dump(path)
+            Logger.info(f"Perf: Wrote perf log to: {path}")
+        except Exception as e:
+            Logger.error(f"Perf: Failed to write {path}: {e}")
+
+    def run_db(self, fn, *args, on_done=None, on_error=None):
+        """Run a store operation off the UI thread.
+
+        ``on_done(result)``/``on_error(exc)`` are called back on the UI
+        thread. Without an executor (e.g. when build() was not called in
+        tests) the operation runs inline.
+        """
+        if self.executor is not None:
+            self.executor.submit(fn, *args, on_done=on_done, on_error=on_error)
+            return
+        try:
+            result = fn(*args)
+        except Exception as e:
+            if on_error is None:
+                raise
+            on_error(e)
+        else:
+            if on_done is not None:
+                on_done(result)
+
     def get_main_screen(self):
         """Safely get the main screen"""
         if self.sm is None:
@@ -344,6 +693,7 @@ class ExpenseTrackerApp(MDApp):
             _make_item("Oromoo", 'om', 'OM')
         ]
 
+        from kivymd.uix.menu import MDDropdownMenu
         self.language_menu = MDDropdownMenu(
             caller=main_screen.ids.toolbar.ids.right_actions if hasattr(main_screen.ids.toolbar, 'ids') else main_screen.ids.toolbar,
             items=menu_items,
@@ -356,74 +706,64 @@ class ExpenseTrackerApp(MDApp):
             pass
         self.language_menu.open()
 
+    def show_period_menu(self):
+        main_screen = self.get_main_screen()
+        if main_screen is None:
+            return
+
+        def _make_item(period):
+            return {
+                "text": _(f"period_{period}"),
+                "viewclass": "OneLineListItem",
+                "on_release": lambda x=None, p=period: (self.period_menu.dismiss(), self.set_period(p))
+            }
+
+        from kivymd.uix.menu import MDDropdownMenu
+        self.period_menu = MDDropdownMenu(
+            caller=main_screen.ids.period_button,
+            items=[_make_item(period) for period in PERIODS],
+            width_mult=3,
+        )
+        self.period_menu.open()
+
+    def set_period(self, period):
+        """Filter the list (and its total) to one of ``ledger.PERIODS``."""
+        if period not in PERIODS:
+            raise ValueError(f"Unknown period: {period}")
+        self.period = period
+        # A "select all" must not reach rows the user hasn't seen
+        if self.selection.all:
+            self.selection.clear()
+        main_screen = self.get_main_screen()
+        if main_screen is not None and hasattr(main_screen.ids, 'period_button'):
+            main_screen.ids.period_button.text = _(f"period_{period}")
+        self.update_list()
+
+    def get_translations(self):
+        """Return the TranslationManager for the current localedir."""
+        localedir = getattr(self, 'localedir', None) or os.path.join(self.directory, 'locales')
+        if self.translations is None or self.translations.localedir != localedir:
+            self.translations = TranslationManager(localedir, catalogs=TRANSLATIONS)
+        return self.translations
+
     def load_all_translations(self):
         """Load all translations for the app"""
-        global en_lang, am_lang, om_lang, _
-        global TRANSLATIONS
+        global _
         try:
-            en_lang = gettext.translation(
-                'app', self.localedir, languages=['en'])
-            am_lang = gettext.translation(
-                'app', self.localedir, languages=['am'])
-            om_lang = gettext.translation(
-                'app', self.localedir, languages=['om'])
-
-            # Try to build simple dictionaries from PO files as a reliable
-            # fallback
-            def _parse_po(lang_code):
-                po_path = os.path.join(
-                    self.localedir, lang_code, 'LC_MESSAGES', 'app.po')
-                mapping = {}
-                try:
-                    with open(po_path, 'r', encoding='utf-8') as fh:
-                        lines = fh.readlines()
-                    msgid = None
-                    msgstr = None
-                    for line in lines:
-                        line = line.strip()
-                        if line.startswith('msgid '):
-                            # remove leading msgid and surrounding quotes
-                            msgid = line[6:].strip().strip('"')
-                        elif line.startswith('msgstr '):
-                            msgstr = line[7:].strip().strip('"')
-                            if msgid is not None:
-                                mapping[msgid] = msgstr
-                                msgid = None
-                                msgstr = None
-                except Exception:
-                    # If PO isn't available, leave mapping empty
-                    mapping = {}
-                return mapping
-
-            TRANSLATIONS['en'] = _parse_po('en')
-            TRANSLATIONS['am'] = _parse_po('am')
-            TRANSLATIONS['om'] = _parse_po('om')
-
-            # Prefer gettext objects when they have entries; otherwise use PO
-            # mapping
-            def _gettext_factory(lang_code, gettext_obj):
-                def _t(s):
-                    # Try gettext object first
-                    try:
-                        res = gettext_obj.gettext(s)
-                        if res and res != s:
-                            return res
-                    except Exception:
-                        pass
-                    # Fallback to PO mapping
-                    return TRANSLATIONS.get(lang_code, {}).get(s, s)
-                return _t
-
-            _ = _gettext_factory('en', en_lang)
+            manager = self.get_translations()
+            for lang_code in LANGUAGES:
+                manager.catalog(lang_code)
+            _ = manager.gettext_func('en')
             builtins._ = _
             Logger.info(
                 "Translation: All translation objects loaded successfully.")
         except Exception as e:
             Logger.error(f"Translation: Error in load_all_translations: {e}")
 
+    @perf.timed('set_language')
     def set_language(self, lang_code, button_text):
         """Change the app's language."""
-        global current_language, _, en_lang, am_lang, om_lang
+        global current_language, _
 
         try:
             current_language = lang_code
@@ -436,33 +776,16 @@ class ExpenseTrackerApp(MDApp):
             except Exception as e:
                 Logger.error(f"Translation: Failed to update toolbar title: {e}")
 
-            # Update global translation function using factory
-            def _gettext_factory(lang_code, gettext_obj):
-                def _t(s):
-                    # Try gettext object first
-                    try:
-                        res = gettext_obj.gettext(s)
-                        if res and res != s:
-                            return res
-                    except Exception:
-                        pass
-                    # Fallback to PO mapping
-                    return TRANSLATIONS.get(lang_code, {}).get(s, s)
-                return _t
-
-            # Get the appropriate gettext object
-            lang_obj_map = {'en': en_lang, 'am': am_lang, 'om': om_lang}
-            lang_obj = lang_obj_map.get(lang_code)
-            if lang_obj:
-                _ = _gettext_factory(lang_code, lang_obj)
-            else:
-                _ = lambda s: s
+            # Catalogs are cached after first use, so switching is a dict swap
+            _ = self.get_translations().gettext_func(lang_code)
             builtins._ = _
 
             # Update UI texts if UI is available
             try:
                 if self.root:
                     self.update_ui_texts()
+                    # Row texts are translated too, so rebuild the list
+                    self.update_list()
             except Exception as e:
                 Logger.error(f"Translation: Failed to update UI texts: {e}")
 
@@ -478,7 +801,40 @@ class ExpenseTrackerApp(MDApp):
         # set_language now handles translation updates
         pass
 
+    # -- coalesced refreshes ------------------------------------------------
+
+    def _refresh_passes(self):
+        # In run order: the texts pass asks for the buttons pass
+        return [('texts', self._refresh_texts), ('list', self._refresh_list),
+                ('buttons', self._refresh_buttons)]
+
+    def request_refresh(self, *names):
+        """Flag refresh passes; each runs once on the next Clock tick.
+
+        Without a scheduler (e.g. when build() was not called in tests)
+        the passes run immediately, like ``run_db`` without an executor.
+        """
+        if self.refresher is not None:
+            self.refresher.request(*names)
+            return
+        for name, refresh in self._refresh_passes():
+            if name in names:
+                refresh()
+
     def update_ui_texts(self):
+        """Re-apply the translated texts (on the next tick)."""
+        self.request_refresh('texts')
+
+    def update_list(self):
+        """Rebuild the expense list (on the next tick)."""
+        self.request_refresh('list')
+
+    def update_action_buttons_visibility(self):
+        """Show or hide action buttons (like delete) based on selection state (on the next tick)."""
+        self.request_refresh('buttons')
+
+    @perf.timed('update_ui_texts')
+    def _refresh_texts(self):
         main_screen = self.get_main_screen()
         if main_screen is None:
             return
@@ -497,6 +853,10 @@ class ExpenseTrackerApp(MDApp):
             main_screen.ids.add_button.text = _("add_expense")
             # export and delete buttons are icon-based; no text to update
             main_screen.ids.expense_list_label.text = _("expense_list")
+            if hasattr(main_screen.ids, 'period_button'):
+                main_screen.ids.period_button.text = _(f"period_{self.period}")
+            if hasattr(main_screen.ids, 'search_field'):
+                main_screen.ids.search_field.hint_text = _("search")
 
             # Update total label with current value (use translation key 'total')
             current_text = main_screen.ids.total_label.text
@@ -506,13 +866,14 @@ class ExpenseTrackerApp(MDApp):
                     main_screen.ids.total_label.text = f'{_("total")}: ETB {etb_part}'
                 except BaseException:
                     main_screen.ids.total_label.text = f'{_("total")}: ETB 0.00'
-            else:
+            elif not current_text.startswith('ETB '):
+                # A total shown by the list (or the snapshot) is kept
                 main_screen.ids.total_label.text = f'{_("total")}: ETB 0.00'
         except Exception as e:
             Logger.error(f"Translation: Error updating UI texts overall: {e}")
         # ensure action buttons reflect selection state
         try:
-            self.update_action_buttons_visibility()
+            self.request_refresh('buttons')
         except Exception:
             pass
         except Exception as e:
@@ -520,12 +881,19 @@ class ExpenseTrackerApp(MDApp):
 
     def notify(self, message):
         """Show an in-app notification (Snackbar) and try native notification on Android."""
+        global plyer_notification
         try:
+            from kivymd.uix.snackbar import Snackbar
             Snackbar(text=message, duration=2).open()
         except Exception as e:
             Logger.info(f"Notification: {message} (Snackbar error: {e})")
 
         # Try native notification if available
+        if plyer_notification is None and platform == 'android':
+            try:
+                from plyer import notification as plyer_notification
+            except Exception:
+                plyer_notification = False
         if plyer_notification and platform == 'android':
             try:
                 plyer_notification.notify(
@@ -533,6 +901,7 @@ class ExpenseTrackerApp(MDApp):
             except Exception as e:
                 Logger.error(f"Notification: plyer failed: {e}")
 
+    @perf.timed('add_expense')
     def add_expense(self):
         main_screen = self.get_main_screen()
         if main_screen is None:
@@ -548,6 +917,8 @@ class ExpenseTrackerApp(MDApp):
             msg_key = err_key or 'fill_all_fields'
             error_msg = _(msg_key)
             if not self.dialog:
+                from kivymd.uix.button import MDFlatButton
+                from kivymd.uix.dialog import MDDialog
                 self.dialog = MDDialog(
                     text=error_msg,
                     buttons=[
@@ -561,31 +932,76 @@ class ExpenseTrackerApp(MDApp):
                 self.dialog.open()
             return
 
+        # Reuse the known spelling so "food" and "Food" stay one category
+        if self.category_index is not None:
+            category = self.category_index.canonical(category)
+
         # Add to database with current date
-        try:
-            db.insert({
-                "amount": float(amount),
-                "category": category,
-                "note": note,
-                "date": datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
-            })
+        doc = {
+            "amount_cents": parse_amount_cents(amount),
+            "category": category,
+            "note": note,
+            "date": datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
+        }
+
+        def _added(doc_id):
             # Clear fields
             self.clear_fields()
-            # Update list
-            self.update_list()
+            # Insert just the new row (no full list rebuild)
+            self._insert_row(Document(doc, doc_id))
             # Notify user with success message
             success_msg = f"✓ Added ETB {amount} to {category}"
             self.notify(success_msg)
             Logger.info(f"DB: Expense added - {category}: ETB {amount}")
-        except Exception as e:
+
+        def _failed(e):
             Logger.error(f"DB: Failed to insert expense: {e}")
-            error_dialog = MDDialog(
-                text=f"Error adding expense: {str(e)}",
-                buttons=[
-                    MDFlatButton(
-                        text=_('ok'),
-                        on_release=lambda x: error_dialog.dismiss())])
-            error_dialog.open()
+            self.notify(f"✗ Error adding expense: {e}")
+
+        self.run_db(db.insert, doc, on_done=_added, on_error=_failed)
+
+    def category_suggestions(self, text):
+        """Known categories for what has been typed, best first."""
+        if self.category_index is None or not text.strip():
+            return []
+        suggestions = self.category_index.suggest(text)
+        if suggestions == [text]:
+            return []  # already complete
+        return suggestions
+
+    def on_category_text(self, text):
+        main_screen = self.get_main_screen()
+        if main_screen is None:
+            return
+        field = main_screen.ids.category
+        # Only while typing; programmatic changes (clear, pick) close the menu
+        suggestions = self.category_suggestions(text) if field.focus else []
+        if not suggestions:
+            if self.category_menu is not None:
+                self.category_menu.dismiss()
+            return
+
+        items = [{
+            "text": name,
+            "viewclass": "OneLineListItem",
+            "on_release": lambda x=None, n=name: self.choose_category(n),
+        } for name in suggestions]
+        if self.category_menu is None:
+            from kivymd.uix.menu import MDDropdownMenu
+            self.category_menu = MDDropdownMenu(caller=field, items=items, width_mult=4)
+        else:
+            self.category_menu.items = items
+        if self.category_menu.parent is None:
+            self.category_menu.open()
+        else:
+            self.category_menu.set_menu_properties()
+
+    def choose_category(self, name):
+        if self.category_menu is not None:
+            self.category_menu.dismiss()
+        main_screen = self.get_main_screen()
+        if main_screen is not None:
+            main_screen.ids.category.text = name
 
     def close_dialog(self, instance):
         if self.dialog is not None:
@@ -611,115 +1027,371 @@ class ExpenseTrackerApp(MDApp):
         if main_screen is not None:
             main_screen.ids.amount.focus = True
 
-    def update_list(self):
-        main_screen = self.get_main_screen()
-        if main_screen is None:
+    @perf.timed('update_list')
+    def _refresh_list(self):
+        """Full rebuild of the expense list from the store (the ``list`` pass).
+
+        Only needed at startup, on a language change or on an explicit
+        refresh; single adds/deletes go through ``_insert_row`` and
+        ``_remove_rows`` instead.
+        """
+        if self.get_main_screen() is None or db is None:
             return
+        self._list_generation += 1
+        generation = self._list_generation
+        self._drop_prefetch()
+
+        def on_error(e):
+            Logger.error(f"DB: Failed to load expenses: {e}")
+        # The ledger is only touched on the worker thread, where the store
+        # mutations that maintain it run
+        self.run_db(self._first_page, self.selection.copy(), self.period,
+                    self.search_query, on_done=lambda page: self._show_first_page(generation, page),
+                    on_error=on_error)
+
+    def _first_page(self, selected, period='all', query=''):
+        """Totals for ``period`` and the first page of rows matching ``query`` (runs on the worker)."""
+        start, end = period_range(period)
+        if period != 'all':
+            self._period_total = self._range_total(start, end)
+        else:
+            self._period_total = None
+            if self.aggregates is None:
+                self._list_total = self._range_total(start, end)
+        return self._fetch_page(None, selected, period, query)
+
+    def _range_total(self, start, end):
+        if self.query_cache is not None:
+            return self.query_cache.total(start, end)
+        return sum(expense_cents(d) for chunk in iter_chunks(db) for d in chunk
+                   if _in_period(d, start, end))
+
+    def _fetch_page(self, cursor, selected, period='all', query='', limit=None):
+        """Rows of the page after ``cursor`` as ``(rows, cursor, has_more)`` (runs on the worker).
+
+        The ledger's date index answers a page (of any period) in
+        O(log n + limit) and the search index does the same for a query;
+        without them the store's own page API is filtered.
+        """
+        limit = limit or LIST_PAGE_SIZE
+        start, end = period_range(period)
+        if not tokenize(query):
+            query = ''  # e.g. only punctuation: nothing to filter on
+        if query and self.search_index is not None and self.ledger is not None:
+            doc_ids = self.search_index.search(query, limit + 1, cursor, start, end)
+            docs = [d for d in map(self.ledger.get, doc_ids) if d is not None]
+        elif self.ledger is not None and not query:
+            docs = self.ledger.after(cursor, limit + 1, start, end)
+        else:
+            # Not through the query cache: a large view doesn't fit its
+            # budget and would be rebuilt and sorted for every page
+            docs = []
+            after = cursor
+            while len(docs) <= limit:
+                chunk = page_after(db, after, limit + 1)
+                if not chunk:
+                    break
+                after = chunk[-1]
+                docs.extend(d for d in chunk
+                            if _in_period(d, start, end) and (not query or matches(d, query)))
+        has_more = len(docs) > limit
+        docs = docs[:limit]
+        rows = [self._make_row(doc, selected) for doc in docs]
+        return rows, (docs[-1] if docs else cursor), has_more
+
+    def _show_first_page(self, generation, page):
+        if generation != self._list_generation:
+            return
+        rows, self._page_cursor, self._has_more = page
+        self._show_rows(rows)
+        self._prefetch_next()
+
+    def _drop_prefetch(self):
+        self._page_generation += 1
+        self._prefetched = None
+        self._prefetching = None
+
+    def _prefetch_next(self):
+        """Fetch the page after the last shown row in the background."""
+        if (not self._has_more or db is None or self._prefetched is not None
+                or self._prefetching == self._page_generation):
+            return
+        generation = self._prefetching = self._page_generation
 
-        main_screen.ids.expense_list.clear_widgets()
-        total = 0
-        count = 0
+        def _done(page):
+            if generation != self._page_generation:
+                return
+            self._prefetching = None
+            self._prefetched = page
+            if self._want_more:
+                self.load_more()
+
+        def _failed(e):
+            if generation == self._page_generation:
+                self._prefetching = None
+            Logger.error(f"DB: Failed to load expenses: {e}")
+        self.run_db(self._fetch_page, self._page_cursor, self.selection.copy(),
+                    self.period, self.search_query, on_done=_done, on_error=_failed)
+
+    def on_search_text(self, text):
+        """Filter the list as the user types in the search box."""
+        # A query without any word (e.g. ".") filters nothing
+        query = text.strip() if tokenize(text) else ''
+        if query == self.search_query:
+            return
+        self.search_query = query
+        if self.selection.all:
+            self.selection.clear()
+        self.update_list()
 
-        expenses = db.all()
-        if not expenses:
-            # Show no expenses message
-            item = OneLineListItem(text=_("no_expenses"))
-            main_screen.ids.expense_list.add_widget(item)
-        else:
-            # Sort expenses by date (newest first), handling cases where date
-            # might be missing
-            try:
-                expenses.sort(key=lambda x: x.get('date', ''), reverse=True)
-            except BaseException:
-                pass  # If sorting fails, continue with unsorted list
-
-            for e in expenses:
-                # e may be a Document which contains a doc_id attribute
-                doc_id = getattr(e, 'doc_id', None)
-                total += e["amount"]
-                count += 1
-                # Format the display text
-                amount_text = f"ETB {e['amount']:.2f}"
-                category_text = e['category']
-
-                # Handle date field (for existing expenses that might not have
-                # date)
-                date_text = e.get('date', 'Unknown date')
-                if e["note"]:
-                    secondary_text = f"{e['note']} - {date_text}"
-                else:
-                    secondary_text = date_text
+    def on_list_scroll(self, scroll_y):
+        if self._has_more and scroll_y <= LOAD_MORE_AT:
+            self.load_more()
 
-                # Create list item
-                item = TwoLineListItem(
-                    text=f"{amount_text} - {category_text}",
-                    secondary_text=secondary_text
-                )
-                # Show selection prefix if selected
-                try:
-                    prefix = "[x] " if doc_id in (
-                        self.selected_ids or set()) else ""
-                    item.text = f"{prefix}{amount_text} - {category_text}"
-                except Exception:
-                    pass
-                # Bind tap to toggle selection for multi-select
-                try:
-                    def _toggle(instance, did=doc_id):
-                        self.toggle_select(did, instance)
-                    item.bind(on_release=_toggle)
-                except Exception:
-                    pass
-                main_screen.ids.expense_list.add_widget(item)
+    def load_more(self):
+        """Append the next (prefetched) page of rows to the list."""
+        main_screen = self.get_main_screen()
+        if main_screen is None or not self._has_more or self._rows_by_id is None:
+            return
+        if self._prefetched is None:
+            self._want_more = True
+            self._prefetch_next()
+            return
+        self._want_more = False
+        rows, self._page_cursor, self._has_more = self._prefetched
+        self._prefetched = None
+        # The selection may have changed while the page was fetched
+        selected = self.selection
+        rows = [r for r in rows if r['doc_id'] not in self._rows_by_id]
+        for row in rows:
+            row['selected'] = row['doc_id'] in selected
+            self._rows_by_id[row['doc_id']] = row
+        expense_list = main_screen.ids.expense_list
+        self._keep_scroll_offset(expense_list, len(rows))
+        expense_list.data.extend(rows)
+        self._after_rows_changed(main_screen)
+        self._prefetch_next()
+
+    def _keep_scroll_offset(self, expense_list, added):
+        """Rescale ``scroll_y`` so appending ``added`` rows doesn't move the view."""
+        layout = getattr(expense_list, 'layout_manager', None)
+        if layout is None or not added:
+            return
+        content, view = layout.height, expense_list.height
+        grown = content + added * layout.default_size[1]
+        if content <= view or grown <= view:
+            return
+        offset = (1.0 - expense_list.scroll_y) * (content - view)
+        expense_list.scroll_y = 1.0 - offset / (grown - view)
 
-        # Update total label with new format
-        main_screen.ids.total_label.text = f'ETB {total:.2f}'
+    @perf.timed('update_list.populate')
+    def _show_rows(self, rows):
+        main_screen = self.get_main_screen()
+        if main_screen is None:
+            return
+        self._set_rows(main_screen, rows)
+
+        if self.startup is not None:
+            self.startup.mark('list')
+            Logger.info(f"Startup: {self.startup.summary()}")
+            self.startup = None
+        # Refresh the snapshot after a full rebuild (startup reconcile,
+        # import, ...) in case the app is killed before on_pause/on_stop
+        self.save_snapshot()
+
+    def _make_row(self, e, selected=()):
+        """Build the RecycleView row dict for one expense document."""
+        # e may be a Document which contains a doc_id attribute
+        doc_id = getattr(e, 'doc_id', None)
+        # Format the display text
+        amount_text = f"ETB {format_cents(expense_cents(e))}"
+        category_text = e['category']
+
+        # Handle date field (for existing expenses that might not have date)
+        date_text = e.get('date', 'Unknown date')
+        if e.get("note"):
+            secondary_text = f"{e['note']} - {date_text}"
+        else:
+            secondary_text = date_text
+
+        # Rows are plain dicts; ExpenseRow widgets are only created for the
+        # visible part of the list and recycled on scroll.
+        return {
+            'doc_id': doc_id,
+            'base_text': f"{amount_text} - {category_text}",
+            'secondary_text': secondary_text,
+            'date': e.get('date', ''),
+            'selected': doc_id in selected,
+        }
+
+    def _set_rows(self, main_screen, rows):
+        if not rows:
+            # Show no expenses message
+            rows = [{
+                'doc_id': None,
+                'base_text': _("no_expenses"),
+                'secondary_text': '',
+                'date': '',
+                'selected': False,
+            }]
+        expense_list = main_screen.ids.expense_list
+        expense_list.data = rows
+        # Index the displayed dicts: Kivy ignores a list equal to the current one
+        self._rows_by_id = {r['doc_id']: r for r in expense_list.data if r['doc_id'] is not None}
+        self._after_rows_changed(main_screen)
+
+    def _insert_row(self, doc):
+        """Insert a single new expense into the list without a rebuild."""
+        self.selection.added(doc.doc_id)
+        main_screen = self.get_main_screen()
+        if main_screen is None:
+            return
+        if (self.aggregates is None or self._rows_by_id is None or self.period != 'all'
+                or self.search_query):
+            return self.update_list()
+
+        row = self._make_row(doc, self.selection)
+        data = main_screen.ids.expense_list.data
+        if not self._rows_by_id:
+            self._set_rows(main_screen, [row])
+            return
+        # New expenses are normally the newest, so this scan stops at the top
+        pos = 0
+        while pos < len(data) and data[pos]['date'] > row['date']:
+            pos += 1
+        if pos == len(data) and self._has_more:
+            # Older than every loaded row: it comes with a later page
+            self._drop_prefetch()
+            self._prefetch_next()
+            self._after_rows_changed(main_screen)
+            return
+        data.insert(pos, row)
+        self._rows_by_id[row['doc_id']] = row
+        self._after_rows_changed(main_screen)
 
-        # Update select-all checkbox state
+    def _remove_rows(self, doc_ids):
+        """Drop the rows for ``doc_ids`` from the list without a rebuild."""
+        self.selection.discard(doc_ids)
+        main_screen = self.get_main_screen()
+        if main_screen is None:
+            return
+        if (self.aggregates is None or self._rows_by_id is None or self.period != 'all'
+                or self.search_query):
+            return self.update_list()
+
+        doc_ids = set(doc_ids)
+        for doc_id in doc_ids:
+            self._rows_by_id.pop(doc_id, None)
+        # The prefetched page may hold some of them
+        self._drop_prefetch()
+        if not self._rows_by_id:
+            if self._has_more:
+                return self.update_list()
+            self._set_rows(main_screen, [])
+            return
+        self._prefetch_next()
+        data = main_screen.ids.expense_list.data
+        if len(doc_ids) == 1:
+            (doc_id,) = doc_ids
+            for pos, row in enumerate(data):
+                if row['doc_id'] == doc_id:
+                    del data[pos]
+                    break
+        else:
+            # RecycleView can't dispatch a whole-slice assignment
+            main_screen.ids.expense_list.data = [r for r in data if r['doc_id'] not in doc_ids]
+        self._after_rows_changed(main_screen)
+
+    def _clear_rows(self):
+        """Empty the list after the store was truncated, without reading it again."""
+        self._list_generation += 1  # drop first pages still in flight
+        self._drop_prefetch()
+        self._page_cursor = None
+        self._has_more = False
+        self._list_total = 0
+        if self._period_total is not None:
+            self._period_total = 0
+        main_screen = self.get_main_screen()
+        if main_screen is not None:
+            self._set_rows(main_screen, [])
+        self.selection.clear()
+
+    def _after_rows_changed(self, main_screen):
+        self._snapshot_dirty = True
+        # Update total label with new format; the aggregates already applied
+        # the delta of the write that changed the rows.
+        if self._period_total is not None:
+            total = self._period_total
+        elif self.aggregates is not None:
+            total = self.aggregates.total
+        else:
+            total = self._list_total
+        main_screen.ids.total_label.text = f'ETB {format_cents(total)}'
+
+        self._update_select_all_checkbox(main_screen)
+        # Ensure buttons visibility updated after list refresh
         try:
-            all_doc_ids = set(getattr(d, 'doc_id', None) for d in expenses if getattr(d, 'doc_id', None) is not None)
-            if hasattr(main_screen.ids, 'select_all_checkbox'):
-                main_screen.ids.select_all_checkbox.active = (all_doc_ids and all_doc_ids == (self.selected_ids or set()))
+            self.update_action_buttons_visibility()
         except Exception:
             pass
 
-        # Ensure buttons visibility updated after list refresh
+    def _update_select_all_checkbox(self, main_screen):
         try:
-            self.update_action_buttons_visibility()
+            if hasattr(main_screen.ids, 'select_all_checkbox'):
+                main_screen.ids.select_all_checkbox.active = (
+                    self.selection.all and not self.selection.ids)
         except Exception:
             pass
 
-    def toggle_select(self, doc_id, instance=None):
-        """Toggle selection for a given document id and update the visual prefix."""
-        if self.selected_ids is None:
-            self.selected_ids = set()
-        if doc_id in self.selected_ids:
-            self.selected_ids.remove(doc_id)
-            # update instance text to remove prefix
-            try:
-                if instance and instance.text.startswith('[x] '):
-                    instance.text = instance.text[4:]
-            except Exception:
-                pass
+    def _expense_count(self):
+        if self.aggregates is not None:
+            return self.aggregates.count
+        return len(self._rows_by_id or ())
+
+    def _repaint_selection(self, changed):
+        """Re-apply the selection to the loaded rows whose state changed.
+
+        ``changed`` holds the doc ids that flipped, or is None when the
+        whole selection was replaced. Rows are recycled, so the state lives
+        in the row dicts and one refresh re-applies the visible ones.
+        """
+        main_screen = self.get_main_screen()
+        if main_screen is None:
+            return
+        rows = self._rows_by_id or {}
+        if changed is None:
+            candidates = rows.items()
         else:
-            self.selected_ids.add(doc_id)
+            candidates = ((doc_id, rows.get(doc_id)) for doc_id in changed)
+        selection = self.selection
+        repaint = False
+        for doc_id, row in candidates:
+            if row is not None and row['selected'] != (doc_id in selection):
+                row['selected'] = not row['selected']
+                repaint = True
+        if repaint:
             try:
-                if instance and not instance.text.startswith('[x] '):
-                    instance.text = '[x] ' + instance.text
+                main_screen.ids.expense_list.refresh_from_data()
             except Exception:
                 pass
-        # Update action button visibility when selection changes
+        self._update_select_all_checkbox(main_screen)
         try:
             self.update_action_buttons_visibility()
         except Exception:
             pass
 
-    def update_action_buttons_visibility(self):
-        """Show or hide action buttons (like delete) based on selection state."""
+    def toggle_select(self, doc_id, instance=None):
+        """Toggle selection for a given document id (the row repaints itself)."""
+        if doc_id is None:
+            return
+        self.selection.toggle(doc_id)
+
+    def _refresh_buttons(self):
         main_screen = self.get_main_screen()
         if main_screen is None:
             return
         try:
-            has_selection = bool(self.selected_ids)
+            has_selection = not self.selection.is_empty(self._expense_count())
             # Delete selected button visible only when there are selections
             main_screen.ids.delete_selected_button.disabled = not has_selection
             main_screen.ids.delete_selected_button.opacity = 1.0 if has_selection else 0.0
@@ -728,58 +1400,100 @@ class ExpenseTrackerApp(MDApp):
 
     def toggle_select_all(self, checkbox_instance, value):
         """Select or deselect all expenses when the 'Select All' checkbox is toggled."""
-        main_screen = self.get_main_screen()
-        if main_screen is None:
-            return
         try:
+            # O(1) on the model; only the loaded rows that flip repaint
             if value:
-                # select all doc_ids
-                all_docs = db.all()
-                self.selected_ids = set(getattr(d, 'doc_id', None) for d in all_docs if getattr(d, 'doc_id', None) is not None)
+                self.selection.select_all()
             else:
-                self.selected_ids = set()
-            # refresh list display so prefixes update
-            self.update_list()
-            self.update_action_buttons_visibility()
+                self.selection.clear()
         except Exception as e:
             Logger.error(f"UI: toggle_select_all failed: {e}")
 
+    def _view_doc_ids(self, period='all', query=''):
+        """Doc ids of the expenses the list shows for ``period`` and ``query`` (runs on the worker)."""
+        start, end = period_range(period)
+        if not tokenize(query):
+            query = ''
+        if query and self.search_index is not None:
+            return set(self.search_index.search(query, len(db), None, start, end))
+        if not query and self.query_cache is not None:
+            return self.query_cache.doc_ids(start, end)
+        if not query and self.ledger is not None:
+            return {d.doc_id for d in self.ledger.iter_range(start, end)}
+        return {d.doc_id for chunk in iter_chunks(db) for d in chunk
+                if _in_period(d, start, end) and (not query or matches(d, query))}
+
+    def _selected_doc_ids(self, selection, period='all', query=''):
+        """Sorted ids of ``selection`` among the expenses in view (runs on the worker).
+
+        "Select all" only covers the expenses the period filter and the
+        search query let through.
+        """
+        return sorted(selection.resolve(self._view_doc_ids(period, query)))
+
+    def _remove_expenses(self, selection, period='all', query=''):
+        """Remove the expenses of ``selection`` in view in one write (runs on the worker).
+
+        Returns the removed ids, or None when they were every expense and
+        the store was truncated instead.
+        """
+        doc_ids = self._selected_doc_ids(selection, period, query)
+        if doc_ids and len(doc_ids) == len(db):
+            db.truncate()
+            return None
+        return db.remove_many(doc_ids)
+
     def delete_selected(self):
         """Delete all selected expenses with confirmation dialog."""
-        if not self.selected_ids:
+        if self.selection.is_empty(self._expense_count()):
             self.notify("ℹ️ No expenses selected. Tap on expenses to select them.")
             return
-        
-        count = len(self.selected_ids)
-        
-        def _confirm_delete(instance):
-            try:
-                # remove by doc_ids
-                db.remove(doc_ids=list(self.selected_ids))
-                self.selected_ids.clear()
-                self.update_list()
+        # The filter decides what "select all" covers, so count on the worker
+        selection, period, query = self.selection.copy(), self.period, self.search_query
+
+        def _failed(e):
+            Logger.error(f"DB: delete_selected failed: {e}")
+            self.notify(f"✗ Error deleting expenses: {e}")
+
+        def _confirm(doc_ids):
+            count = len(doc_ids)
+            if not count:
+                self.notify("ℹ️ No expenses selected. Tap on expenses to select them.")
+                return
+
+            def _deleted(removed):
+                self.selection.clear()
+                if removed is None:
+                    self._clear_rows()
+                else:
+                    self._remove_rows(removed)
                 self.notify(f"✓ Deleted {count} expense(s)")
                 Logger.info(f"DB: Deleted {count} selected expense(s)")
-            except Exception as e:
-                Logger.error(f"DB: delete_selected failed: {e}")
-                self.notify(f"✗ Error deleting expenses: {e}")
-            finally:
+
+            def _confirm_delete(instance):
                 confirm_dialog.dismiss()
+                self.run_db(self._remove_expenses, selection, period, query,
+                            on_done=_deleted, on_error=_failed)
 
-        confirm_dialog = MDDialog(
-            text=f"Delete {count} selected expense(s)? This cannot be undone.",
-            buttons=[
-                MDFlatButton(
-                    text="Yes, Delete",
-                    on_release=_confirm_delete
-                ),
-                MDFlatButton(
-                    text="Cancel",
-                    on_release=lambda x: confirm_dialog.dismiss()
-                )
-            ]
-        )
-        confirm_dialog.open()
+            from kivymd.uix.button import MDFlatButton
+            from kivymd.uix.dialog import MDDialog
+            confirm_dialog = MDDialog(
+                text=f"Delete {count} selected expense(s)? This cannot be undone.",
+                buttons=[
+                    MDFlatButton(
+                        text="Yes, Delete",
+                        on_release=_confirm_delete
+                    ),
+                    MDFlatButton(
+                        text="Cancel",
+                        on_release=lambda x: confirm_dialog.dismiss()
+                    )
+                ]
+            )
+            confirm_dialog.open()
+
+        self.run_db(self._selected_doc_ids, selection, period, query,
+                    on_done=_confirm, on_error=_failed)
 
     def confirm_delete(self, doc_id):
         """Show confirmation dialog before deleting a single expense."""
@@ -787,17 +1501,21 @@ class ExpenseTrackerApp(MDApp):
             self.notify("✗ Unable to identify this expense for deletion.")
             return
 
+        def _deleted(removed):
+            self._remove_rows(removed)
+            self.notify("✓ Expense deleted")
+            Logger.info(f"DB: Single expense deleted (id: {doc_id})")
+
+        def _failed(e):
+            Logger.error(f"DB: delete failed: {e}")
+            self.notify(f"✗ Failed to delete: {e}")
+
         def _do_delete(instance):
-            try:
-                db.remove(doc_ids=[doc_id])
-                self.update_list()
-                self.notify("✓ Expense deleted")
-                Logger.info(f"DB: Single expense deleted (id: {doc_id})")
-            except Exception as e:
-                Logger.error(f"DB: delete failed: {e}")
-                self.notify(f"✗ Failed to delete: {e}")
             d.dismiss()
+            self.run_db(db.remove, None, [doc_id], on_done=_deleted, on_error=_failed)
 
+        from kivymd.uix.button import MDFlatButton
+        from kivymd.uix.dialog import MDDialog
         d = MDDialog(
             text="Are you sure you want to delete this expense?",
             buttons=[
@@ -824,6 +1542,8 @@ class ExpenseTrackerApp(MDApp):
                 self.notify(f"✗ Error: {e}")
                 d.dismiss()
 
+        from kivymd.uix.button import MDFlatButton
+        from kivymd.uix.dialog import MDDialog
         d = MDDialog(
             text="⚠️  Delete ALL expenses? This action cannot be undone and will permanently remove all data.",
             buttons=[
@@ -840,48 +1560,100 @@ class ExpenseTrackerApp(MDApp):
         d.open()
 
     def clear_database(self):
-        try:
-            docs = db.all()
-            doc_ids = [
-                getattr(
-                    d,
-                    'doc_id',
-                    None) for d in docs if getattr(
-                    d,
-                    'doc_id',
-                    None) is not None]
-            if doc_ids:
-                try:
-                    db.remove(doc_ids=doc_ids)
-                except Exception:
-                    # Fallback: remove by iterating
-                    for did in doc_ids:
-                        try:
-                            db.remove(doc_ids=[did])
-                        except Exception:
-                            pass
-            self.update_list()
-            self.notify(f"✓ Database cleared ({len(doc_ids)} expenses deleted)")
-            Logger.info(f"DB: Database cleared - removed {len(doc_ids)} expenses")
-        except Exception as e:
+        def _clear():
+            # One write; the derived structures reset on the on_clear event
+            count = len(db)
+            db.truncate()
+            return count
+
+        def _cleared(count):
+            self._clear_rows()
+            self.notify(f"✓ Database cleared ({count} expenses deleted)")
+            Logger.info(f"DB: Database cleared - removed {count} expenses")
+
+        def _failed(e):
             Logger.error(f"DB: clear failed: {e}")
             self.notify(f"✗ Failed to clear database: {e}")
 
-    def export_database(self):
-        try:
-            data = db.all()
-            if not data:
+        self.run_db(_clear, on_done=_cleared, on_error=_failed)
+
+    @perf.timed('export_database')
+    def export_database(self, fmt='csv', compress=False):
+        """Export every expense in the background as CSV or JSON Lines.
+
+        Records are streamed to ``<data dir>/exports`` in chunks; progress is
+        reported through notify() in 25% steps.
+        """
+        export_dir = os.path.join(self.data_dir or self.directory, 'exports')
+        fname = os.path.join(export_dir, export_filename(fmt, compress))
+        reported = [0]
+
+        def _progress(done, total):
+            step = (done * 4) // total if total else 4
+            if 0 < step < 4 and step > reported[0]:
+                reported[0] = step
+                Clock.schedule_once(
+                    lambda dt, pct=step * 25: self.notify(f"Exporting… {pct}%"), 0)
+
+        @perf.timed('export_database.worker')
+        def _export():
+            if not len(db):
+                return 0
+            os.makedirs(export_dir, exist_ok=True)
+            return export_expenses(db, fname, fmt=fmt, compress=compress, progress=_progress)
+
+        def _exported(count):
+            if not count:
                 self.notify("ℹ️ No data to export")
                 return
-            fname = f"expenses_export_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-            with open(fname, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-            self.notify(f"✓ Exported {len(data)} expense(s) to {fname}")
-            Logger.info(f"DB: Exported {len(data)} expenses to {fname}")
-        except Exception as e:
+            self.notify(f"✓ Exported {count} expense(s) to {fname}")
+            Logger.info(f"DB: Exported {count} expenses to {fname}")
+
+        def _failed(e):
             Logger.error(f"Export failed: {e}")
             self.notify(f"✗ Export failed: {e}")
 
+        self.run_db(_export, on_done=_exported, on_error=_failed)
+
+    def choose_import_file(self):
+        """Let the user pick a CSV/JSON statement and import it."""
+        try:
+            from plyer import filechooser
+        except Exception:
+            filechooser = None
+
+        def _selected(selection):
+            if selection:
+                Clock.schedule_once(lambda dt: self.import_file(selection[0]), 0)
+
+        try:
+            filechooser.open_file(
+                on_selection=_selected,
+                filters=[["Statements", "*.csv", "*.json", "*.jsonl", "*.ndjson"]])
+        except Exception as e:
+            Logger.error(f"Import: file chooser unavailable: {e}")
+            self.notify(f"✗ Import failed: {e}")
+
+    def import_file(self, path):
+        """Bulk-import expenses from ``path`` on the DB worker thread."""
+        def _imported(result):
+            # A "select all" must not reach the new rows
+            if self.selection.all:
+                self.selection.clear()
+            # Many rows may have arrived at once: rebuild the list
+            self.update_list()
+            self.notify(
+                f"✓ Imported {result.imported} expense(s), skipped "
+                f"{result.duplicates} duplicate(s) and {result.invalid} invalid row(s)")
+            Logger.info(f"DB: Import of {path} finished: {result}")
+
+        def _failed(e):
+            Logger.error(f"Import failed: {e}")
+            self.notify(f"✗ Import failed: {e}")
+
+        self.notify("Importing…")
+        self.run_db(import_expenses, db, path, on_done=_imported, on_error=_failed)
+
 
 if __name__ == "__main__":
     ExpenseTrackerApp().run()
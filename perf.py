@@ -0,0 +1,190 @@
+"""Opt-in hot-path instrumentation.
+
+Set ``EXPENSE_TRACKER_PERF=1`` to time the app's hot paths, every store
+call and Kivy frame intervals. Timings are aggregated into log-scale
+histograms and appended as one JSON line per dump to ``perf.log`` (next to
+``startup_error.log``).
+
+When the variable is not set, ``timed`` returns the decorated function
+itself and ``instrument_store`` returns the store unchanged, so the
+instrumentation costs nothing.
+"""
+
+import datetime
+import json
+import math
+import os
+import threading
+import time
+
+ENABLED = os.environ.get('EXPENSE_TRACKER_PERF', '').lower() not in ('', '0', 'false', 'no')
+
+# Histogram bucket i holds samples below 2**i * BASE_MS (the last is open-ended)
+BASE_MS = 0.125
+BUCKETS = 20
+
+_lock = threading.Lock()
+_histograms = {}
+
+
+class Histogram:
+    """Log2-bucketed latency histogram in milliseconds."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.buckets = [0] * BUCKETS
+
+    def record(self, ms):
+        self.count += 1
+        self.total += ms
+        self.min = ms if self.min is None else min(self.min, ms)
+        self.max = ms if self.max is None else max(self.max, ms)
+        idx = 0 if ms <= BASE_MS else int(math.ceil(math.log2(ms / BASE_MS)))
+        self.buckets[min(idx, BUCKETS - 1)] += 1
+
+    def percentile(self, pct):
+        """Upper bound of the bucket that holds the ``pct`` percentile."""
+        if not self.count:
+            return None
+        target = self.count * pct / 100.0
+        seen = 0
+        for idx, n in enumerate(self.buckets):
+            seen += n
+            if seen >= target:
+                return min(BASE_MS * (2 ** idx), self.max)
+        return self.max
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'total_ms': round(self.total, 3),
+            'mean_ms': round(self.total / self.count, 3) if self.count else None,
+            'min_ms': None if self.min is None else round(self.min, 3),
+            'max_ms': None if self.max is None else round(self.max, 3),
+            'p50_ms': self.percentile(50),
+            'p95_ms': self.percentile(95),
+            'buckets': {f"<={BASE_MS * 2 ** i:g}ms": n for i, n in enumerate(self.buckets) if n},
+        }
+
+
+def record(name, ms):
+    """Add one ``ms`` sample to the histogram called ``name``."""
+    with _lock:
+        hist = _histograms.get(name)
+        if hist is None:
+            hist = _histograms[name] = Histogram()
+        hist.record(ms)
+
+
+def timed(name, enabled=None):
+    """Decorator recording the wall time of each call under ``name``.
+
+    Returns ``fn`` untouched when instrumentation is disabled.
+    """
+    if not (ENABLED if enabled is None else enabled):
+        return lambda fn: fn
+
+    def decorator(fn):
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(name, (time.perf_counter() - start) * 1000.0)
+        wrapper.__name__ = getattr(fn, '__name__', name)
+        wrapper.__doc__ = getattr(fn, '__doc__', None)
+        wrapper.__wrapped__ = fn
+        return wrapper
+    return decorator
+
+
+class StageTimer:
+    """Wall-clock breakdown of consecutive stages, e.g. app start-up.
+
+    ``mark(stage)`` closes the stage that began at the previous mark (or at
+    ``start``). Stages are recorded as ``<name>.<stage>`` histograms when
+    instrumentation is enabled.
+    """
+
+    def __init__(self, name, start=None):
+        self.name = name
+        self.start = self.last = time.perf_counter() if start is None else start
+        self.stages = []
+
+    def mark(self, stage):
+        now = time.perf_counter()
+        ms = (now - self.last) * 1000.0
+        self.last = now
+        self.stages.append((stage, ms))
+        if ENABLED:
+            record(f"{self.name}.{stage}", ms)
+        return ms
+
+    @property
+    def total_ms(self):
+        return (self.last - self.start) * 1000.0
+
+    def summary(self):
+        parts = [f"{stage}={ms:.1f}ms" for stage, ms in self.stages]
+        parts.append(f"total={self.total_ms:.1f}ms")
+        return ' '.join(parts)
+
+
+class InstrumentedStore:
+    """Store proxy that times every method call as ``db.<method>``."""
+
+    def __init__(self, store):
+        self._store = store
+
+    def __getattr__(self, name):
+        attr = getattr(self._store, name)
+        if not callable(attr):
+            return attr
+        return timed(f"db.{name}", enabled=True)(attr)
+
+    def __len__(self):
+        start = time.perf_counter()
+        try:
+            return len(self._store)
+        finally:
+            record('db.__len__', (time.perf_counter() - start) * 1000.0)
+
+
+def instrument_store(store, enabled=None):
+    if not (ENABLED if enabled is None else enabled):
+        return store
+    return InstrumentedStore(store)
+
+
+def start_frame_monitor():
+    """Record Kivy frame intervals under ``frame`` (no-op when disabled)."""
+    if not ENABLED:
+        return None
+    from kivy.clock import Clock
+    return Clock.schedule_interval(lambda dt: record('frame', dt * 1000.0), 0)
+
+
+def snapshot():
+    with _lock:
+        return {name: h.to_dict() for name, h in sorted(_histograms.items())}
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+
+
+def dump(path):
+    """Append the current histograms to ``path`` as one JSON line."""
+    if not ENABLED:
+        return False
+    entry = {
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'histograms': snapshot(),
+    }
+    with open(path, 'a', encoding='utf-8') as fh:
+        fh.write(json.dumps(entry, ensure_ascii=False) + '\n')
+    return True
@@ -0,0 +1,205 @@
+"""Read cache in front of the store, keyed by a write generation.
+
+One user action can ask the same question several times (select all, then
+rebuild the list; a period total, then the same total again after a
+language change). ``QueryCache`` answers the repeated reads from memory:
+
+* ``sorted_view(start, end)``: Documents newest first,
+* ``doc_ids(start, end)``: a frozenset of doc ids,
+* ``total(start, end)``: the sum in cents,
+
+each for the rows with ``start <= timestamp < end`` (``None`` for no bound).
+Results come from the ledger's columns when there is one and from a chunked
+scan of the store otherwise.
+
+Every store mutation bumps ``generation`` and drops the cached results, so a
+result is only ever served for the generation it was computed in. Code that
+changes what a query means without a store write calls ``invalidate()``;
+``add_hook(fn)`` registers ``fn(generation)`` to run after each invalidation.
+Memory is bounded by ``max_items`` (documents or ids held across all entries,
+least recently used evicted first). A result larger than the whole budget is
+computed but not kept, so on ledgers above ``MAX_ITEMS`` rows an unbounded
+``sorted_view()`` or ``doc_ids()`` costs a full read every time; the list
+pages through the ledger or the store's own page API instead, and only asks
+the cache for totals and the id sets of bulk actions. Like the store, the
+cache is only used on the DB worker.
+"""
+
+from collections import OrderedDict
+
+from ledger import document_key, to_timestamp
+from storage import StoreObserver, iter_chunks, order_key
+from utils import expense_cents
+
+# Documents/ids held across all cached results
+MAX_ITEMS = 50000
+# Results cached at most (totals are small, but keep the dict short)
+MAX_ENTRIES = 64
+
+
+def _in_range(doc, start, end):
+    if start is None and end is None:
+        return True
+    ts = to_timestamp(doc.get('date'))
+    if ts is None:
+        return False
+    return (start is None or start <= ts) and (end is None or ts < end)
+
+
+class QueryCache(StoreObserver):
+    """Memoizes store queries until the next write."""
+
+    def __init__(self, store=None, ledger=None, max_items=MAX_ITEMS,
+                 max_entries=MAX_ENTRIES):
+        self.store = store
+        self.ledger = ledger
+        self.max_items = max_items
+        self.max_entries = max_entries
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (result, size)
+        self._items = 0
+        self._hooks = []
+
+    def __len__(self):
+        return len(self._entries)
+
+    def attach(self, store, ledger=None):
+        """Serve queries on ``store`` (through ``ledger`` when given) and follow its writes."""
+        self.store = store
+        self.ledger = ledger
+        self.invalidate()
+        store.subscribe(self)
+        return self
+
+    # -- invalidation -----------------------------------------------------
+
+    def add_hook(self, hook):
+        """Call ``hook(generation)`` after every invalidation."""
+        self._hooks.append(hook)
+
+    def remove_hook(self, hook):
+        self._hooks.remove(hook)
+
+    def _drop(self):
+        self.generation += 1
+        self._entries.clear()
+        self._items = 0
+
+    def invalidate(self):
+        """Drop every cached result and run the hooks."""
+        self._drop()
+        for hook in list(self._hooks):
+            hook(self.generation)
+
+    def on_insert(self, doc):
+        self._drop()
+
+    def on_update(self, old_doc, new_doc):
+        self._drop()
+
+    def on_remove(self, doc):
+        self._drop()
+
+    def on_clear(self):
+        self._drop()
+
+    def on_commit(self):
+        # Events already dropped the results; hooks run once per store call
+        self.invalidate()
+
+    # -- memoization ------------------------------------------------------
+
+    def cached(self, key, compute, size=len):
+        """Return the result of ``compute()`` for ``key`` in this generation.
+
+        ``size(result)`` counts against ``max_items``; results larger than
+        the whole budget are returned without being cached.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+        self.misses += 1
+        generation = self.generation
+        result = compute()
+        if generation != self.generation:
+            return result  # a write landed meanwhile
+        weight = size(result) if size else 0
+        if weight > self.max_items:
+            return result
+        self._entries[key] = (result, weight)
+        self._items += weight
+        while self._items > self.max_items or len(self._entries) > self.max_entries:
+            _, (_, dropped) = self._entries.popitem(last=False)
+            self._items -= dropped
+        return result
+
+    # -- queries ----------------------------------------------------------
+
+    def _scan(self, start, end):
+        return (doc for chunk in iter_chunks(self.store) for doc in chunk
+                if _in_range(doc, start, end))
+
+    def sorted_view(self, start=None, end=None):
+        """Tuple of the Documents in ``[start, end)``, newest first."""
+        def compute():
+            if self.ledger is not None:
+                return tuple(self.ledger.iter_range(start, end))
+            return tuple(sorted(self._scan(start, end),
+                                key=lambda d: order_key(d.doc_id, d), reverse=True))
+        return self.cached(('sorted', start, end), compute)
+
+    def doc_ids(self, start=None, end=None):
+        """Frozenset of the doc ids in ``[start, end)``."""
+        def compute():
+            if self.ledger is not None:
+                if start is None and end is None:
+                    return frozenset(self.ledger.doc_ids())
+                return frozenset(d.doc_id for d in self.ledger.iter_range(start, end))
+            return frozenset(d.doc_id for d in self._scan(start, end))
+        return self.cached(('ids', start, end), compute)
+
+    def _view_key(self, doc):
+        # The order of sorted_view(): the ledger's, or the store's page order
+        if self.ledger is not None:
+            return document_key(doc)
+        return order_key(doc.doc_id, doc)
+
+    def after(self, cursor, limit, start=None, end=None, where=None):
+        """Up to ``limit`` Documents of ``sorted_view`` after ``cursor`` (keyset paging).
+
+        ``cursor`` is the last Document of the previous page (None for the
+        first page); ``where(doc)`` optionally filters the rows. Each page
+        reads ``sorted_view``, so this only pays off for views that fit
+        ``max_items``.
+        """
+        view = self.sorted_view(start, end)
+        lo = 0
+        if cursor is not None:
+            # The view is newest first: find the first key below the cursor's
+            key, hi = self._view_key(cursor), len(view)
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if self._view_key(view[mid]) < key:
+                    hi = mid
+                else:
+                    lo = mid + 1
+        found = []
+        for pos in range(lo, len(view)):
+            doc = view[pos]
+            if where is None or where(doc):
+                found.append(doc)
+                if len(found) >= limit:
+                    break
+        return found
+
+    def total(self, start=None, end=None):
+        """Sum in cents of the amounts in ``[start, end)``."""
+        def compute():
+            if self.ledger is not None:
+                return self.ledger.range_total(start, end)
+            return sum(expense_cents(d) for d in self._scan(start, end))
+        return self.cached(('total', start, end), compute, size=None)
@@ -0,0 +1,74 @@
+"""Coalesced UI refreshes.
+
+One user action can ask for the same refresh several times (a language
+change rebuilds the texts, which refresh the action buttons, and then the
+list, which refreshes them again). ``RefreshScheduler`` turns each request
+into a dirty flag and runs every flagged pass once, in declaration order,
+on the next Clock tick, so a frame's requests collapse into one batched
+pass. Counters record how many requests were coalesced.
+"""
+
+from collections import Counter
+
+from kivy.clock import Clock
+from kivy.logger import Logger
+
+
+class RefreshScheduler:
+    """Runs each requested refresh pass at most once per Clock tick.
+
+    ``passes`` is a sequence of ``(name, callback)`` pairs; flagged passes
+    run in that order, so a pass may request a later one (the texts pass
+    asks for the buttons) and still land in the same batch. A request for a
+    pass that already ran in the current batch schedules another batch.
+    ``create_trigger`` defaults to ``Clock.create_trigger`` (tests pass
+    their own).
+    """
+
+    def __init__(self, passes, create_trigger=None):
+        self.passes = list(passes)
+        self.dirty = set()
+        self.requested = Counter()  # requests per pass
+        self.coalesced = Counter()  # requests folded into an already flagged pass
+        self.runs = Counter()  # passes actually run
+        self.batches = 0
+        self._trigger = (create_trigger or Clock.create_trigger)(self._run, 0)
+
+    def request(self, *names):
+        for name in names:
+            self.requested[name] += 1
+            if name in self.dirty:
+                self.coalesced[name] += 1
+            else:
+                self.dirty.add(name)
+        self._trigger()
+
+    def flush(self):
+        """Run the flagged passes now instead of on the next tick."""
+        self._trigger.cancel()
+        self._run()
+
+    def cancel(self):
+        self._trigger.cancel()
+        self.dirty.clear()
+
+    def _run(self, dt=None):
+        if not self.dirty:
+            return
+        self.batches += 1
+        for name, callback in self.passes:
+            if name not in self.dirty:
+                continue
+            self.dirty.discard(name)
+            self.runs[name] += 1
+            try:
+                callback()
+            except Exception as e:
+                Logger.error(f"UI: Refresh pass {name} failed: {e}")
+
+    def stats(self):
+        """``{name: {'requested', 'coalesced', 'runs'}}`` plus the batch count."""
+        stats = {name: {'requested': self.requested[name], 'coalesced': self.coalesced[name],
+                        'runs': self.runs[name]} for name, _ in self.passes}
+        stats['batches'] = self.batches
+        return stats
@@ -0,0 +1,295 @@
+"""Search-as-you-type index over expense notes and categories.
+
+``SearchIndex`` is an inverted index: every token of a record's ``category``
+and ``note`` maps to a sorted ``array`` of the records' ``ledger.index_key``
+(date, then doc_id). Because postings are in list order, the newest matches
+are at the end of each array and a page of results is read without sorting.
+A sorted vocabulary doubles as the prefix index, so "tax" finds "taxi".
+
+The index follows the store through ``StoreObserver`` events and is
+persisted next to it (a ``marshal`` dump, like the translation catalogs).
+Saving the whole index on every write would cost more than the write, so
+the file is dropped on the first change after a save and written again by
+``save()`` (the app calls it on pause and stop); a missing file means a
+rebuild at the next start. The file also records the newest record it
+indexed, so an index saved for other records with the same ids (e.g.
+before a truncate) is rebuilt rather than trusted.
+"""
+
+import heapq
+import marshal
+import os
+import re
+from array import array
+from bisect import bisect_left
+
+from ledger import ID_BITS, ID_MASK, document_key
+from storage import StoreObserver, iter_chunks
+
+# Bump when the persisted layout changes
+FORMAT = 2
+
+# Word characters of any script (Ethiopic included), lower-cased
+_TOKEN_RE = re.compile(r'\w+')
+
+# Bulk removals above this size filter a posting list in one pass
+BULK_DISCARD = 32
+
+
+def search_path_for(db_path):
+    """Return the search index path that sits next to ``expenses.json``."""
+    return os.path.splitext(db_path)[0] + '.search'
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall(str(text or '').casefold())
+
+
+def document_tokens(doc):
+    return set(tokenize(doc.get('category'))) | set(tokenize(doc.get('note')))
+
+
+def matches(doc, query):
+    """True when every term of ``query`` is a prefix of a token of ``doc``."""
+    tokens = document_tokens(doc)
+    return all(any(t.startswith(term) for t in tokens) for term in tokenize(query))
+
+
+def _contains(postings, key):
+    pos = bisect_left(postings, key)
+    return pos < len(postings) and postings[pos] == key
+
+
+def _newest_first(postings, lo_key, hi_key):
+    """Keys of ``postings`` in ``[lo_key, hi_key)``, newest first."""
+    lo = 0 if lo_key is None else bisect_left(postings, lo_key)
+    hi = len(postings) if hi_key is None else bisect_left(postings, hi_key)
+    for pos in range(hi - 1, lo - 1, -1):
+        yield postings[pos]
+
+
+class SearchIndex(StoreObserver):
+    """Token -> sorted index keys, plus a sorted vocabulary for prefixes."""
+
+    def __init__(self, path=None):
+        self.path = path
+        self.reset()
+
+    def reset(self):
+        self.postings = {}
+        self.vocabulary = []  # sorted tokens: the prefix index
+        self.count = 0
+        self.dirty = False
+        self._pending = {}  # token -> keys removed until the next commit
+        self.last = None  # (doc_id, key, tokens) of the newest record, as loaded
+
+    # -- maintenance ------------------------------------------------------
+
+    def _add(self, doc):
+        key = document_key(doc)
+        for token in document_tokens(doc):
+            postings = self.postings.get(token)
+            if postings is None:
+                postings = self.postings[token] = array('q')
+                self.vocabulary.insert(bisect_left(self.vocabulary, token), token)
+            if not postings or postings[-1] < key:
+                postings.append(key)  # the usual case: the newest expense
+            else:
+                postings.insert(bisect_left(postings, key), key)
+        self.count += 1
+
+    def _discard(self, token, keys):
+        postings = self.postings.get(token)
+        if postings is None:
+            return
+        if len(keys) <= BULK_DISCARD:
+            for key in keys:
+                pos = bisect_left(postings, key)
+                if pos < len(postings) and postings[pos] == key:
+                    del postings[pos]
+        else:
+            postings = self.postings[token] = array('q', (k for k in postings if k not in keys))
+        if not postings:
+            del self.postings[token]
+            del self.vocabulary[bisect_left(self.vocabulary, token)]
+
+    def _flush_removals(self):
+        pending, self._pending = self._pending, {}
+        for token, keys in pending.items():
+            self._discard(token, keys)
+
+    def rebuild(self, docs):
+        self.reset()
+        for doc in docs:
+            self._add(doc)
+        self.dirty = True
+
+    # -- StoreObserver hooks ----------------------------------------------
+
+    def on_insert(self, doc):
+        self._add(doc)
+
+    def on_update(self, old_doc, new_doc):
+        self._flush_removals()
+        key = document_key(old_doc)
+        for token in document_tokens(old_doc):
+            self._discard(token, {key})
+        self.count -= 1
+        self._add(new_doc)
+
+    def on_remove(self, doc):
+        # Postings are filtered once per token at commit
+        key = document_key(doc)
+        for token in document_tokens(doc):
+            self._pending.setdefault(token, set()).add(key)
+        self.count -= 1
+
+    def on_clear(self):
+        self.reset()
+        self.dirty = True
+        # Doc ids start over, so the old file could pass for the new records
+        self._drop_file()
+
+    def on_commit(self):
+        self._flush_removals()
+        if not self.dirty:
+            self.dirty = True
+            # The saved file no longer matches; a crash before the next
+            # save() then means a rebuild instead of wrong results
+            self._drop_file()
+
+    def _drop_file(self):
+        if self.path:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+    # -- queries ----------------------------------------------------------
+
+    def _prefix_postings(self, term):
+        vocabulary = self.vocabulary
+        pos = bisect_left(vocabulary, term)
+        found = []
+        while pos < len(vocabulary) and vocabulary[pos].startswith(term):
+            found.append(self.postings[vocabulary[pos]])
+            pos += 1
+        return found
+
+    def search(self, query, limit, cursor=None, start=None, end=None):
+        """Doc ids of the newest ``limit`` matches of ``query``, or None for no terms.
+
+        Every term must be a prefix of a token of the note or category.
+        ``cursor`` (the last Document of the previous page) and the
+        ``start``/``end`` timestamps bound the results like ``Ledger.after``.
+        """
+        self._flush_removals()
+        terms = tokenize(query)
+        if not terms:
+            return None
+        lo_key = None if start is None else start << ID_BITS
+        hi_key = None if end is None else end << ID_BITS
+        if cursor is not None:
+            key = document_key(cursor)
+            hi_key = key if hi_key is None else min(hi_key, key)
+
+        per_term = [self._prefix_postings(term) for term in terms]
+        if not all(per_term):
+            return []
+        # Walk the rarest term newest first and probe the others
+        per_term.sort(key=lambda lists: sum(len(p) for p in lists))
+        driver, others = per_term[0], per_term[1:]
+        merged = heapq.merge(*(_newest_first(p, lo_key, hi_key) for p in driver),
+                             reverse=True)
+        found = []
+        last = None
+        for key in merged:
+            if key == last:
+                continue  # the same record under two tokens of the prefix
+            last = key
+            if all(any(_contains(p, key) for p in lists) for lists in others):
+                found.append(key & ID_MASK)
+                if len(found) >= limit:
+                    break
+        return found
+
+    # -- persistence ------------------------------------------------------
+
+    def _newest_record(self):
+        """``(doc_id, key, tokens)`` of the highest doc_id indexed, or None."""
+        key = max((k for p in self.postings.values() for k in p),
+                  key=lambda k: k & ID_MASK, default=None)
+        if key is None:
+            return None
+        tokens = sorted(t for t, p in self.postings.items() if _contains(p, key))
+        return key & ID_MASK, key, tokens
+
+    def _matches(self, store):
+        """Whether the loaded index describes the records of ``store``."""
+        if self.count != len(store):
+            return False
+        if self.last is None:
+            return self.count == 0
+        doc_id, key, tokens = self.last
+        doc = store.get(doc_id=doc_id)
+        return (doc is not None and store.get(doc_id=doc_id + 1) is None
+                and document_key(doc) == key and sorted(document_tokens(doc)) == tokens)
+
+    def save(self):
+        """Write the index if it changed since it was loaded or last saved."""
+        if not self.path or not self.dirty:
+            return False
+        self._flush_removals()
+        payload = {
+            'format': FORMAT,
+            'count': self.count,
+            'last': self._newest_record(),
+            'postings': {token: p.tobytes() for token, p in self.postings.items()},
+        }
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'wb') as fh:
+            marshal.dump(payload, fh)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+        return True
+
+    def load(self):
+        """Load the persisted index. Returns False when there is nothing usable."""
+        if not self.path:
+            return False
+        try:
+            with open(self.path, 'rb') as fh:
+                payload = marshal.load(fh)
+            if not isinstance(payload, dict) or payload.get('format') != FORMAT:
+                raise ValueError('outdated search index')
+            postings = {}
+            for token, raw in payload['postings'].items():
+                postings[token] = array('q')
+                postings[token].frombytes(raw)
+            count = int(payload['count'])
+            last = payload['last']
+            if last is not None:
+                doc_id, key, tokens = last
+                last = int(doc_id), int(key), list(tokens)
+        except (OSError, EOFError, ValueError, KeyError, TypeError):
+            self.reset()
+            return False
+        self.reset()
+        self.postings = postings
+        self.vocabulary = sorted(postings)
+        self.count = count
+        self.last = last
+        return True
+
+    def attach(self, store):
+        """Load the persisted index for ``store`` and subscribe to its mutations.
+
+        The index is rebuilt with a chunked scan when the file is missing,
+        its record count doesn't match ``len(store)`` or its newest record
+        isn't the store's.
+        """
+        if not self.load() or not self._matches(store):
+            self.rebuild(doc for chunk in iter_chunks(store) for doc in chunk)
+            self.save()
+        store.subscribe(self)
+        return self
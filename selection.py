@@ -0,0 +1,94 @@
+"""Which expenses are selected, independent of the list widgets.
+
+``SelectionModel`` is either a set of selected doc ids or, after "select
+all", a flag plus the ids deselected since. Selecting everything is then
+O(1) however large the ledger is, and new expenses added afterwards stay
+unselected.
+
+Views subscribe with ``bind(callback)`` and get ``callback(changed)``
+after every change: the doc ids whose state flipped, or ``None`` when the
+whole selection was replaced (select all, clear). Bulk actions take a
+``copy()`` to the DB worker and ``resolve()`` it there against the ids in
+the store. The model itself belongs to the UI thread.
+"""
+
+
+class SelectionModel:
+    """A set of doc ids, or every doc id minus exclusions."""
+
+    def __init__(self, all_selected=False, ids=()):
+        self.all = all_selected
+        self.ids = set(ids)  # selected ids, or excluded ones when ``all``
+        self._callbacks = []
+
+    def __contains__(self, doc_id):
+        return (doc_id in self.ids) != self.all
+
+    def is_selected(self, doc_id):
+        return doc_id in self
+
+    def count(self, total):
+        """Number of selected expenses out of ``total``."""
+        return max(total - len(self.ids), 0) if self.all else len(self.ids)
+
+    def is_empty(self, total):
+        return self.count(total) == 0
+
+    def copy(self):
+        """Detached copy (no callbacks), e.g. to hand to the DB worker."""
+        return SelectionModel(self.all, self.ids)
+
+    def resolve(self, all_ids):
+        """The selected ids as a set, given every id in the store."""
+        if self.all:
+            return set(all_ids) - self.ids
+        return self.ids & set(all_ids)
+
+    # -- observers --------------------------------------------------------
+
+    def bind(self, callback):
+        self._callbacks.append(callback)
+
+    def unbind(self, callback):
+        self._callbacks.remove(callback)
+
+    def _changed(self, changed):
+        for callback in list(self._callbacks):
+            callback(changed)
+
+    # -- changes ----------------------------------------------------------
+
+    def toggle(self, doc_id):
+        """Flip one expense; returns whether it is selected now."""
+        if doc_id in self.ids:
+            self.ids.remove(doc_id)
+        else:
+            self.ids.add(doc_id)
+        self._changed((doc_id,))
+        return doc_id in self
+
+    def select_all(self):
+        self.all = True
+        self.ids = set()
+        self._changed(None)
+
+    def clear(self):
+        self.all = False
+        self.ids = set()
+        self._changed(None)
+
+    def added(self, doc_id):
+        """Keep an expense added after "select all" out of the selection."""
+        if self.all:
+            self.ids.add(doc_id)
+
+    def discard(self, doc_ids):
+        """Forget expenses that were removed from the store."""
+        if self.all:
+            # Their exclusions are moot once they are gone
+            self.ids.difference_update(doc_ids)
+            return
+        changed = [d for d in doc_ids if d in self.ids]
+        if changed:
+            self.ids.difference_update(changed)
+            self._changed(changed)
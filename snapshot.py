@@ -0,0 +1,58 @@
+"""Start-up snapshot of what the first screen shows.
+
+A small JSON file next to ``expenses.json`` holds the grand total, the
+per-category totals and the newest rows, already formatted as list rows.
+``build()`` renders it straight away; the real store is opened in the
+background and the list is reconciled against it once loaded, so the first
+paint costs the same no matter how long the history is.
+"""
+
+import json
+import os
+
+# Newest rows kept in the snapshot: about two screens of the list
+SNAPSHOT_ROWS = 50
+# Bump when the snapshot layout changes (2: totals in integer cents)
+SNAPSHOT_FORMAT = 2
+
+# Row dict keys that are saved (selection state is not)
+ROW_FIELDS = ('doc_id', 'base_text', 'secondary_text', 'date')
+
+
+def snapshot_path_for(db_path):
+    """Return the snapshot file path that sits next to ``expenses.json``."""
+    return os.path.splitext(db_path)[0] + '.snapshot.json'
+
+
+def save_snapshot(path, rows, total, count, by_category=None, limit=SNAPSHOT_ROWS):
+    """Atomically write the newest ``limit`` of ``rows`` plus the totals (in cents)."""
+    data = {
+        'format': SNAPSHOT_FORMAT,
+        'total': total,
+        'count': count,
+        'by_category': dict(by_category or {}),
+        'rows': [{k: r.get(k) for k in ROW_FIELDS}
+                 for r in rows[:limit] if r.get('doc_id') is not None],
+    }
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as fh:
+        json.dump(data, fh, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+
+def load_snapshot(path):
+    """Return the snapshot dict, or None when missing, unreadable or outdated."""
+    try:
+        with open(path, 'r', encoding='utf-8') as fh:
+            data = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get('format') != SNAPSHOT_FORMAT:
+        return None
+    try:
+        data['total'] = int(data['total'])
+        data['count'] = int(data['count'])
+        data['rows'] = [dict(r, selected=False) for r in data['rows']]
+    except (KeyError, TypeError, ValueError):
+        return None
+    return data
@@ -0,0 +1,225 @@
+"""SQLite-backed expense store.
+
+Implements the same TinyDB-like surface as the engines in ``storage.py``
+(``all``, ``insert``, ``remove(doc_ids=...)``, ``update``, ``page``,
+``after``) and adds indexed queries by date range and by category. Select
+it with ``EXPENSE_TRACKER_STORE=sqlite``.
+"""
+
+import json
+import sqlite3
+
+from tinydb.table import Document
+
+from storage import load_tinydb_file
+
+# Fields that get their own column; anything else is kept in ``extra``.
+# ``amount`` holds the float amounts of records not yet migrated to
+# ``amount_cents`` (see ``storage.migrate_amounts_to_cents``).
+COLUMNS = ('amount', 'amount_cents', 'category', 'note', 'date')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS expenses (
+    id INTEGER PRIMARY KEY,
+    amount REAL,
+    amount_cents INTEGER,
+    category TEXT,
+    note TEXT,
+    date TEXT,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_expenses_date ON expenses (date);
+CREATE INDEX IF NOT EXISTS idx_expenses_category_date ON expenses (category, date);
+"""
+
+
+def _to_row(doc):
+    extra = {k: v for k, v in doc.items() if k not in COLUMNS}
+    return tuple(doc.get(c) for c in COLUMNS) + (
+        json.dumps(extra, ensure_ascii=False) if extra else None,)
+
+
+def _to_document(row):
+    doc_id, values, extra = row[0], row[1:1 + len(COLUMNS)], row[-1]
+    doc = {c: v for c, v in zip(COLUMNS, values) if v is not None}
+    if extra:
+        doc.update(json.loads(extra))
+    return Document(doc, doc_id)
+
+
+_SELECT = f"SELECT id, {', '.join(COLUMNS)}, extra FROM expenses"
+_INSERT = (f"INSERT INTO expenses ({', '.join(COLUMNS)}, extra) "
+           f"VALUES ({', '.join('?' * (len(COLUMNS) + 1))})")
+_INSERT_WITH_ID = (f"INSERT INTO expenses (id, {', '.join(COLUMNS)}, extra) "
+                   f"VALUES ({', '.join('?' * (len(COLUMNS) + 2))})")
+_NEWEST_FIRST = " ORDER BY date DESC, id DESC"
+_UPDATE = f"UPDATE expenses SET {', '.join(c + ' = ?' for c in COLUMNS)}, extra = ? WHERE id = ?"
+
+
+class SQLiteStore:
+    """Expense store on top of the standard library ``sqlite3`` module.
+
+    Every mutating call runs in its own transaction, so a batch insert or a
+    multi-row delete is a single atomic write.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        # The app drives the store from its single DB worker thread, which
+        # is not the thread that opened the connection.
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._upgrade_schema()
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def _upgrade_schema(self):
+        # Databases created before amount_cents existed
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(expenses)")}
+        if columns and 'amount_cents' not in columns:
+            self._conn.execute("ALTER TABLE expenses ADD COLUMN amount_cents INTEGER")
+
+    # -- TinyDB-like API --------------------------------------------------
+
+    def all(self):
+        return [_to_document(r) for r in self._conn.execute(_SELECT + " ORDER BY id")]
+
+    def get(self, cond=None, doc_id=None, doc_ids=None):
+        if doc_ids is not None:
+            return [d for d in (self.get(doc_id=i) for i in doc_ids) if d is not None]
+        if doc_id is None:
+            found = self.search(cond)
+            return found[0] if found else None
+        row = self._conn.execute(_SELECT + " WHERE id = ?", (int(doc_id),)).fetchone()
+        return _to_document(row) if row else None
+
+    def search(self, cond):
+        return [d for d in self.all() if cond(d)]
+
+    def iter_chunks(self, chunk_size):
+        """Yield documents in id order, ``chunk_size`` at a time."""
+        cur = self._conn.execute(_SELECT + " ORDER BY id")
+        while True:
+            rows = cur.fetchmany(chunk_size)
+            if not rows:
+                return
+            yield [_to_document(r) for r in rows]
+
+    def page(self, offset, limit):
+        """Return ``limit`` documents, newest first, skipping the ``offset`` newest.
+
+        OFFSET still walks the skipped rows; ``after`` seeks straight to them.
+        """
+        rows = self._conn.execute(_SELECT + _NEWEST_FIRST + " LIMIT ? OFFSET ?",
+                                  (limit, offset))
+        return [_to_document(r) for r in rows]
+
+    def after(self, cursor, limit):
+        """Return the ``limit`` newest documents older than ``cursor`` (a Document).
+
+        Seeks on the date index; rows without a date come last.
+        """
+        if cursor is None:
+            return self.page(0, limit)
+        date, doc_id = cursor.get('date'), cursor.doc_id
+        docs = []
+        if date is not None:
+            rows = self._conn.execute(
+                _SELECT + " WHERE date <= ? AND (date < ? OR id < ?)" + _NEWEST_FIRST
+                + " LIMIT ?", (date, date, doc_id, limit))
+            docs = [_to_document(r) for r in rows]
+            doc_id = None
+        if len(docs) < limit:
+            where = " WHERE date IS NULL" + ("" if doc_id is None else " AND id < ?")
+            params = () if doc_id is None else (doc_id,)
+            rows = self._conn.execute(_SELECT + where + " ORDER BY id DESC LIMIT ?",
+                                      params + (limit - len(docs),))
+            docs.extend(_to_document(r) for r in rows)
+        return docs
+
+    def insert(self, document):
+        return self.insert_multiple([document])[0]
+
+    def insert_multiple(self, documents):
+        doc_ids = []
+        with self._conn:
+            for document in documents:
+                cur = self._conn.execute(_INSERT, _to_row(document))
+                doc_ids.append(cur.lastrowid)
+        return doc_ids
+
+    def _select_docs(self, cond=None, doc_ids=None):
+        if doc_ids is not None:
+            return self.get(doc_ids=doc_ids)
+        if cond is not None:
+            return self.search(cond)
+        raise RuntimeError('You have to pass either cond or doc_ids')
+
+    def update(self, fields, cond=None, doc_ids=None):
+        docs = self._select_docs(cond, doc_ids)
+        with self._conn:
+            for doc in docs:
+                new_doc = dict(doc)
+                if callable(fields):
+                    fields(new_doc)
+                else:
+                    new_doc.update(fields)
+                self._conn.execute(_UPDATE, _to_row(new_doc) + (doc.doc_id,))
+        return [d.doc_id for d in docs]
+
+    def remove(self, cond=None, doc_ids=None):
+        removed = [d.doc_id for d in self._select_docs(cond, doc_ids)]
+        with self._conn:
+            self._conn.executemany(
+                "DELETE FROM expenses WHERE id = ?", [(i,) for i in removed])
+        return removed
+
+    def truncate(self):
+        with self._conn:
+            self._conn.execute("DELETE FROM expenses")
+
+    def close(self):
+        self._conn.close()
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM expenses").fetchone()[0]
+
+    # -- indexed queries --------------------------------------------------
+
+    def _query(self, clauses, params, start, end):
+        if start is not None:
+            clauses.append("date >= ?")
+            params.append(start)
+        if end is not None:
+            clauses.append("date < ?")
+            params.append(end)
+        where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+        sql = _SELECT + where + _NEWEST_FIRST
+        return [_to_document(r) for r in self._conn.execute(sql, params)]
+
+    def by_date_range(self, start=None, end=None):
+        """Return expenses with ``start <= date < end``, newest first.
+
+        Bounds are ``"%Y-%m-%d %H:%M"`` strings (a prefix such as
+        ``"2025-11"`` works too); ``None`` leaves that side open.
+        """
+        return self._query([], [], start, end)
+
+    def by_category(self, category, start=None, end=None):
+        """Return expenses in ``category`` (optionally within a date range), newest first."""
+        return self._query(["category = ?"], [category], start, end)
+
+
+def import_tinydb(store, tinydb_path):
+    """One-shot import of a TinyDB ``expenses.json`` into an empty ``store``.
+
+    Original doc ids are preserved. Returns the number of imported expenses;
+    nothing is imported when the store already holds data.
+    """
+    if len(store):
+        return 0
+    docs = load_tinydb_file(tinydb_path)
+    with store._conn:
+        store._conn.executemany(
+            _INSERT_WITH_ID,
+            [(doc_id,) + _to_row(doc) for doc_id, doc in docs.items()])
+    return len(docs)
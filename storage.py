@@ -0,0 +1,744 @@
+"""Storage engines behind the module-level ``db`` in ``main.py``.
+
+The app only relies on a small TinyDB-like surface: ``all()``, ``insert()``,
+``remove(doc_ids=...)`` and ``update(fields, doc_ids=...)``. Every engine in
+this module implements that surface and returns ``tinydb.table.Document``
+objects so callers can keep using ``doc.doc_id``.
+
+Engines also offer windowed reads in list order (newest first):
+``page(offset, limit)`` and ``after(cursor, limit)``, where ``cursor`` is the
+last document of the previous page. Use the module-level ``page`` and
+``page_after`` helpers to get a fallback for engines without them.
+
+Opened with ``write_behind=True``, engines buffer durability work and
+``flush_store`` completes it: the journal defers its fsync and TinyDB keeps
+its data in ``WriteBehindMiddleware``. The app flushes on a short timer
+(group commit) and on pause/stop; ``close()`` always flushes.
+"""
+
+import json
+import os
+from bisect import bisect_left
+
+from tinydb import TinyDB
+from tinydb.middlewares import CachingMiddleware
+from tinydb.storages import Storage
+from tinydb.table import Document
+
+from utils import expense_cents
+
+# Engine used when EXPENSE_TRACKER_STORE is not set
+DEFAULT_ENGINE = 'journal'
+
+# Compact the journal once it holds this many superseded records *and*
+# more dead records than live ones.
+COMPACT_MIN_GARBAGE = 1000
+
+# Default number of documents per chunk for iter_chunks()
+DEFAULT_CHUNK_SIZE = 500
+
+
+def order_key(doc_id, doc):
+    """Sort key of the list order: date string, then doc_id (missing dates first)."""
+    date = doc.get('date')
+    return (date if isinstance(date, str) else '', doc_id)
+
+
+class DateOrder:
+    """Sorted ``order_key`` of every document of an in-memory engine.
+
+    Built on the first page read and kept up to date by the engine on each
+    write after that, so a page costs O(log n + limit) instead of sorting
+    the whole store.
+    """
+
+    # Bulk discards above this size rebuild the list in one pass
+    BULK_DISCARD = 32
+
+    def __init__(self, docs=None):
+        self.keys = sorted(order_key(doc_id, doc) for doc_id, doc in (docs or {}).items())
+
+    def __len__(self):
+        return len(self.keys)
+
+    def clear(self):
+        self.keys = []
+
+    def add(self, key):
+        if not self.keys or self.keys[-1] < key:
+            self.keys.append(key)  # the usual case: the newest expense
+        else:
+            self.keys.insert(bisect_left(self.keys, key), key)
+
+    def discard(self, key):
+        pos = bisect_left(self.keys, key)
+        if pos < len(self.keys) and self.keys[pos] == key:
+            del self.keys[pos]
+
+    def discard_many(self, keys):
+        if len(keys) <= self.BULK_DISCARD:
+            for key in keys:
+                self.discard(key)
+        else:
+            dropped = set(keys)
+            self.keys = [k for k in self.keys if k not in dropped]
+
+    def page(self, offset, limit):
+        """Doc ids of the ``limit`` documents after the newest ``offset``."""
+        hi = max(len(self.keys) - offset, 0)
+        return [k[1] for k in reversed(self.keys[max(hi - limit, 0):hi])]
+
+    def after(self, cursor_key, limit):
+        """Doc ids of the ``limit`` documents older than ``cursor_key``."""
+        hi = len(self.keys) if cursor_key is None else bisect_left(self.keys, cursor_key)
+        return [k[1] for k in reversed(self.keys[max(hi - limit, 0):hi])]
+
+
+def _cursor_key(cursor):
+    return None if cursor is None else order_key(cursor.doc_id, cursor)
+
+
+def _journal_path_for(db_path):
+    """Return the journal path that sits next to ``expenses.json``."""
+    return os.path.splitext(db_path)[0] + '.journal'
+
+
+def load_tinydb_file(path):
+    """Read a TinyDB JSON file and return ``{doc_id: doc}`` for its default table."""
+    try:
+        with open(path, 'r', encoding='utf-8') as fh:
+            raw = fh.read()
+    except OSError:
+        return {}
+    if not raw.strip():
+        return {}
+    data = json.loads(raw)
+    table = data.get('_default', {}) if isinstance(data, dict) else {}
+    return {int(k): dict(v) for k, v in table.items()}
+
+
+class AtomicJSONStorage(Storage):
+    """TinyDB JSON storage that replaces the file atomically.
+
+    Each write goes to a temp file that is fsynced and then renamed over
+    ``path``, so a crash mid-write leaves the previous ``expenses.json``
+    instead of a torn one.
+    """
+
+    def __init__(self, path, **kwargs):
+        self.path = path
+        self.kwargs = kwargs  # passed on to json.dump
+
+    def read(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as fh:
+                raw = fh.read()
+        except FileNotFoundError:
+            return None
+        return json.loads(raw) if raw.strip() else None
+
+    def write(self, data):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as fh:
+            json.dump(data, fh, **self.kwargs)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp_path, self.path)
+
+    def close(self):
+        pass
+
+
+class WriteBehindMiddleware(CachingMiddleware):
+    """TinyDB middleware that keeps writes in memory until ``flush()``.
+
+    A burst of writes then costs one file rewrite instead of one each.
+    ``WRITE_CACHE_SIZE`` only bounds how much can pile up between flushes.
+    """
+
+    WRITE_CACHE_SIZE = 1000
+
+    @property
+    def pending(self):
+        """Writes buffered since the last flush."""
+        return self._cache_modified_count
+
+
+class JournalStore:
+    """Append-only journal storage.
+
+    Each write appends one JSON line to the journal instead of rewriting the
+    whole database, so inserting costs O(record) bytes regardless of how many
+    expenses exist. The journal is replayed into memory on open and compacted
+    (rewritten atomically) once superseded records pile up.
+
+    In memory the documents live in a ``ledger.Ledger`` (``self.ledger``),
+    which also gives the list order for ``page``/``after``; the app reads
+    through that ledger instead of keeping a copy of its own.
+
+    With ``deferred_sync`` appends still reach the file at once (a crash of
+    the app loses nothing) but the fsync waits for ``flush()``, so several
+    quick writes share one.
+
+    Journal lines look like::
+
+        {"op": "put", "id": 3, "doc": {...}}
+        {"op": "del", "ids": [1, 2]}
+    """
+
+    def __init__(self, path, legacy_path=None, deferred_sync=False):
+        self.path = path
+        self.deferred_sync = deferred_sync
+        self._unsynced = 0  # appends not fsynced yet
+        # Imported here: ledger builds on this module's StoreObserver
+        from ledger import Ledger
+        self.ledger = Ledger()
+        self._next_id = 1
+        self._garbage = 0
+        self._handle = None
+
+        if not os.path.exists(path) and legacy_path and os.path.exists(legacy_path):
+            self._migrate(legacy_path)
+        self._replay()
+        if self._should_compact():
+            self.compact()
+        self._open_handle()
+
+    # -- journal plumbing -------------------------------------------------
+
+    def _migrate(self, legacy_path):
+        """Seed the journal from an existing TinyDB ``expenses.json``."""
+        docs = load_tinydb_file(legacy_path)
+        self._write_compacted(Document(doc, doc_id) for doc_id, doc in docs.items())
+
+    def _replay(self):
+        self._garbage = 0
+        if not os.path.exists(self.path):
+            self.ledger.clear()
+            return
+        # The dicts only live until the ledger is loaded from them
+        docs = {}
+        good_offset = 0
+        with open(self.path, 'rb') as fh:
+            for raw in fh:
+                if not raw.endswith(b'\n'):
+                    # Torn trailing write (e.g. power loss); drop it below.
+                    break
+                try:
+                    self._apply(docs, json.loads(raw.decode('utf-8')))
+                except ValueError:
+                    break
+                good_offset += len(raw)
+        if good_offset != os.path.getsize(self.path):
+            with open(self.path, 'r+b') as fh:
+                fh.truncate(good_offset)
+        self._next_id = max(docs, default=0) + 1
+        self.ledger.load(Document(doc, doc_id) for doc_id, doc in docs.items())
+
+    def _apply(self, docs, entry):
+        op = entry.get('op')
+        if op == 'put':
+            doc_id = int(entry['id'])
+            if doc_id in docs:
+                self._garbage += 1
+            docs[doc_id] = entry['doc']
+        elif op == 'del':
+            for doc_id in entry.get('ids', []):
+                if docs.pop(int(doc_id), None) is not None:
+                    self._garbage += 2
+
+    def _open_handle(self):
+        self._handle = open(self.path, 'a', encoding='utf-8')
+
+    def _append(self, entries):
+        """Append journal entries with a single write (and fsync unless deferred)."""
+        if not entries:
+            return
+        payload = ''.join(
+            json.dumps(e, ensure_ascii=False, separators=(',', ':')) + '\n'
+            for e in entries)
+        self._handle.write(payload)
+        self._handle.flush()
+        self._unsynced += 1
+        if not self.deferred_sync:
+            self.flush()
+
+    def flush(self):
+        """fsync the appends made since the last flush; returns how many there were."""
+        synced, self._unsynced = self._unsynced, 0
+        if synced and self._handle is not None:
+            os.fsync(self._handle.fileno())
+        return synced
+
+    def _should_compact(self):
+        return (self._garbage >= COMPACT_MIN_GARBAGE
+                and self._garbage > len(self.ledger))
+
+    def _write_compacted(self, docs):
+        """Replace the journal with one ``put`` per Document of ``docs``."""
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as fh:
+            for doc in docs:
+                fh.write(json.dumps({'op': 'put', 'id': doc.doc_id, 'doc': doc},
+                                    ensure_ascii=False, separators=(',', ':')) + '\n')
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp_path, self.path)
+
+    def compact(self):
+        """Rewrite the journal so it only contains live documents."""
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+        # The rewrite is fsynced, which covers any deferred appends
+        self._unsynced = 0
+        self._write_compacted(self.ledger.iter_documents())
+        self._garbage = 0
+        self._open_handle()
+
+    def _after_write(self):
+        if self._should_compact():
+            self.compact()
+
+    # -- TinyDB-like API --------------------------------------------------
+
+    def _select_ids(self, cond=None, doc_ids=None):
+        if doc_ids is not None:
+            return [int(d) for d in doc_ids if int(d) in self.ledger]
+        if cond is not None:
+            return [doc.doc_id for doc in self.ledger.iter_documents() if cond(doc)]
+        raise RuntimeError('You have to pass either cond or doc_ids')
+
+    def all(self):
+        return list(self.ledger.iter_documents())
+
+    def get(self, cond=None, doc_id=None, doc_ids=None):
+        if doc_ids is not None:
+            return [self.ledger.get(int(d)) for d in doc_ids if int(d) in self.ledger]
+        if doc_id is None:
+            found = self.search(cond)
+            return found[0] if found else None
+        return self.ledger.get(int(doc_id))
+
+    def search(self, cond):
+        return [doc for doc in self.ledger.iter_documents() if cond(doc)]
+
+    def iter_chunks(self, chunk_size):
+        """Yield documents in doc_id order, ``chunk_size`` at a time.
+
+        The store must not be mutated while the generator is being consumed.
+        """
+        chunk = []
+        for doc in self.ledger.iter_documents():
+            chunk.append(doc)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def page(self, offset, limit):
+        """Return ``limit`` documents, newest first, skipping the ``offset`` newest."""
+        return self.ledger.page(offset, limit)
+
+    def after(self, cursor, limit):
+        """Return the ``limit`` newest documents older than ``cursor`` (a Document)."""
+        return self.ledger.after(cursor, limit)
+
+    def insert(self, document):
+        return self.insert_multiple([document])[0]
+
+    def insert_multiple(self, documents):
+        entries = []
+        doc_ids = []
+        for document in documents:
+            doc_id = self._next_id
+            self._next_id += 1
+            doc = dict(document)
+            self.ledger.on_insert(Document(doc, doc_id))
+            entries.append({'op': 'put', 'id': doc_id, 'doc': doc})
+            doc_ids.append(doc_id)
+        self._append(entries)
+        return doc_ids
+
+    def update(self, fields, cond=None, doc_ids=None):
+        entries = []
+        updated = self._select_ids(cond, doc_ids)
+        for doc_id in updated:
+            old = self.ledger.get(doc_id)
+            doc = dict(old)
+            if callable(fields):
+                fields(doc)
+            else:
+                doc.update(fields)
+            self.ledger.on_update(old, Document(doc, doc_id))
+            self._garbage += 1
+            entries.append({'op': 'put', 'id': doc_id, 'doc': doc})
+        self._append(entries)
+        self._after_write()
+        return updated
+
+    def remove(self, cond=None, doc_ids=None):
+        removed = self._select_ids(cond, doc_ids)
+        if removed:
+            self.ledger.discard(removed)
+            self._garbage += 2 * len(removed)
+            self._append([{'op': 'del', 'ids': removed}])
+            self._after_write()
+        return removed
+
+    def truncate(self):
+        self.ledger.clear()
+        self._next_id = 1
+        self.compact()
+
+    def close(self):
+        if self._handle is not None:
+            self.flush()
+            self._handle.close()
+            self._handle = None
+
+    def __len__(self):
+        return len(self.ledger)
+
+
+class MemoryStore:
+    """Non-persistent store used when the on-disk database cannot be opened.
+
+    Keeps the app usable (data just won't survive a restart).
+    """
+
+    def __init__(self):
+        self._docs = {}
+        self._order = None  # DateOrder, built by the first page read
+        self._next_id = 1
+
+    def _date_order(self):
+        if self._order is None:
+            self._order = DateOrder(self._docs)
+        return self._order
+
+    def all(self):
+        return [Document(dict(doc), doc_id) for doc_id, doc in self._docs.items()]
+
+    def get(self, cond=None, doc_id=None, doc_ids=None):
+        if doc_ids is not None:
+            return [self.get(doc_id=d) for d in doc_ids if d in self._docs]
+        doc = self._docs.get(doc_id)
+        return Document(dict(doc), doc_id) if doc is not None else None
+
+    def search(self, cond):
+        return [Document(dict(doc), doc_id)
+                for doc_id, doc in self._docs.items() if cond(doc)]
+
+    def page(self, offset, limit):
+        return [Document(dict(self._docs[i]), i)
+                for i in self._date_order().page(offset, limit)]
+
+    def after(self, cursor, limit):
+        return [Document(dict(self._docs[i]), i)
+                for i in self._date_order().after(_cursor_key(cursor), limit)]
+
+    def insert(self, document):
+        return self.insert_multiple([document])[0]
+
+    def insert_multiple(self, documents):
+        doc_ids = []
+        for document in documents:
+            doc = self._docs[self._next_id] = dict(document)
+            if self._order is not None:
+                self._order.add(order_key(self._next_id, doc))
+            doc_ids.append(self._next_id)
+            self._next_id += 1
+        return doc_ids
+
+    def update(self, fields, cond=None, doc_ids=None):
+        ids = [d for d in (doc_ids or []) if d in self._docs]
+        for doc_id in ids:
+            if self._order is not None:
+                self._order.discard(order_key(doc_id, self._docs[doc_id]))
+            if callable(fields):
+                fields(self._docs[doc_id])
+            else:
+                self._docs[doc_id].update(fields)
+            if self._order is not None:
+                self._order.add(order_key(doc_id, self._docs[doc_id]))
+        return ids
+
+    def remove(self, cond=None, doc_ids=None):
+        ids = [d for d in (doc_ids or []) if d in self._docs]
+        if self._order is not None:
+            self._order.discard_many([order_key(d, self._docs[d]) for d in ids])
+        for doc_id in ids:
+            del self._docs[doc_id]
+        return ids
+
+    def truncate(self):
+        self._docs = {}
+        self._order = None
+        self._next_id = 1
+
+    def close(self):
+        pass
+
+    def __len__(self):
+        return len(self._docs)
+
+
+class StoreObserver:
+    """Receives mutation events from an ``ObservableStore``.
+
+    Subclasses override the hooks they care about; documents passed in are
+    ``tinydb.table.Document`` instances carrying their ``doc_id``.
+    """
+
+    def on_insert(self, doc):
+        pass
+
+    def on_update(self, old_doc, new_doc):
+        pass
+
+    def on_remove(self, doc):
+        pass
+
+    def on_clear(self):
+        pass
+
+    def on_commit(self):
+        """Called once after each store call that changed data."""
+        pass
+
+
+class CommitHook(StoreObserver):
+    """Calls ``callback()`` after every store call that changed data."""
+
+    def __init__(self, callback):
+        self.callback = callback
+
+    def on_commit(self):
+        self.callback()
+
+
+class ObservableStore:
+    """Wraps any store engine and notifies observers about every mutation.
+
+    Derived structures (aggregates, indexes, caches) subscribe here so they
+    can be maintained incrementally instead of rescanning ``all()``. Any
+    attribute not defined here is forwarded to the wrapped engine.
+    """
+
+    def __init__(self, store):
+        self._store = store
+        self._observers = []
+
+    @property
+    def engine(self):
+        return self._store
+
+    def subscribe(self, observer):
+        if observer not in self._observers:
+            self._observers.append(observer)
+
+    def unsubscribe(self, observer):
+        if observer in self._observers:
+            self._observers.remove(observer)
+
+    def _emit(self, hook, *args):
+        for observer in self._observers:
+            getattr(observer, hook)(*args)
+
+    def _commit(self):
+        self._emit('on_commit')
+
+    def __getattr__(self, name):
+        return getattr(self._store, name)
+
+    def __len__(self):
+        return len(self._store)
+
+    def all(self):
+        return self._store.all()
+
+    def get(self, cond=None, doc_id=None, doc_ids=None):
+        return self._store.get(cond=cond, doc_id=doc_id, doc_ids=doc_ids)
+
+    def insert(self, document):
+        return self.insert_multiple([document])[0]
+
+    def insert_multiple(self, documents):
+        documents = [dict(d) for d in documents]
+        doc_ids = self._store.insert_multiple(documents)
+        for doc_id, doc in zip(doc_ids, documents):
+            self._emit('on_insert', Document(doc, doc_id))
+        self._commit()
+        return doc_ids
+
+    def _affected(self, cond, doc_ids):
+        if doc_ids is not None:
+            return self._store.get(doc_ids=list(doc_ids))
+        return self._store.search(cond)
+
+    def update(self, fields, cond=None, doc_ids=None):
+        if not self._observers:
+            return self._store.update(fields, cond=cond, doc_ids=doc_ids)
+        old_docs = self._affected(cond, doc_ids)
+        updated = self._store.update(fields, doc_ids=[d.doc_id for d in old_docs])
+        new_docs = {d.doc_id: d for d in self._store.get(doc_ids=updated)}
+        for old in old_docs:
+            if old.doc_id in new_docs:
+                self._emit('on_update', old, new_docs[old.doc_id])
+        self._commit()
+        return updated
+
+    def remove(self, cond=None, doc_ids=None):
+        if not self._observers:
+            return self._store.remove(cond=cond, doc_ids=doc_ids)
+        old_docs = self._affected(cond, doc_ids)
+        if not old_docs:
+            return []
+        removed = self._store.remove(doc_ids=[d.doc_id for d in old_docs])
+        removed_set = set(removed)
+        for old in old_docs:
+            if old.doc_id in removed_set:
+                self._emit('on_remove', old)
+        self._commit()
+        return removed
+
+    def remove_many(self, doc_ids):
+        """Remove ``doc_ids`` with a single engine write; returns the removed ids.
+
+        That is one journal append, one TinyDB rewrite or one SQLite
+        transaction however many ids there are. Unknown ids are skipped
+        first (TinyDB raises KeyError for them), and nothing is written
+        when none is left.
+        """
+        doc_ids = list(dict.fromkeys(doc_ids))
+        if not doc_ids:
+            return []
+        if self._observers:
+            return self.remove(doc_ids=doc_ids)
+        present = [d.doc_id for d in self._store.get(doc_ids=doc_ids)]
+        return self._store.remove(doc_ids=present) if present else []
+
+    def truncate(self):
+        """Remove every document with one write; observers get a single ``on_clear``."""
+        self._store.truncate()
+        self._emit('on_clear')
+        self._commit()
+
+    def close(self):
+        self._store.close()
+
+
+def _to_cents(doc):
+    doc['amount_cents'] = expense_cents(doc)
+    doc.pop('amount', None)
+
+
+def migrate_amounts_to_cents(store, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Rewrite records that still carry a float ``amount`` with ``amount_cents``.
+
+    All legacy records are converted by a single ``update`` call. Returns
+    the number of migrated records.
+    """
+    legacy = [d.doc_id for chunk in iter_chunks(store, chunk_size) for d in chunk
+              if 'amount_cents' not in d and 'amount' in d]
+    if legacy:
+        store.update(_to_cents, doc_ids=legacy)
+    return len(legacy)
+
+
+def iter_chunks(store, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield lists of documents from ``store`` of at most ``chunk_size`` each.
+
+    Uses the store's own ``iter_chunks`` when it has one and falls back to
+    slicing ``all()`` (e.g. for plain TinyDB).
+    """
+    chunked = getattr(store, 'iter_chunks', None)
+    if chunked is not None:
+        yield from chunked(chunk_size)
+        return
+    docs = store.all()
+    for start in range(0, len(docs), chunk_size):
+        yield docs[start:start + chunk_size]
+
+
+def _sorted_docs(store):
+    return sorted(store.all(), key=lambda d: order_key(d.doc_id, d), reverse=True)
+
+
+def page(store, offset, limit):
+    """``store.page(offset, limit)``, sorting ``all()`` for engines without it."""
+    paged = getattr(store, 'page', None)
+    if paged is not None:
+        return paged(offset, limit)
+    return _sorted_docs(store)[offset:offset + limit]
+
+
+def page_after(store, cursor, limit):
+    """``store.after(cursor, limit)``, sorting ``all()`` for engines without it."""
+    after = getattr(store, 'after', None)
+    if after is not None:
+        return after(cursor, limit)
+    docs = _sorted_docs(store)
+    if cursor is not None:
+        key = _cursor_key(cursor)
+        docs = [d for d in docs if order_key(d.doc_id, d) < key]
+    return docs[:limit]
+
+
+def flush_store(store):
+    """Complete the buffered writes of ``store`` (see ``write_behind``).
+
+    Returns the number of writes flushed; engines that write through
+    return 0.
+    """
+    engine = getattr(store, 'engine', store)
+    flush = getattr(engine, 'flush', None)
+    if flush is None:
+        # TinyDB: the middleware sits on its storage
+        flush = getattr(getattr(engine, 'storage', None), 'flush', None)
+        pending = getattr(getattr(engine, 'storage', None), 'pending', 0)
+        if flush is None:
+            return 0
+        flush()
+        return pending
+    return flush() or 0
+
+
+def open_store(db_path, engine=None, write_behind=False):
+    """Open the expense store for ``db_path`` (the ``expenses.json`` path).
+
+    The engine is returned wrapped in an ``ObservableStore``. With
+    ``write_behind`` its writes are group-committed by ``flush_store``.
+
+    ``engine`` defaults to the EXPENSE_TRACKER_STORE environment variable,
+    then to ``DEFAULT_ENGINE``. Supported engines:
+
+    - ``journal``: append-only journal next to ``db_path``; an existing
+      TinyDB ``expenses.json`` is migrated into it on first open.
+    - ``sqlite``: ``sqlite_store.SQLiteStore`` in ``expenses.sqlite3``; an
+      existing TinyDB ``expenses.json`` is imported when the database is new.
+    - ``tinydb``: TinyDB on ``AtomicJSONStorage``.
+    """
+    return ObservableStore(_open_engine(db_path, engine, write_behind))
+
+
+def _open_engine(db_path, engine=None, write_behind=False):
+    engine = engine or os.environ.get('EXPENSE_TRACKER_STORE') or DEFAULT_ENGINE
+    if engine == 'journal':
+        return JournalStore(_journal_path_for(db_path), legacy_path=db_path,
+                            deferred_sync=write_behind)
+    if engine == 'sqlite':
+        from sqlite_store import SQLiteStore, import_tinydb
+        sqlite_path = os.path.splitext(db_path)[0] + '.sqlite3'
+        is_new = not os.path.exists(sqlite_path)
+        store = SQLiteStore(sqlite_path)
+        if is_new and os.path.exists(db_path):
+            import_tinydb(store, db_path)
+        return store
+    if engine == 'tinydb':
+        if write_behind:
+            return TinyDB(db_path, storage=WriteBehindMiddleware(AtomicJSONStorage))
+        return TinyDB(db_path, storage=AtomicJSONStorage)
+    raise ValueError(f"Unknown storage engine: {engine}")
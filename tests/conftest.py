@@ -0,0 +1,28 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from storage import open_store
+
+
+def make_expense(cents=100, category="Food", date="2025-11-11 12:00", note=""):
+    return {"amount_cents": cents, "category": category, "note": note, "date": date}
+
+
+@pytest.fixture
+def expense():
+    """``expense(cents=100, category="Food", date=..., note="")``: an expense document."""
+    return make_expense
+
+
+@pytest.fixture
+def db(tmp_path):
+    """An empty journal store in ``tmp_path``, closed after the test."""
+    store = open_store(str(tmp_path / "expenses.json"), engine='journal')
+    yield store
+    store.close()
@@ -0,0 +1,90 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from aggregates import Aggregates, aggregates_path_for
+from storage import open_store
+
+
+def _expense(amount, category="Food", date="2025-11-11 12:00"):
+    return {"amount": amount, "category": category, "note": "", "date": date}
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "expenses.json")
+
+
+def test_aggregates_follow_store_mutations(db_path):
+    db = open_store(db_path, engine='journal')
+    agg = Aggregates(aggregates_path_for(db_path)).attach(db)
+
+    a = db.insert(_expense(0.1, "Food", "2025-11-11 12:00"))
+    db.insert(_expense(0.2, "Food", "2025-11-12 08:00"))
+    c = db.insert(_expense(5.0, "Rent", "2025-12-01 09:00"))
+    # Sums are exact integer cents (0.1 + 0.2 is 30, not 30.000000000000004)
+    assert agg.total == 530
+    assert agg.by_category == {"Food": 30, "Rent": 500}
+    assert agg.by_month == {"2025-11": 30, "2025-12": 500}
+
+    db.update({"category": "Snacks"}, doc_ids=[a])
+    db.remove(doc_ids=[c])
+    assert agg.total == 30
+    assert agg.count == 2
+    assert agg.by_category == {"Food": 20, "Snacks": 10}
+    assert "2025-12-01" not in agg.by_day
+    assert agg.verify(db.all()) == []
+
+    db.truncate()
+    assert agg.total == 0 and agg.by_category == {}
+    db.close()
+
+
+def test_aggregates_persist_and_detect_drift(db_path):
+    db = open_store(db_path, engine='journal')
+    path = aggregates_path_for(db_path)
+    agg = Aggregates(path).attach(db)
+    assert os.path.exists(path)
+    # Writes drop the stale file instead of rewriting it each time
+    db.insert(_expense(12.5))
+    assert not os.path.exists(path)
+    db.insert(_expense(1.0))
+    db.remove(doc_ids=[2])
+    assert agg.save() and not agg.save()
+    db.close()
+
+    loaded = Aggregates(aggregates_path_for(db_path))
+    assert loaded.load()
+    assert loaded.total == 1250
+
+    # Simulate a write that never reached the aggregates file
+    db = open_store(db_path, engine='journal')
+    db.engine.insert(_expense(7.5))
+    assert loaded.verify(db.all()) == ['total', 'count', 'by_category', 'by_day', 'by_month']
+
+    # attach() notices the count mismatch and rebuilds
+    agg = Aggregates(aggregates_path_for(db_path)).attach(db)
+    assert agg.total == 2000
+    assert agg.verify(db.all()) == []
+    db.close()
+
+
+def test_a_truncate_drops_the_saved_sums(db_path):
+    db = open_store(db_path, engine='journal')
+    path = aggregates_path_for(db_path)
+    db.insert(_expense(4.0))
+    agg = Aggregates(path).attach(db)
+
+    # Doc ids and counts start over: the old file could pass for the new records
+    db.truncate()
+    assert not os.path.exists(path)
+    db.insert(_expense(1.0))
+    db.close()
+    db = open_store(db_path, engine='journal')
+    assert Aggregates(path).attach(db).total == 100 and agg.total == 100
+    db.close()
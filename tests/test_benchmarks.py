@@ -0,0 +1,36 @@
+import os
+import shutil
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.__main__ import compare
+from benchmarks.ledger import generate_ledger
+from benchmarks.scenarios import bench_add_expense, bench_update_list, make_ledger_dir
+
+
+def test_ledger_is_deterministic():
+    assert list(generate_ledger(50, seed=7)) == list(generate_ledger(50, seed=7))
+    assert list(generate_ledger(50, seed=7)) != list(generate_ledger(50, seed=8))
+
+
+def test_compare_flags_regressions():
+    baseline = {'results': {'update_list': {'1000': {'median_ms': 10.0}},
+                            'add_expense': {'1000': {'median_ms': 2.0}}}}
+    current = {'results': {'update_list': {'1000': {'median_ms': 14.0}},
+                           'add_expense': {'1000': {'median_ms': 2.1}},
+                           'cold_start': {'1000': {'error': ['no window']}}}}
+    rows, regressions = compare(baseline, current, tolerance=0.25)
+    assert len(rows) == 2
+    assert [r[0] for r in regressions] == ['update_list']
+
+
+def test_headless_ui_scenarios_run():
+    data_dir = make_ledger_dir(200, 'journal')
+    try:
+        assert bench_update_list(data_dir, 'journal', repeat=1)['runs'] == 1
+        assert bench_add_expense(data_dir, 'journal', repeat=2)['median_ms'] >= 0
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
@@ -0,0 +1,50 @@
+import pytest
+
+from categories import CategoryIndex, normalize, use_weight
+from ledger import Ledger, to_timestamp
+
+
+def test_normalize_and_weights():
+    assert normalize("  Eating   Out ") == normalize("eating out") == "eating out"
+    # A use one half-life older weighs half as much
+    now = to_timestamp("2025-11-30 12:00")
+    assert use_weight(now - 30 * 1440) == pytest.approx(use_weight(now) / 2)
+    assert use_weight(None) == 0.0
+
+
+def test_suggestions_ranked_by_frequency_and_recency(db, expense):
+    db.insert_multiple([
+        expense(category="Food", date="2025-01-05 10:00"),
+        expense(category="food", date="2025-01-06 10:00"),
+        expense(category="FOOD", date="2025-01-07 10:00"),
+        expense(category="Fuel", date="2025-11-01 10:00"),
+        expense(category="Furniture", date="2024-01-01 10:00"),
+        expense(category="Taxi", date="2025-11-01 10:00"),
+    ])
+    index = CategoryIndex().attach(db, Ledger().attach(db))
+
+    # Three uses ten months ago lose to one use this month
+    assert index.suggest("f") == ["Fuel", "Food", "Furniture"]
+    assert index.suggest("FU") == ["Fuel", "Furniture"]
+    assert index.suggest("fo") == ["Food"]
+    assert index.suggest("x") == []
+    assert index.canonical(" fOOd ") == "Food"
+    assert index.canonical("New  one") == "New one"
+
+    # Built from a store scan it agrees with the ledger build
+    assert CategoryIndex().attach(db).suggest("f") == index.suggest("f")
+
+
+def test_follows_inserts_and_removes(db, expense):
+    index = CategoryIndex(limit=2).attach(db)
+    ids = db.insert_multiple([expense(category="Fuel", date="2025-11-01 10:00"),
+                              expense(category="Food", date="2025-11-02 10:00")])
+    assert index.suggest("f") == ["Food", "Fuel"]
+    db.insert_multiple([expense(category="Fees", date="2025-11-03 10:00")] * 3)
+    assert index.suggest("f") == ["Fees", "Food"]
+
+    db.remove(doc_ids=[ids[1]])
+    assert index.suggest("f") == ["Fees", "Fuel"]
+    assert index.suggest("fo") == [] and "food" not in index.counts
+    db.truncate()
+    assert index.suggest("") == [] and len(index) == 0
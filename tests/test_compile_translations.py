@@ -0,0 +1,51 @@
+import os
+import shutil
+import sys
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import compile_translations
+import translations
+
+
+@pytest.fixture
+def localedir(tmp_path):
+    target = tmp_path / 'locales'
+    shutil.copytree(os.path.join(ROOT, 'locales'), str(target),
+                    ignore=shutil.ignore_patterns('*.catalog', '*.mo'))
+    # A locale the old script didn't know about
+    fr = target / 'fr' / 'LC_MESSAGES'
+    fr.mkdir(parents=True)
+    (fr / 'app.po').write_text('msgid "amount"\nmsgstr "Montant"\n', encoding='utf-8')
+    return str(target)
+
+
+def test_discovers_and_compiles_every_locale(localedir):
+    compiled, skipped = compile_translations.compile_all(localedir, jobs=2)
+    langs = sorted(os.path.basename(os.path.dirname(os.path.dirname(p))) for p in compiled)
+    assert langs == ['am', 'en', 'fr', 'om']
+    assert skipped == []
+
+    po, mo, catalog = translations.source_paths(localedir, 'fr')
+    assert translations.load_mo(mo) == {'amount': 'Montant'}
+    assert translations.read_catalog(po, mo, catalog) == {'amount': 'Montant'}
+    po, mo, _ = translations.source_paths(localedir, 'am')
+    assert translations.load_mo(mo) == translations.parse_po(po)
+
+
+def test_only_stale_files_are_recompiled(localedir):
+    compile_translations.compile_all(localedir, jobs=1)
+    assert compile_translations.compile_all(localedir)[0] == []
+
+    po, mo, _ = translations.source_paths(localedir, 'om')
+    stat = os.stat(mo)
+    os.utime(po, (stat.st_atime, stat.st_mtime + 10))
+    compiled, skipped = compile_translations.compile_all(localedir)
+    assert compiled == [po]
+    assert len(skipped) == 3
+
+    assert len(compile_translations.compile_all(localedir, force=True)[0]) == 4
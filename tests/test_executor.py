@@ -0,0 +1,57 @@
+import os
+import sys
+import threading
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from executor import StorageExecutor
+
+
+def test_jobs_run_in_order_off_the_calling_thread():
+    results = []
+    threads = set()
+
+    def job(i):
+        threads.add(threading.current_thread().name)
+        return i
+
+    ex = StorageExecutor(dispatch=lambda cb: cb())
+    for i in range(20):
+        ex.submit(job, i, on_done=results.append)
+    ex.wait()
+    ex.shutdown()
+
+    assert results == list(range(20))
+    assert threads == {'db-worker'}
+
+
+def test_errors_are_reported_and_worker_keeps_running():
+    errors = []
+    done = []
+
+    def boom():
+        raise RuntimeError("disk full")
+
+    ex = StorageExecutor(dispatch=lambda cb: cb())
+    ex.submit(boom, on_error=errors.append)
+    ex.submit(boom)  # no handler: only logged
+    ex.submit(lambda: 'ok', on_done=done.append)
+    ex.shutdown(wait=True)
+
+    assert [str(e) for e in errors] == ["disk full"]
+    assert done == ['ok']
+
+
+def test_callbacks_survive_later_jobs():
+    # Completions delivered after the worker moved on (as with Clock)
+    pending = []
+    done = []
+    ex = StorageExecutor(dispatch=pending.append)
+    ex.submit(lambda: 'first', on_done=done.append)
+    ex.submit(lambda: 'fire and forget')
+    ex.shutdown(wait=True)
+    for callback in pending:
+        callback()
+    assert done == ['first']
@@ -0,0 +1,57 @@
+import csv
+import gzip
+import json
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from exporter import export_expenses, export_filename
+from storage import open_store
+
+
+@pytest.fixture(params=['journal', 'sqlite', 'tinydb'])
+def store(tmp_path, request):
+    db = open_store(str(tmp_path / "expenses.json"), engine=request.param)
+    db.insert_multiple([
+        {"amount": float(i), "category": "Food", "note": f"n{i}, \"quoted\"",
+         "date": f"2025-11-{i % 28 + 1:02d} 12:00"}
+        for i in range(1, 1201)
+    ])
+    yield db
+    db.close()
+
+
+def test_csv_export_streams_in_chunks(tmp_path, store):
+    path = str(tmp_path / "out.csv")
+    calls = []
+    count = export_expenses(store, path, fmt='csv', chunk_size=500,
+                            progress=lambda done, total: calls.append((done, total)))
+    assert count == 1200
+    assert calls == [(500, 1200), (1000, 1200), (1200, 1200)]
+    with open(path, newline='', encoding='utf-8') as fh:
+        rows = list(csv.DictReader(fh))
+    assert len(rows) == 1200
+    assert rows[0]['note'] == 'n1, "quoted"'
+    assert float(rows[-1]['amount']) == 1200.0
+    assert not os.path.exists(path + '.part')
+
+
+def test_gzipped_jsonl_export(tmp_path, store):
+    path = str(tmp_path / export_filename('jsonl', compress=True))
+    assert path.endswith('.jsonl.gz')
+    assert export_expenses(store, path, fmt='jsonl', compress=True) == 1200
+    with gzip.open(path, 'rt', encoding='utf-8') as fh:
+        records = [json.loads(line) for line in fh]
+    assert len(records) == 1200
+    assert records[0]['category'] == 'Food'
+    assert records[0]['id'] is not None
+
+
+def test_unknown_format_rejected(tmp_path, store):
+    with pytest.raises(ValueError):
+        export_expenses(store, str(tmp_path / "out.xml"), fmt='xml')
@@ -0,0 +1,68 @@
+import json
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from importer import import_expenses, parse_row
+from storage import open_store
+
+
+@pytest.fixture
+def store(tmp_path):
+    db = open_store(str(tmp_path / "expenses.json"), engine='journal')
+    yield db
+    db.close()
+
+
+def test_parse_row_validates_and_normalizes():
+    assert parse_row({"Amount": "1,200.50", "Category": "Rent", "Date": "2025-11-01"}) == {
+        "amount_cents": 120050, "category": "Rent", "note": "", "date": "2025-11-01 00:00"}
+    assert parse_row({"description": "bus", "value": "3", "type": "Transport",
+                      "date": "2025-11-01T08:30:00"})["note"] == "bus"
+    assert parse_row({"amount": "-5", "category": "Food", "date": "2025-11-01"}) is None
+    assert parse_row({"amount": "abc", "category": "Food", "date": "2025-11-01"}) is None
+    assert parse_row({"amount": "5", "category": "", "date": "2025-11-01"}) is None
+    assert parse_row({"amount": "5", "category": "Food", "date": "yesterday"}) is None
+
+
+def test_csv_import_dedupes_in_one_batched_write(tmp_path, store):
+    store.insert({"amount": 10.0, "category": "Food", "note": "lunch", "date": "2025-11-01 12:00"})
+    path = tmp_path / "statement.csv"
+    path.write_text(
+        "date,amount,category,note\n"
+        "2025-11-01 12:00,10.00,Food,lunch\n"      # already in the store
+        "2025-11-02 09:00,4.50,Transport,bus\n"
+        "2025-11-02 09:00,4.50,Transport,bus\n"    # duplicate within the file
+        "2025-11-03 18:00,oops,Food,\n"            # invalid amount
+        "2025-11-04 07:15,2,Coffee,\n",
+        encoding='utf-8')
+
+    writes = []
+    original = store.engine._append
+    store.engine._append = lambda entries: (writes.append(len(entries)), original(entries))
+
+    result = import_expenses(store, str(path), batch_size=2)
+    assert result == (2, 2, 1)
+    assert writes == [2]
+    assert sorted(d["category"] for d in store.all()) == ["Coffee", "Food", "Transport"]
+
+    # Importing the same file again adds nothing
+    assert import_expenses(store, str(path)).imported == 0
+
+
+def test_json_and_jsonl_import(tmp_path, store):
+    rows = [{"amount": i, "category": "Food", "date": "2025-11-05"} for i in range(1, 4)]
+    as_json = tmp_path / "rows.json"
+    as_json.write_text(json.dumps(rows), encoding='utf-8')
+    assert import_expenses(store, str(as_json)).imported == 3
+
+    as_jsonl = tmp_path / "rows.jsonl"
+    as_jsonl.write_text("\n".join(json.dumps({**r, "amount": r["amount"] + 10}) for r in rows),
+                        encoding='utf-8')
+    assert import_expenses(store, str(as_jsonl)).imported == 3
+    assert len(store) == 6
@@ -0,0 +1,153 @@
+import datetime
+
+import pytest
+
+from ledger import Ledger, format_timestamp, ledger_for, period_range, to_timestamp
+from storage import open_store
+
+
+def _sorted_like_the_list(docs):
+    return sorted(docs, key=lambda d: (d.get('date', ''), d.doc_id), reverse=True)
+
+
+def test_timestamps_round_trip_and_reject_other_formats():
+    ts = to_timestamp("2025-02-28 23:59")
+    assert format_timestamp(ts) == "2025-02-28 23:59"
+    assert to_timestamp("2025-03-01 00:00") == ts + 1
+    for bad in ("2025-02-30 10:00", "2025-02-28", "2025-02-28 24:00", None, ""):
+        assert to_timestamp(bad) is None
+
+
+def test_ledger_matches_the_store(db, expense):
+    db.insert_multiple([
+        expense(250, "Food", "2025-11-11 12:00", "tea"),
+        expense(400, "Taxi", "2025-11-10 09:00"),
+        expense(100, "Food", "2025-11-11 12:00"),
+        # Float amount of a record that predates integer cents
+        {"amount": 3.0, "category": "Misc", "note": "", "date": "yesterday"},
+    ])
+    ledger = Ledger().attach(db)
+
+    assert len(ledger) == 4
+    # Newest first with ties broken by doc_id; unparseable dates sort oldest
+    assert [d.doc_id for d in ledger.iter_sorted()] == [3, 1, 2, 4]
+    assert [d.doc_id for d in ledger.iter_sorted(newest_first=False)] == [4, 2, 1, 3]
+    assert ledger.get(1) == expense(250, "Food", "2025-11-11 12:00", "tea")
+    assert ledger.get(1).doc_id == 1
+    assert ledger.get(99) is None and 99 not in ledger
+    assert ledger.total() == 1050
+    assert ledger.category_totals() == {"Food": 350, "Taxi": 400, "Misc": 300}
+    assert ledger.category_names == ["Food", "Taxi", "Misc"]
+    assert ledger.notes == {1: "tea"}
+
+
+def test_ledger_follows_store_mutations(db, expense):
+    ledger = Ledger().attach(db)
+    ids = db.insert_multiple([expense(i * 100, date=f"2025-01-{i:02d} 10:00")
+                              for i in range(1, 11)])
+    assert [d.doc_id for d in ledger.iter_sorted()] == ids[::-1]
+
+    # The newest expense goes to the end of the sorted index
+    newest = db.insert(expense(5000, "Rent", "2025-02-01 08:00"))
+    assert list(ledger.index) == sorted(ledger.index)
+    assert next(ledger.iter_sorted()).doc_id == newest
+
+    db.update({"date": "2024-12-31 23:00", "note": "moved"}, doc_ids=[newest])
+    assert list(ledger.iter_sorted())[-1] == db.get(doc_id=newest)
+
+    # A bulk remove is compacted once, at commit
+    db.remove(doc_ids=ids[:5])
+    assert not ledger._removed
+    assert len(ledger) == 6 and ledger.doc_ids() == ids[5:] + [newest]
+    assert list(ledger.iter_sorted()) == _sorted_like_the_list(db.all())
+    assert ledger.total() == sum(d['amount_cents'] for d in db.all())
+    assert len(ledger.index) == len(ledger)
+
+    db.truncate()
+    assert len(ledger) == 0 and list(ledger.iter_sorted()) == []
+
+
+def test_period_ranges():
+    now = datetime.datetime(2025, 12, 31, 18, 30)  # a Wednesday
+    assert period_range('all', now) == (None, None)
+    assert period_range('today', now) == (to_timestamp("2025-12-31 00:00"),
+                                          to_timestamp("2026-01-01 00:00"))
+    assert period_range('week', now) == (to_timestamp("2025-12-29 00:00"),
+                                         to_timestamp("2026-01-05 00:00"))
+    assert period_range('month', now) == (to_timestamp("2025-12-01 00:00"),
+                                          to_timestamp("2026-01-01 00:00"))
+    with pytest.raises(ValueError):
+        period_range('decade', now)
+
+
+def test_range_queries(db, expense):
+    ledger = Ledger().attach(db)
+    db.insert_multiple([
+        expense(100, date="2025-11-30 23:59"),
+        expense(200, date="2025-12-01 00:00"),
+        expense(300, date="2025-12-15 12:00"),
+        expense(400, date="2025-12-31 18:00"),
+        expense(500, date="2026-01-01 00:00"),
+        expense(600, date="not a date"),
+    ])
+    # Out of order insert lands in the middle of the index
+    late = db.insert(expense(700, date="2025-12-15 09:00"))
+    now = datetime.datetime(2025, 12, 31, 18, 30)
+
+    month = list(ledger.period('month', now))
+    assert [d['amount_cents'] for d in month] == [400, 300, 700, 200]
+    assert [d['amount_cents'] for d in ledger.period('today', now)] == [400]
+    start, end = period_range('month', now)
+    assert ledger.count_range(start, end) == 4
+    assert ledger.range_total(start, end) == 1600
+    assert ledger.range_total() == ledger.total() == 2800
+    assert [d['amount_cents'] for d in ledger.iter_range(end=start)] == [100, 600]
+
+    db.update({"date": "2026-01-02 10:00"}, doc_ids=[late])
+    db.remove(doc_ids=[3])
+    assert [d['amount_cents'] for d in ledger.period('month', now)] == [400, 200]
+    assert [d.doc_id for d in ledger.period('all', now)] == [late, 5, 4, 2, 1, 6]
+
+
+def test_pages_follow_the_index(db, expense):
+    ledger = Ledger().attach(db)
+    ids = db.insert_multiple([expense(i, date=f"2025-12-{i:02d} 10:00") for i in range(1, 31)])
+    newest_first = ids[::-1]
+
+    assert [d.doc_id for d in ledger.page(0, 4)] == newest_first[:4]
+    assert [d.doc_id for d in ledger.page(28, 4)] == newest_first[28:]
+    first = ledger.after(None, 10)
+    assert [d.doc_id for d in ledger.after(first[-1], 10)] == newest_first[10:20]
+
+    # Pages of a period stop at its bounds
+    start, end = to_timestamp("2025-12-08 00:00"), to_timestamp("2025-12-15 00:00")
+    week = ledger.after(None, 5, start, end)
+    assert [d['amount_cents'] for d in week] == [14, 13, 12, 11, 10]
+    assert [d['amount_cents'] for d in ledger.after(week[-1], 5, start, end)] == [9, 8]
+    assert ledger.after(db.get(doc_id=ids[0]), 5) == []
+
+
+def test_the_journal_keeps_its_documents_in_one_ledger(tmp_path, db, expense):
+    odd = {"amount": 3.0, "category": "Misc", "date": "2025-1-1", "tag": ["x"]}
+    db.insert_multiple([expense(250, note="tea"), odd, expense(100, date="2025-11-12 08:00")])
+    db.update({"note": "lunch"}, doc_ids=[1])
+    ledger = ledger_for(db)
+
+    # No second copy: the app reads through the engine's ledger
+    assert ledger is db.engine.ledger and not hasattr(db.engine, '_docs')
+    assert list(ledger.extras) == [2]
+    assert db.get(doc_id=2) == odd and db.get(doc_id=1)["note"] == "lunch"
+    assert [d.doc_id for d in db.page(0, 5)] == [3, 1, 2]
+
+    # Records that the columns can't rebuild survive a replay unchanged
+    db.close()
+    db = open_store(str(tmp_path / "expenses.json"), engine='journal')
+    assert db.all() == [expense(250, note="lunch"), odd, expense(100, date="2025-11-12 08:00")]
+    db.remove(doc_ids=[2])
+    assert not db.engine.ledger.extras and len(db) == 2
+    db.close()
+
+    # Other engines get a ledger of their own
+    other = open_store(str(tmp_path / "expenses.json"), engine='tinydb')
+    assert ledger_for(other) is not None and not hasattr(other.engine, 'ledger')
+    other.close()
@@ -0,0 +1,71 @@
+import json
+import os
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import perf
+
+
+def test_disabled_instrumentation_is_a_passthrough():
+    def fn():
+        return 1
+    assert perf.timed('x', enabled=False)(fn) is fn
+    store = object()
+    assert perf.instrument_store(store, enabled=False) is store
+
+
+def test_histogram_buckets_and_percentiles():
+    hist = perf.Histogram()
+    for ms in [0.1] * 90 + [3.0] * 9 + [500.0]:
+        hist.record(ms)
+    data = hist.to_dict()
+    assert data['count'] == 100
+    assert data['min_ms'] == 0.1 and data['max_ms'] == 500.0
+    assert data['p50_ms'] == perf.BASE_MS
+    assert data['p95_ms'] == 4.0
+
+
+def test_timed_and_store_proxy_record_samples(tmp_path, monkeypatch):
+    perf.reset()
+
+    @perf.timed('work', enabled=True)
+    def work():
+        return 'done'
+
+    class Store:
+        def all(self):
+            return []
+
+        def __len__(self):
+            return 0
+
+    assert work() == 'done'
+    store = perf.instrument_store(Store(), enabled=True)
+    store.all()
+    assert len(store) == 0
+    snap = perf.snapshot()
+    assert snap['work']['count'] == 1
+    assert snap['db.all']['count'] == 1
+    assert snap['db.__len__']['count'] == 1
+
+    monkeypatch.setattr(perf, 'ENABLED', True)
+    path = tmp_path / 'perf.log'
+    assert perf.dump(str(path))
+    assert perf.dump(str(path))
+    lines = path.read_text().splitlines()
+    assert len(lines) == 2
+    assert json.loads(lines[0])['histograms']['work']['count'] == 1
+    perf.reset()
+
+
+def test_stage_timer_breaks_down_consecutive_stages(monkeypatch):
+    ticks = iter([10.0, 10.5, 10.75])
+    monkeypatch.setattr(perf.time, 'perf_counter', lambda: next(ticks))
+    timer = perf.StageTimer('startup')
+    assert timer.mark('kv') == 500.0
+    assert timer.mark('db_open') == 250.0
+    assert timer.total_ms == 750.0
+    assert timer.summary() == "kv=500.0ms db_open=250.0ms total=750.0ms"
@@ -0,0 +1,54 @@
+import pytest
+
+from ledger import Ledger, to_timestamp
+from querycache import QueryCache
+
+
+@pytest.fixture
+def db(db, expense):
+    db.insert_multiple([expense(100, date="2025-01-03 10:00"),
+                        expense(200, date="2025-01-01 10:00"),
+                        expense(300, date="2025-02-01 10:00")])
+    return db
+
+
+@pytest.mark.parametrize('with_ledger', [True, False])
+def test_queries_are_served_until_the_next_write(db, expense, with_ledger):
+    cache = QueryCache().attach(db, Ledger().attach(db) if with_ledger else None)
+    start, end = to_timestamp("2025-01-01 00:00"), to_timestamp("2025-02-01 00:00")
+
+    assert cache.total() == 600 and cache.total(start, end) == 300
+    assert cache.doc_ids() == {1, 2, 3} and cache.doc_ids(start, end) == {1, 2}
+    assert [d.doc_id for d in cache.sorted_view()] == [3, 1, 2]
+    assert cache.doc_ids() is cache.doc_ids()
+    assert (cache.hits, cache.misses) == (2, 5)
+
+    # Keyset pages over the cached view, optionally filtered
+    assert [d.doc_id for d in cache.after(None, 2)] == [3, 1]
+    assert [d.doc_id for d in cache.after(db.get(doc_id=1), 2)] == [2]
+    assert [d.doc_id for d in cache.after(None, 5, where=lambda d: d['amount_cents'] < 300)] == [1, 2]
+
+    generation = cache.generation
+    db.insert(expense(50, date="2025-01-02 10:00"))
+    assert cache.generation > generation and len(cache) == 0
+    assert cache.total(start, end) == 350 and cache.doc_ids() == {1, 2, 3, 4}
+    db.truncate()
+    assert cache.total() == 0 and cache.sorted_view() == ()
+
+
+def test_memory_is_bounded_and_hooks_run_on_invalidation(db, expense):
+    cache = QueryCache(max_items=3).attach(db)
+    generations = []
+    cache.add_hook(generations.append)
+
+    cache.doc_ids()  # 3 ids
+    cache.sorted_view()  # 3 more: the ids are evicted
+    assert len(cache) == 1 and cache._items == 3
+    cache.doc_ids(None, None)
+    assert cache.misses == 3
+    db.insert(expense(1, date="2025-03-01 10:00"))
+    # Bigger than the whole budget: computed but not kept
+    assert len(cache.sorted_view()) == 4 and len(cache) == 0
+
+    cache.invalidate()
+    assert generations == [cache.generation - 1, cache.generation]
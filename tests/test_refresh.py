@@ -0,0 +1,79 @@
+import os
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from refresh import RefreshScheduler
+
+
+class FakeTrigger:
+    """Stands in for a Clock trigger; ``tick()`` plays the next frame."""
+
+    def __init__(self, callback, timeout):
+        self.callback = callback
+        self.armed = False
+
+    def __call__(self):
+        self.armed = True
+
+    def cancel(self):
+        self.armed = False
+
+    def tick(self):
+        if self.armed:
+            self.armed = False
+            self.callback(1 / 60.0)
+
+
+def test_requests_in_a_frame_collapse_into_one_pass():
+    ran = []
+    triggers = []
+
+    def make_trigger(callback, timeout):
+        triggers.append(FakeTrigger(callback, timeout))
+        return triggers[-1]
+
+    scheduler = RefreshScheduler([
+        ('texts', lambda: (ran.append('texts'), scheduler.request('buttons'))),
+        ('list', lambda: ran.append('list')),
+        ('buttons', lambda: ran.append('buttons')),
+    ], create_trigger=make_trigger)
+    (trigger,) = triggers
+
+    # A language change: texts, list, buttons, list again
+    scheduler.request('texts')
+    scheduler.request('list')
+    scheduler.request('buttons', 'list')
+    assert ran == []
+    trigger.tick()
+    assert ran == ['texts', 'list', 'buttons']
+    trigger.tick()
+    assert ran == ['texts', 'list', 'buttons']
+
+    stats = scheduler.stats()
+    assert stats['list'] == {'requested': 2, 'coalesced': 1, 'runs': 1}
+    assert stats['buttons'] == {'requested': 2, 'coalesced': 1, 'runs': 1}
+    assert stats['batches'] == 1
+
+    scheduler.request('list')
+    scheduler.flush()
+    assert ran[-1] == 'list' and not trigger.armed
+    scheduler.request('list')
+    scheduler.cancel()
+    trigger.tick()
+    assert scheduler.runs['list'] == 2
+
+
+def test_a_failing_pass_does_not_block_the_others():
+    ran = []
+
+    def boom():
+        raise RuntimeError('no screen')
+
+    scheduler = RefreshScheduler([('texts', boom), ('list', lambda: ran.append('list'))],
+                                 create_trigger=FakeTrigger)
+    scheduler.request('texts', 'list')
+    scheduler.flush()
+    assert ran == ['list'] and not scheduler.dirty
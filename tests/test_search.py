@@ -0,0 +1,71 @@
+import os
+
+from search import SearchIndex, matches, tokenize
+
+
+def test_tokenize_and_match(expense):
+    assert tokenize("Taxi to the AIRPORT, 2x") == ["taxi", "to", "the", "airport", "2x"]
+    assert tokenize("ቡና ከጓደኞች ጋር") == ["ቡና", "ከጓደኞች", "ጋር"]
+    doc = expense(category="Transport", note="taxi home")
+    assert matches(doc, "tax") and matches(doc, "HOME trans")
+    assert not matches(doc, "taxis") and not matches(doc, "bus")
+
+
+def test_prefix_search_newest_first(db, expense):
+    index = SearchIndex().attach(db)
+    ids = db.insert_multiple([
+        expense(category="Transport", note="taxi", date="2025-11-03 10:00"),
+        expense(category="Food", note="lunch", date="2025-11-01 10:00"),
+        expense(category="Taxes", note="", date="2025-11-02 10:00"),
+        expense(category="Food", note="taxi snack", date="2025-11-04 10:00"),
+    ])
+    assert index.search("", 10) is None
+    assert index.search("tax", 10) == [ids[3], ids[0], ids[2]]
+    assert index.search("tax food", 10) == [ids[3]]
+    assert index.search("tax", 2) == [ids[3], ids[0]]
+    assert index.search("tax", 10, cursor=db.get(doc_id=ids[0])) == [ids[2]]
+    assert index.search("bus", 10) == []
+
+    db.update({"note": "bus"}, doc_ids=[ids[0]])
+    db.remove(doc_ids=[ids[3]])
+    assert index.search("tax", 10) == [ids[2]]
+    assert index.search("bus", 10) == [ids[0]]
+    assert "snack" not in index.postings and "snack" not in index.vocabulary
+
+
+def test_index_is_persisted_and_dropped_when_stale(tmp_path, db, expense):
+    path = str(tmp_path / "expenses.search")
+    db.insert_multiple([expense(category="Coffee", note="with friends"), expense(category="Rent")])
+    index = SearchIndex(path).attach(db)
+    assert os.path.exists(path)
+
+    loaded = SearchIndex(path)
+    assert loaded.load() and loaded.count == 2
+    assert loaded.search("fri", 10) == index.search("fri", 10)
+
+    # A change removes the stale file until the next save
+    db.insert(expense(category="Coffee"))
+    assert not os.path.exists(path)
+    assert index.save() and not index.save()
+    fresh = SearchIndex(path).attach(db)
+    assert fresh.count == 3 and len(fresh.search("coffee", 10)) == 2
+
+
+def test_index_of_truncated_records_is_not_trusted(tmp_path, db, expense):
+    path = str(tmp_path / "expenses.search")
+    db.insert(expense(category="Taxi"))
+    SearchIndex(path).attach(db)
+    with open(path, 'rb') as fh:
+        taxi_index = fh.read()
+
+    # Doc ids start over after a truncate: the old file must not survive
+    db.truncate()
+    assert not os.path.exists(path)
+    db.insert(expense(category="Food"))
+    assert SearchIndex(path).attach(db).search("food", 10) == [1]
+
+    # Nor be trusted when it did (a crash before the delete): same count, other record
+    with open(path, 'wb') as fh:
+        fh.write(taxi_index)
+    index = SearchIndex(path).attach(db)
+    assert index.search("taxi", 10) == [] and index.search("food", 10) == [1]
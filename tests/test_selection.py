@@ -0,0 +1,40 @@
+import os
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from selection import SelectionModel
+
+
+def test_set_selection_reports_flipped_ids():
+    selection = SelectionModel()
+    changes = []
+    selection.bind(changes.append)
+
+    assert selection.toggle(3) and selection.toggle(5) and not selection.toggle(3)
+    assert 5 in selection and 3 not in selection
+    assert selection.count(10) == 1 and not selection.is_empty(10)
+    selection.discard([5, 7])
+    assert changes == [(3,), (5,), (3,), [5]]
+    assert selection.is_empty(10)
+
+
+def test_select_all_keeps_exclusions():
+    selection = SelectionModel()
+    changes = []
+    selection.bind(changes.append)
+
+    selection.select_all()
+    assert 1 in selection and selection.count(1000000) == 1000000
+    assert not selection.toggle(2) and selection.count(10) == 9
+    selection.added(11)  # added after "select all": not selected
+    assert 11 not in selection and selection.resolve(range(1, 12)) == set(range(1, 11)) - {2}
+    assert changes == [None, (2,)]
+
+    # Copies are detached from the view
+    snapshot = selection.copy()
+    selection.clear()
+    assert 1 in snapshot and 1 not in selection and changes[-1] is None
+    assert selection.resolve([1, 2]) == set()
@@ -0,0 +1,38 @@
+import os
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from snapshot import load_snapshot, save_snapshot, snapshot_path_for
+
+
+def _row(doc_id):
+    return {'doc_id': doc_id, 'base_text': f"ETB {doc_id}.00 - Food",
+            'secondary_text': '2024-01-01 10:00', 'date': '2024-01-01 10:00',
+            'selected': True}
+
+
+def test_snapshot_round_trip_keeps_newest_rows(tmp_path):
+    path = snapshot_path_for(str(tmp_path / 'expenses.json'))
+    assert path.endswith('expenses.snapshot.json')
+    assert load_snapshot(path) is None
+
+    rows = [_row(i) for i in range(5, 0, -1)]
+    save_snapshot(path, rows, 1500, 5, {'Food': 1500}, limit=3)
+    data = load_snapshot(path)
+    assert data['total'] == 1500 and data['count'] == 5
+    assert data['by_category'] == {'Food': 1500}
+    assert [r['doc_id'] for r in data['rows']] == [5, 4, 3]
+    assert not any(r['selected'] for r in data['rows'])
+
+
+def test_placeholder_rows_are_not_saved_and_bad_files_are_ignored(tmp_path):
+    path = str(tmp_path / 'expenses.snapshot.json')
+    save_snapshot(path, [{'doc_id': None, 'base_text': 'No expenses'}], 0, 0)
+    assert load_snapshot(path)['rows'] == []
+
+    with open(path, 'w', encoding='utf-8') as fh:
+        fh.write('{"format": 1, "total": ')
+    assert load_snapshot(path) is None
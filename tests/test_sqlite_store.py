@@ -0,0 +1,105 @@
+import json
+import os
+import sqlite3
+import sys
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from sqlite_store import SQLiteStore, import_tinydb
+from storage import open_store
+
+
+def _expense(amount, category="Food", note="", date="2025-11-11 12:00"):
+    return {"amount": amount, "category": category, "note": note, "date": date}
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = SQLiteStore(str(tmp_path / "expenses.sqlite3"))
+    yield s
+    s.close()
+
+
+def test_sqlite_crud(store):
+    first = store.insert(_expense(10.0))
+    second = store.insert({**_expense(20.0, "Transport"), "tag": "work"})
+
+    docs = {d.doc_id: d for d in store.all()}
+    assert docs[first]["amount"] == 10.0
+    assert docs[second]["tag"] == "work"
+
+    assert store.update({"amount": 12.5}, doc_ids=[first]) == [first]
+    assert store.get(doc_id=first)["amount"] == 12.5
+
+    assert store.remove(doc_ids=[first, 999]) == [first]
+    assert [d.doc_id for d in store.all()] == [second]
+    assert len(store) == 1
+
+    store.truncate()
+    assert store.all() == []
+
+
+def test_indexed_queries(store):
+    store.insert_multiple([
+        _expense(1.0, "Food", date="2025-10-31 09:00"),
+        _expense(2.0, "Rent", date="2025-11-01 08:00"),
+        _expense(3.0, "Food", date="2025-11-15 19:30"),
+        _expense(4.0, "Food", date="2025-12-01 00:00"),
+    ])
+    november = store.by_date_range("2025-11-01", "2025-12-01")
+    assert [d["amount"] for d in november] == [3.0, 2.0]
+
+    food = store.by_category("Food")
+    assert [d["amount"] for d in food] == [4.0, 3.0, 1.0]
+    assert [d["amount"] for d in store.by_category("Food", start="2025-11")] == [4.0, 3.0]
+
+    plan = store._conn.execute(
+        "EXPLAIN QUERY PLAN SELECT id FROM expenses WHERE category = ?", ("Food",)).fetchall()
+    assert any("idx_expenses_category_date" in str(row) for row in plan)
+
+
+def test_import_tinydb_once(tmp_path, store):
+    legacy = tmp_path / "expenses.json"
+    legacy.write_text(json.dumps({"_default": {"4": _expense(5.0), "9": _expense(6.0)}}))
+
+    assert import_tinydb(store, str(legacy)) == 2
+    assert sorted(d.doc_id for d in store.all()) == [4, 9]
+    # Store already has data: a second import is a no-op
+    assert import_tinydb(store, str(legacy)) == 0
+    assert store.insert(_expense(1.0)) == 10
+
+
+def test_open_store_sqlite_imports_only_on_creation(tmp_path):
+    db_path = str(tmp_path / "expenses.json")
+    with open(db_path, 'w', encoding='utf-8') as fh:
+        json.dump({"_default": {"1": _expense(5.0)}}, fh)
+
+    db = open_store(db_path, engine='sqlite')
+    assert len(db) == 1
+    db.truncate()
+    db.close()
+
+    reopened = open_store(db_path, engine='sqlite')
+    assert len(reopened) == 0
+    reopened.close()
+
+
+def test_schema_without_cents_column_is_upgraded(tmp_path):
+    path = str(tmp_path / "old.sqlite3")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE expenses (id INTEGER PRIMARY KEY, amount REAL, category TEXT, "
+                 "note TEXT, date TEXT, extra TEXT)")
+    conn.execute("INSERT INTO expenses VALUES (1, 2.5, 'Food', '', '2025-11-11 12:00', NULL)")
+    conn.commit()
+    conn.close()
+
+    store = SQLiteStore(path)
+    assert store.get(doc_id=1) == {"amount": 2.5, "category": "Food", "note": "",
+                                   "date": "2025-11-11 12:00"}
+    doc_id = store.insert({"amount_cents": 250, "category": "Food", "note": "", "date": "x"})
+    assert store.get(doc_id=doc_id)["amount_cents"] == 250
+    store.close()
@@ -0,0 +1,388 @@
+import datetime
+import threading
+import time
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import main
+from selection import SelectionModel
+from storage import flush_store, open_store
+
+
+def _fake_screen():
+    ids = SimpleNamespace(
+        expense_list=SimpleNamespace(data=[]),
+        total_label=SimpleNamespace(text=''),
+        delete_selected_button=SimpleNamespace(disabled=True, opacity=0.0),
+        **{name: SimpleNamespace(disabled=False) for name in
+           ('add_button', 'import_button', 'export_button', 'delete_all_button')})
+    return SimpleNamespace(ids=ids)
+
+
+def _expense(cents, category='Food', date='2024-01-01 10:00', note=''):
+    return {'amount_cents': cents, 'category': category, 'note': note, 'date': date}
+
+
+def _seed(data_dir, *docs):
+    store = open_store(str(data_dir / 'expenses.json'))
+    store.insert_multiple(list(docs))
+    store.close()
+
+
+@pytest.fixture
+def start_app(tmp_path, monkeypatch):
+    """``start_app(*docs, started=True)``: seed the store, then build an app on a fake screen.
+
+    The deferred storage start runs inline (there is no executor). The
+    store is closed after the test.
+    """
+    monkeypatch.setattr(main, 'db', None)
+
+    def start(*docs, started=True):
+        if docs:
+            _seed(tmp_path, *docs)
+        app = main.ExpenseTrackerApp()
+        app.directory = str(tmp_path)
+        screen = _fake_screen()
+        monkeypatch.setattr(app, 'get_main_screen', lambda: screen)
+        monkeypatch.setattr(app, 'notify', lambda message: None)
+        if started:
+            app.start_storage()
+        return app
+
+    yield start
+    if main.db is not None:
+        main.db.close()
+
+
+def _shown(app):
+    return [r['base_text'] for r in app.get_main_screen().ids.expense_list.data]
+
+
+def test_store_is_opened_after_the_first_frame(start_app):
+    app = start_app(_expense(250, 'Food', '2024-01-01 10:00'),
+                    _expense(400, 'Taxi', '2024-01-02 10:00'), started=False)
+    ids = app.get_main_screen().ids
+    app.startup = main.perf.StageTimer('startup')
+
+    # First frame: empty list, store-backed actions disabled
+    app._set_storage_ready(False)
+    app.update_list()
+    assert ids.expense_list.data == []
+    assert ids.add_button.disabled and ids.export_button.disabled
+
+    # No executor here, so the deferred stages run inline
+    app.start_storage()
+    assert app.storage_ready and not ids.add_button.disabled
+    assert _shown(app) == ['ETB 4.00 - Taxi', 'ETB 2.50 - Food']
+    assert ids.total_label.text == 'ETB 6.50'
+    assert app.startup is None  # breakdown logged once the list is shown
+
+
+def test_first_paint_comes_from_the_snapshot(start_app, tmp_path):
+    app = start_app(_expense(300, note='tea'), started=False)
+    assert app.render_snapshot() is False  # first run: nothing to show yet
+    app.start_storage()  # reconciles and writes the snapshot
+    main.db.close()
+
+    app = start_app(started=False)
+    assert app.render_snapshot() is True
+    assert _shown(app) == ['ETB 3.00 - Food']
+    assert app.get_main_screen().ids.total_label.text == 'ETB 3.00'
+    app.save_snapshot()  # nothing to save before the store is open
+
+    _seed(tmp_path, _expense(100, 'Taxi', '2024-01-02 10:00'))
+    app.start_storage()
+    assert _shown(app) == ['ETB 1.00 - Taxi', 'ETB 3.00 - Food']
+    assert app.get_main_screen().ids.total_label.text == 'ETB 4.00'
+
+
+def test_period_filter_shows_only_that_period(start_app):
+    now = datetime.datetime.now().strftime('%Y-%m-%d %H:%M')
+    app = start_app(_expense(250, 'Food', now), _expense(400, 'Taxi', '2001-01-02 10:00'))
+    total_label = app.get_main_screen().ids.total_label
+
+    app.set_period('month')
+    assert _shown(app) == ['ETB 2.50 - Food']
+    assert total_label.text == 'ETB 2.50'
+
+    # Adds while filtered rebuild the (cheap) filtered view
+    doc = _expense(100, 'Tea', now)
+    app._insert_row(main.Document(doc, main.db.insert(doc)))
+    assert len(_shown(app)) == 2
+    assert total_label.text == 'ETB 3.50'
+
+    app.set_period('all')
+    assert len(_shown(app)) == 3
+    assert total_label.text == 'ETB 7.50'
+
+
+def test_list_loads_pages_on_scroll(start_app, monkeypatch):
+    monkeypatch.setattr(main, 'LIST_PAGE_SIZE', 3)
+    app = start_app(*(_expense(i * 100, date=f'2024-01-{i:02d} 10:00') for i in range(1, 8)))
+
+    # First page shown, the next one already prefetched
+    assert _shown(app) == ['ETB 7.00 - Food', 'ETB 6.00 - Food', 'ETB 5.00 - Food']
+    assert app._prefetched is not None
+    assert app.get_main_screen().ids.total_label.text == 'ETB 28.00'
+
+    app.on_list_scroll(0.9)
+    assert len(_shown(app)) == 3
+    app.on_list_scroll(0.1)
+    assert len(_shown(app)) == 6
+
+    # A deleted row is not resurrected by the prefetched page
+    main.db.remove(doc_ids=[1])
+    app._remove_rows([1])
+    app.load_more()
+    assert _shown(app)[-1] == 'ETB 2.00 - Food' and not app._has_more
+
+
+def test_pages_without_a_ledger_come_from_the_store(start_app, monkeypatch):
+    monkeypatch.setattr(main, 'LIST_PAGE_SIZE', 3)
+    app = start_app(*(_expense(i * 100, date=f'2024-01-{i:02d} 10:00') for i in range(1, 8)))
+    app.ledger = None
+    # A large view would not fit the cache and be rebuilt for every page
+    monkeypatch.setattr(app.query_cache, 'sorted_view', None)
+
+    app.update_list()
+    app.load_more()
+    assert _shown(app)[:4] == ['ETB 7.00 - Food', 'ETB 6.00 - Food', 'ETB 5.00 - Food',
+                               'ETB 4.00 - Food']
+    assert len(_shown(app)) == 6
+
+
+def test_search_box_filters_the_list(start_app):
+    app = start_app(_expense(250, 'Food', '2024-01-01 10:00', 'lunch'),
+                    _expense(400, 'Taxi', '2024-01-02 10:00'),
+                    _expense(100, 'Food', '2024-01-03 10:00', 'taxi snack'))
+
+    app.on_search_text('ta')
+    assert _shown(app) == ['ETB 1.00 - Food', 'ETB 4.00 - Taxi']
+    app.on_search_text('ta fo')
+    assert _shown(app) == ['ETB 1.00 - Food']
+
+    # Without the index the store's pages are filtered instead
+    app.search_index = None
+    app.update_list()
+    assert _shown(app) == ['ETB 1.00 - Food']
+
+    app.on_search_text('  ')
+    assert len(_shown(app)) == 3
+
+    # Punctuation alone has no terms: it filters nothing
+    app.search_index = main.SearchIndex().attach(main.db)
+    app.on_search_text('.')
+    assert app.search_query == '' and len(_shown(app)) == 3
+    rows, _, _ = app._fetch_page(None, app.selection.copy(), query='.')
+    assert len(rows) == 3
+
+
+def test_added_categories_reuse_the_known_spelling(start_app):
+    app = start_app(_expense(250, 'Food'))
+    ids = app.get_main_screen().ids
+    ids.amount = SimpleNamespace(text='3')
+    ids.category = SimpleNamespace(text='', focus=False)
+    ids.note = SimpleNamespace(text='')
+
+    assert app.category_suggestions('fo') == ['Food']
+    assert app.category_suggestions('Food') == []
+    ids.category.text = ' FOOD'
+    app.add_expense()
+    assert [d['category'] for d in main.db.all()] == ['Food', 'Food']
+    assert ids.category.text == ''
+
+
+def test_clear_and_delete_all_reset_without_a_rescan(start_app, monkeypatch):
+    app = start_app(*(_expense(100 * i, date=f'2024-01-0{i} 10:00') for i in range(1, 5)))
+    ids = app.get_main_screen().ids
+
+    assert app._remove_expenses(SelectionModel(ids=[1, 2, 99])) == [1, 2]
+    assert app.aggregates.total == 700
+    # Selecting every expense truncates instead of removing id by id
+    monkeypatch.setattr(main.db, 'remove', None)
+    assert app._remove_expenses(SelectionModel(all_selected=True)) is None
+    assert len(main.db) == 0 and app.aggregates.total == 0
+
+    main.db.insert(_expense(5, 'Tea', '2024-02-01 10:00'))
+    app.update_list()
+    app.clear_database()
+    assert len(main.db) == 0 and len(app.ledger) == 0
+    assert [r['doc_id'] for r in ids.expense_list.data] == [None]
+    assert ids.total_label.text == 'ETB 0.00' and not app.selection.count(1)
+
+
+def test_select_all_covers_only_the_filtered_view(start_app):
+    now = datetime.datetime.now().strftime('%Y-%m-%d %H:%M')
+    app = start_app(_expense(100, 'Food', now, 'lunch'), _expense(200, 'Taxi', now),
+                    _expense(300, 'Food', '2001-01-02 10:00', 'lunch'),
+                    _expense(400, 'Rent', '2001-01-03 10:00'))
+    everything = SelectionModel(all_selected=True)
+
+    app.set_period('month')
+    assert app._selected_doc_ids(everything, app.period) == [1, 2]
+    app.on_search_text('lunch')
+    assert app._selected_doc_ids(everything, app.period, app.search_query) == [1]
+    app.search_index = None  # the store is scanned instead
+    assert app._selected_doc_ids(everything, app.period, app.search_query) == [1]
+
+    assert app._remove_expenses(everything, app.period, app.search_query) == [1]
+    app.on_search_text('')
+    assert app._remove_expenses(SelectionModel(all_selected=True, ids=[2]), app.period) == []
+    assert [d.doc_id for d in main.db.all()] == [2, 3, 4]
+    assert app.aggregates.total == 900
+
+    # Changing the filter drops a "select all"
+    app.toggle_select_all(None, True)
+    app.set_period('all')
+    assert app.selection.is_empty(3)
+    app.toggle_select_all(None, True)
+    app.on_search_text('lunch')
+    assert app.selection.is_empty(3)
+
+
+def test_bulk_delete_clears_the_selection(start_app, monkeypatch):
+    import kivymd.uix.button
+    import kivymd.uix.dialog
+    now = datetime.datetime.now().strftime('%Y-%m-%d %H:%M')
+    app = start_app(_expense(100, 'Food', now), _expense(300, 'Food', '2001-01-02 10:00'))
+    # Confirm every dialog at once
+    monkeypatch.setattr(kivymd.uix.button, 'MDFlatButton', SimpleNamespace)
+    monkeypatch.setattr(kivymd.uix.dialog, 'MDDialog', lambda text, buttons: SimpleNamespace(
+        open=lambda: buttons[0].on_release(None), dismiss=lambda: None))
+
+    app.set_period('month')
+    app.toggle_select_all(None, True)
+    app.delete_selected()
+    assert [d.doc_id for d in main.db.all()] == [2] and not app.selection.all
+    app.set_period('all')
+    assert app.selection.is_empty(1) and _shown(app) == ['ETB 3.00 - Food']
+
+
+def test_selection_repaints_the_displayed_rows(start_app):
+    from kivy.uix.recycleview import RecycleView
+    app = start_app(_expense(300), started=False)
+    app.render_snapshot()
+    app.start_storage()  # writes the snapshot
+    main.db.close()
+
+    # Second launch: the store returns the rows the snapshot already shows
+    app = start_app(started=False)
+    expense_list = app.get_main_screen().ids.expense_list = RecycleView()
+    assert app.render_snapshot() is True
+    app.start_storage()
+    app.toggle_select(1)
+    assert [r['selected'] for r in expense_list.data] == [True]
+    app.toggle_select_all(None, False)
+    assert [r['selected'] for r in expense_list.data] == [False]
+
+
+def test_selection_repaints_only_changed_rows(start_app, monkeypatch):
+    monkeypatch.setattr(main, 'LIST_PAGE_SIZE', 5)
+    app = start_app(*(_expense(100, date=f'2024-01-{i:02d} 10:00') for i in range(1, 21)))
+    ids = app.get_main_screen().ids
+    refreshes = []
+    ids.expense_list.refresh_from_data = lambda: refreshes.append(1)
+
+    rows = ids.expense_list.data
+    app.toggle_select(20)
+    assert [r['selected'] for r in rows] == [True] + [False] * 4
+    assert not ids.delete_selected_button.disabled
+    app.toggle_select(3)  # not loaded: the model changes, no repaint
+    assert len(refreshes) == 1 and 3 in app.selection
+
+    # Select all touches the model and the loaded rows only
+    app.toggle_select_all(None, True)
+    assert all(r['selected'] for r in rows) and len(refreshes) == 2
+    app.toggle_select(19)
+    assert app.selection.count(20) == 19
+
+    app.load_more()
+    assert [r['selected'] for r in rows[5:]] == [True] * 5
+
+    # Bulk delete resolves the exclusions on the worker
+    removed = app._remove_expenses(app.selection.copy())
+    app._remove_rows(removed)
+    assert [d.doc_id for d in main.db.all()] == [19]
+    rows = ids.expense_list.data
+    assert [r['doc_id'] for r in rows] == [19] and not rows[0]['selected']
+
+
+def test_refreshes_are_batched_once_scheduled(monkeypatch):
+    monkeypatch.setattr(main, 'db', None)
+    app = main.ExpenseTrackerApp()
+    passes = []
+    monkeypatch.setattr(app, '_refresh_passes', lambda: [
+        (name, lambda name=name: passes.append(name)) for name in ('texts', 'list', 'buttons')])
+
+    # Without a scheduler every request runs at once
+    app.update_list()
+    app.update_list()
+    assert passes == ['list', 'list']
+
+    app.refresher = main.RefreshScheduler(app._refresh_passes())
+    app.update_ui_texts()
+    app.update_list()
+    app.update_action_buttons_visibility()
+    app.update_list()
+    app.refresher.flush()
+    assert passes[2:] == ['texts', 'list', 'buttons']
+    assert app.refresher.coalesced['list'] == 1
+
+
+def test_snapshot_is_written_on_the_worker(start_app, monkeypatch):
+    app = start_app(_expense(300), started=False)
+    app.render_snapshot()
+    app.start_storage()
+    app._snapshot_dirty = True
+    writers = []
+    real_save = main.save_snapshot
+    monkeypatch.setattr(main, 'save_snapshot', lambda *args: (
+        writers.append(threading.current_thread().name), real_save(*args)))
+    app.executor = main.StorageExecutor(dispatch=lambda callback: callback())
+    try:
+        app.save_snapshot()
+        app.executor.wait()
+        assert writers == ['db-worker'] and not app._snapshot_dirty
+        assert main.load_snapshot(app.snapshot_path)['total'] == 300
+        app.save_snapshot()  # nothing changed since
+        assert len(writers) == 1
+    finally:
+        app.executor.shutdown()
+
+
+def test_pause_returns_once_the_writes_are_flushed(start_app, monkeypatch):
+    app = start_app(_expense(300))
+    main.db.engine.deferred_sync = True
+    app.executor = main.StorageExecutor(dispatch=lambda callback: callback())
+    flushed = []
+    monkeypatch.setattr(main, 'flush_store', lambda store: (
+        time.sleep(0.05), flushed.append(flush_store(store))))
+    try:
+        app.run_db(main.db.insert, _expense(100))
+        assert app.on_pause() is True
+        assert flushed == [1]  # the insert's fsync, before on_pause returned
+    finally:
+        app.executor.shutdown()
+
+
+def test_pause_does_not_wait_for_a_long_queue(start_app, monkeypatch):
+    app = start_app(_expense(300))
+    monkeypatch.setattr(main, 'PAUSE_WRITE_TIMEOUT', 0.05)
+    app.executor = main.StorageExecutor(dispatch=lambda callback: callback())
+    release = threading.Event()
+    try:
+        app.run_db(release.wait)  # e.g. a large import
+        started = time.perf_counter()
+        assert app.on_pause() is True
+        assert time.perf_counter() - started < 1
+    finally:
+        release.set()
+        app.executor.shutdown()
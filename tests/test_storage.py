@@ -0,0 +1,275 @@
+import json
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import storage
+from storage import JournalStore, open_store
+
+
+def _expense(amount, category="Food", note="", date="2025-11-11 12:00"):
+    return {"amount": amount, "category": category, "note": note, "date": date}
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "expenses.json")
+
+
+def test_journal_crud_and_replay(db_path):
+    db = open_store(db_path, engine='journal')
+    first = db.insert(_expense(10.0))
+    second = db.insert(_expense(20.0, "Transport"))
+    db.update({"amount": 15.0}, doc_ids=[first])
+    db.remove(doc_ids=[second])
+    db.close()
+
+    reopened = open_store(db_path, engine='journal')
+    docs = reopened.all()
+    assert len(docs) == 1
+    assert docs[0].doc_id == first
+    assert docs[0]["amount"] == 15.0
+    # like TinyDB, the next id follows the highest live id
+    assert reopened.insert(_expense(1.0)) == first + 1
+    reopened.close()
+
+
+def test_insert_appends_instead_of_rewriting(db_path):
+    db = open_store(db_path, engine='journal')
+    db.insert(_expense(1.0))
+    size_after_one = os.path.getsize(db.path)
+    for _ in range(50):
+        db.insert(_expense(1.0))
+    with open(db.path, encoding='utf-8') as fh:
+        lines = fh.readlines()
+    assert len(lines) == 51
+    assert os.path.getsize(db.path) < size_after_one * 60
+    db.close()
+
+
+def test_migrates_existing_tinydb_file(db_path):
+    with open(db_path, 'w', encoding='utf-8') as fh:
+        json.dump({"_default": {"3": _expense(5.0), "7": _expense(6.0, "Rent")}}, fh)
+
+    db = open_store(db_path, engine='journal')
+    docs = {d.doc_id: d for d in db.all()}
+    assert set(docs) == {3, 7}
+    assert docs[7]["category"] == "Rent"
+    assert db.insert(_expense(1.0)) == 8
+    db.close()
+
+
+def test_empty_legacy_file_is_migrated(db_path):
+    open(db_path, 'w').close()
+    db = open_store(db_path, engine='journal')
+    assert db.all() == []
+    db.close()
+
+
+def test_torn_trailing_write_is_dropped(db_path):
+    db = open_store(db_path, engine='journal')
+    db.insert(_expense(1.0))
+    path = db.path
+    db.close()
+    with open(path, 'a', encoding='utf-8') as fh:
+        fh.write('{"op": "put", "id": 2, "doc": {"amo')
+
+    db = JournalStore(path)
+    assert len(db) == 1
+    assert db.insert(_expense(2.0)) == 2
+    db.close()
+    assert len(JournalStore(path)) == 2
+
+
+def test_compaction_keeps_live_documents(db_path, monkeypatch):
+    monkeypatch.setattr(storage, 'COMPACT_MIN_GARBAGE', 10)
+    db = open_store(db_path, engine='journal')
+    keep = db.insert(_expense(99.0))
+    for _ in range(20):
+        db.remove(doc_ids=[db.insert(_expense(1.0))])
+    with open(db.path, encoding='utf-8') as fh:
+        assert len(fh.readlines()) < 10
+    db.close()
+
+    reopened = open_store(db_path, engine='journal')
+    assert [d.doc_id for d in reopened.all()] == [keep]
+    reopened.close()
+
+
+def test_unknown_engine_rejected(db_path):
+    with pytest.raises(ValueError):
+        open_store(db_path, engine='nope')
+
+
+def test_observable_store_emits_events(db_path):
+    events = []
+
+    class Recorder(storage.StoreObserver):
+        def on_insert(self, doc):
+            events.append(('insert', doc.doc_id, doc['amount']))
+
+        def on_update(self, old_doc, new_doc):
+            events.append(('update', old_doc['amount'], new_doc['amount']))
+
+        def on_remove(self, doc):
+            events.append(('remove', doc.doc_id))
+
+        def on_clear(self):
+            events.append(('clear',))
+
+    db = open_store(db_path, engine='journal')
+    db.subscribe(Recorder())
+    doc_id = db.insert(_expense(1.0))
+    db.update({"amount": 2.0}, doc_ids=[doc_id])
+    db.remove(doc_ids=[doc_id, 42])
+    db.truncate()
+    assert events == [
+        ('insert', doc_id, 1.0),
+        ('update', 1.0, 2.0),
+        ('remove', doc_id),
+        ('clear',),
+    ]
+    db.close()
+
+
+@pytest.mark.parametrize('engine', ['journal', 'sqlite', 'tinydb'])
+def test_float_amounts_are_migrated_to_cents(db_path, engine):
+    db = open_store(db_path, engine=engine)
+    legacy = db.insert_multiple([_expense(0.1), _expense(1234.56, "Rent")])
+    current = db.insert({"amount_cents": 500, "category": "Food", "note": "",
+                         "date": "2025-11-11 12:00"})
+    updates = []
+
+    class Recorder(storage.StoreObserver):
+        def on_update(self, old_doc, new_doc):
+            updates.append(new_doc.doc_id)
+
+    db.subscribe(Recorder())
+    assert storage.migrate_amounts_to_cents(db) == 2
+    assert sorted(updates) == legacy
+    assert [d.get('amount_cents') for d in db.get(doc_ids=legacy + [current])] == [10, 123456, 500]
+    assert not any('amount' in d for d in db.all())
+    assert storage.migrate_amounts_to_cents(db) == 0
+    db.close()
+
+
+@pytest.mark.parametrize('engine', ['journal', 'sqlite', 'tinydb', 'memory'])
+def test_pages_are_newest_first_and_keyset_stable(db_path, engine):
+    if engine == 'memory':
+        db = storage.ObservableStore(storage.MemoryStore())
+    else:
+        db = open_store(db_path, engine=engine)
+    db.insert_multiple([_expense(i, date=f"2025-01-{i % 9 + 1:02d} 10:00") for i in range(20)])
+    expected = [d.doc_id for d in sorted(
+        db.all(), key=lambda d: (d['date'], d.doc_id), reverse=True)]
+
+    assert [d.doc_id for d in storage.page(db, 0, 5)] == expected[:5]
+    assert [d.doc_id for d in storage.page(db, 15, 10)] == expected[15:]
+    walked, cursor = [], None
+    while True:
+        chunk = storage.page_after(db, cursor, 6)
+        if not chunk:
+            break
+        walked.extend(d.doc_id for d in chunk)
+        cursor = chunk[-1]
+    assert walked == expected
+
+    # Writes elsewhere don't shift a cursor
+    cursor = storage.page(db, 0, 5)[-1]
+    db.insert(_expense(99, date="2025-02-01 10:00"))
+    db.remove(doc_ids=[expected[0]])
+    db.update({"date": "2024-12-31 10:00"}, doc_ids=[expected[6]])
+    assert [d.doc_id for d in storage.page_after(db, cursor, 4)] == [
+        expected[5], expected[7], expected[8], expected[9]]
+    assert storage.page_after(db, db.get(doc_id=expected[6]), 5) == []
+    db.close()
+
+
+@pytest.mark.parametrize('engine', ['journal', 'tinydb'])
+def test_write_behind_group_commits(db_path, engine, monkeypatch):
+    syncs = []
+    real_fsync = os.fsync
+    monkeypatch.setattr(storage.os, 'fsync', lambda fd: (syncs.append(fd), real_fsync(fd)))
+    commits = []
+    db = open_store(db_path, engine=engine, write_behind=True)
+    db.subscribe(storage.CommitHook(lambda: commits.append(len(syncs))))
+    ids = [db.insert(_expense(i)) for i in range(5)]
+    db.update({"note": "x"}, doc_ids=ids[:2])
+    assert commits == [0] * 6 and not syncs
+
+    # One flush makes the whole burst durable
+    assert storage.flush_store(db) == 6
+    assert len(syncs) == 1 and storage.flush_store(db) == 0
+    reopened = open_store(db_path, engine=engine)
+    assert [d.get('note') for d in reopened.all()] == ["x", "x", "", "", ""]
+    reopened.close()
+
+    # close() flushes whatever is still buffered
+    db.remove(doc_ids=ids[:1])
+    db.close()
+    reopened = open_store(db_path, engine=engine)
+    assert len(reopened) == 4
+    reopened.close()
+
+
+def test_atomic_json_storage_keeps_the_old_file_on_failure(db_path, monkeypatch):
+    db = open_store(db_path, engine='tinydb')
+    db.insert(_expense(1.0))
+
+    def torn_dump(data, fh, **kwargs):
+        fh.write('{"_default": {"1": ')
+        raise OSError('disk full')
+
+    monkeypatch.setattr(storage.json, 'dump', torn_dump)
+    with pytest.raises(OSError):
+        db.insert(_expense(2.0))
+    monkeypatch.undo()
+    with open(db_path, encoding='utf-8') as fh:
+        assert len(json.load(fh)['_default']) == 1
+    db.close()
+
+
+@pytest.mark.parametrize('engine', ['journal', 'tinydb'])
+def test_bulk_remove_and_truncate_are_single_writes(db_path, engine, monkeypatch):
+    db = open_store(db_path, engine=engine)
+    ids = db.insert_multiple([_expense(i) for i in range(50)])
+    writes = []
+    if engine == 'journal':
+        real_append = db.engine._append
+        monkeypatch.setattr(db.engine, '_append', lambda e: (writes.append(1), real_append(e)))
+        real_compact = db.engine.compact
+        monkeypatch.setattr(db.engine, 'compact', lambda: (writes.append(1), real_compact()))
+    else:
+        real_write = storage.AtomicJSONStorage.write
+        monkeypatch.setattr(storage.AtomicJSONStorage, 'write',
+                            lambda self, data: (writes.append(1), real_write(self, data)))
+
+    # Unknown and repeated ids are skipped instead of failing the write
+    removed = db.remove_many(ids[:40] + [999] + ids[:5])
+    assert sorted(removed) == ids[:40] and len(writes) == 1
+    assert db.remove_many([999]) == [] and len(writes) == 1
+    db.subscribe(storage.StoreObserver())
+    assert sorted(db.remove_many(ids[40:45])) == ids[40:45] and len(writes) == 2
+
+    db.truncate()
+    assert len(db) == 0 and len(writes) == 3
+    db.close()
+
+
+def test_memory_store_builds_its_date_order_on_the_first_page():
+    db = storage.MemoryStore()
+    db.insert_multiple([_expense(i, date=f"2025-01-{i:02d} 10:00") for i in range(1, 6)])
+    db.remove(doc_ids=[2])
+    assert db._order is None  # writes alone don't keep an index
+
+    assert [d.doc_id for d in db.page(0, 2)] == [5, 4]
+    db.insert(_expense(9, date="2025-01-03 12:00"))
+    db.update({"date": "2024-12-31 10:00"}, doc_ids=[5])
+    assert [d.doc_id for d in db.after(None, 10)] == [4, 6, 3, 1, 5]
+    db.truncate()
+    assert db._order is None and db.page(0, 5) == []
@@ -0,0 +1,69 @@
+import os
+import shutil
+import sys
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import translations
+from translations import TranslationManager, parse_po
+
+
+@pytest.fixture
+def localedir(tmp_path):
+    target = tmp_path / 'locales'
+    shutil.copytree(os.path.join(ROOT, 'locales'), str(target),
+                    ignore=shutil.ignore_patterns('*.catalog'))
+    return str(target)
+
+
+def test_parse_po_handles_multiline_and_escapes(tmp_path):
+    po = tmp_path / 'app.po'
+    po.write_text(
+        'msgid ""\n'
+        'msgstr ""\n'
+        '"Content-Type: text/plain; charset=utf-8\\n"\n'
+        '\n'
+        'msgid "greeting"\n'
+        'msgstr "Hello, "\n'
+        '"\\"world\\""\n'
+        '\n'
+        'msgid "untranslated"\n'
+        'msgstr ""\n',
+        encoding='utf-8')
+    assert parse_po(str(po)) == {'greeting': 'Hello, "world"'}
+
+
+def test_languages_load_lazily_and_once(localedir, monkeypatch):
+    manager = TranslationManager(localedir)
+    builds = []
+    real_build = translations.build_catalog
+    monkeypatch.setattr(translations, 'build_catalog',
+                        lambda *a: builds.append(a) or real_build(*a))
+
+    assert manager.catalogs == {}
+    _ = manager.gettext_func('am')
+    assert list(manager.catalogs) == ['am']
+    assert _("amount") == "መጠን"
+    assert _("missing_key") == "missing_key"
+    manager.gettext_func('am')
+    assert len(builds) == 1
+
+
+def test_catalog_cache_is_reused_until_sources_change(localedir, monkeypatch):
+    TranslationManager(localedir).catalog('om')
+    po_path, mo_path, catalog_path = translations.source_paths(localedir, 'om')
+    assert os.path.exists(catalog_path)
+
+    monkeypatch.setattr(translations, 'build_catalog',
+                        lambda *a: pytest.fail("cache should have been used"))
+    assert TranslationManager(localedir).catalog('om')['amount'] == "Hammanta"
+
+    monkeypatch.undo()
+    with open(po_path, 'a', encoding='utf-8') as fh:
+        fh.write('\nmsgid "brand_new"\nmsgstr "Haaraa"\n')
+    os.utime(po_path, (1, 1))
+    assert TranslationManager(localedir).catalog('om')['brand_new'] == "Haaraa"
@@ -67,7 +67,7 @@ def test_add_flow_injected_inputs(tmp_path, monkeypatch):
     entries = test_db.all()
     assert len(entries) == 1
     e = entries[0]
-    assert float(e['amount']) == 123.45
+    assert e['amount_cents'] == 12345
     assert e['category'] == 'TestCategory'
     assert 'Unit test note' in e['note']
     # Cleanup
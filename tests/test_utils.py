@@ -1,5 +1,6 @@
 import pytest
-from utils import validate_expense, safe_parse_amount
+from utils import (validate_expense, safe_parse_amount, parse_amount_cents, format_cents,
+                   expense_cents)
 
 def test_safe_parse_amount():
     # Valid amounts
@@ -15,6 +16,11 @@ def test_safe_parse_amount():
     assert safe_parse_amount("12.34.56") is None
     assert safe_parse_amount("$100") is None
 
+    # Decimals past cents are rounded half up, not dropped
+    assert safe_parse_amount("12.345") == 12.35
+    assert safe_parse_amount("12.344") == 12.34
+    assert safe_parse_amount("0.005") == 0.01
+
 def test_validate_expense():
     # Valid expenses
     assert validate_expense("123.45", "Food") == (True, None)
@@ -34,4 +40,24 @@ def test_validate_expense():
     
     # Negative amount (valid in parser but rejected by validator)
     assert validate_expense("-100", "Food") == (False, "negative_amount")
-    assert validate_expense("-123.45", "Food") == (False, "negative_amount")
\ No newline at end of file
+    assert validate_expense("-123.45", "Food") == (False, "negative_amount")
+
+def test_amounts_in_integer_cents():
+    assert parse_amount_cents("0.29") == 29
+    assert parse_amount_cents("1,000.5") == 100050
+    assert parse_amount_cents("-123.45") == -12345
+    assert parse_amount_cents("1.005") == 101  # extra decimals round half up
+    assert parse_amount_cents("12.") is None
+    assert parse_amount_cents("1e3") is None
+    assert format_cents(29) == "0.29"
+    assert format_cents(-100050) == "-1000.50"
+    # Float amounts of records written before cents are converted exactly
+    assert expense_cents({"amount_cents": 29}) == 29
+    assert expense_cents({"amount": 0.29}) == 29
+    assert sum(expense_cents({"amount": a}) for a in (0.1, 0.2)) == 30
+    # Half cents round up like typed amounts, whatever the binary float is
+    assert expense_cents({"amount": 0.285}) == parse_amount_cents("0.285") == 29
+    assert expense_cents({"amount": 1.005}) == parse_amount_cents("1.005") == 101
+    assert expense_cents({"amount": -0.285}) == -29
+    assert expense_cents({"amount": "2.5"}) == 250
+    assert expense_cents({"amount": "abc"}) == expense_cents({"amount": float("nan")}) == 0
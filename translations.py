@@ -0,0 +1,175 @@
+"""Lazy, cached translation catalogs.
+
+``TranslationManager`` loads a language the first time it is asked for and
+keeps the merged catalog (``.mo`` entries, with ``.po`` entries filling any
+gaps) as a plain dict, so ``_`` is a single dict lookup and switching
+languages never re-parses files.
+
+Merged catalogs are also cached on disk as ``app.catalog`` (a ``marshal``
+dump) next to the ``.po``/``.mo`` files and keyed on their mtimes.
+``compile_translations.py`` writes the same file ahead of time for every
+locale, and it ships with the app.
+"""
+
+import ast
+import gettext
+import marshal
+import os
+
+DOMAIN = 'app'
+CATALOG_EXT = '.catalog'
+# Bump when the cached catalog layout changes
+CATALOG_FORMAT = 1
+
+
+def parse_po(path):
+    """Parse a ``.po`` file into ``{msgid: msgstr}``.
+
+    Handles multi-line strings and escapes; the header entry, untranslated
+    entries and plural forms are skipped.
+    """
+    mapping = {}
+    msgid = msgstr = None
+    current = None
+    plural = False
+
+    def _flush():
+        if msgid and msgstr and not plural:
+            mapping[msgid] = msgstr
+
+    with open(path, 'r', encoding='utf-8') as fh:
+        for line in fh:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            if line.startswith('msgid '):
+                _flush()
+                msgid, msgstr, plural = ast.literal_eval(line[6:]), None, False
+                current = 'msgid'
+            elif line.startswith('msgid_plural '):
+                plural = True
+                current = None
+            elif line.startswith('msgstr '):
+                msgstr = ast.literal_eval(line[7:])
+                current = 'msgstr'
+            elif line.startswith('msgstr['):
+                current = None
+            elif line.startswith('"'):
+                if current == 'msgid':
+                    msgid += ast.literal_eval(line)
+                elif current == 'msgstr':
+                    msgstr += ast.literal_eval(line)
+            else:
+                current = None
+    _flush()
+    return mapping
+
+
+def load_mo(path):
+    """Return the singular ``{msgid: msgstr}`` entries of a ``.mo`` file."""
+    with open(path, 'rb') as fh:
+        catalog = gettext.GNUTranslations(fh)._catalog
+    return {k: v for k, v in catalog.items() if isinstance(k, str) and k and v}
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+def source_paths(localedir, lang, domain=DOMAIN):
+    base = os.path.join(localedir, lang, 'LC_MESSAGES', domain)
+    return base + '.po', base + '.mo', base + CATALOG_EXT
+
+
+def build_catalog(po_path, mo_path):
+    """Merge the ``.mo`` and ``.po`` entries for one language.
+
+    ``.mo`` translations win; ``.po`` entries fill in keys the compiled
+    catalog is missing (e.g. when the ``.mo`` is stale).
+    """
+    catalog = {}
+    if os.path.exists(po_path):
+        catalog.update(parse_po(po_path))
+    if os.path.exists(mo_path):
+        catalog.update((k, v) for k, v in load_mo(mo_path).items() if v != k)
+    return catalog
+
+
+def write_catalog(po_path, mo_path, catalog_path, catalog=None):
+    """Write the precompiled catalog for ``po_path``/``mo_path``.
+
+    Returns the catalog dict that was written.
+    """
+    if catalog is None:
+        catalog = build_catalog(po_path, mo_path)
+    payload = {
+        'format': CATALOG_FORMAT,
+        'po_mtime': _mtime(po_path),
+        'mo_mtime': _mtime(mo_path),
+        'catalog': catalog,
+    }
+    tmp_path = catalog_path + '.tmp'
+    with open(tmp_path, 'wb') as fh:
+        marshal.dump(payload, fh)
+    os.replace(tmp_path, catalog_path)
+    return catalog
+
+
+def read_catalog(po_path, mo_path, catalog_path):
+    """Return the cached catalog, or None when missing or out of date."""
+    try:
+        with open(catalog_path, 'rb') as fh:
+            payload = marshal.load(fh)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if (not isinstance(payload, dict)
+            or payload.get('format') != CATALOG_FORMAT
+            or payload.get('po_mtime') != _mtime(po_path)
+            or payload.get('mo_mtime') != _mtime(mo_path)):
+        return None
+    return payload.get('catalog')
+
+
+class TranslationManager:
+    """Loads each language's catalog on first use and keeps it in memory.
+
+    ``catalogs`` may be passed in to share the in-memory cache (``main``
+    uses its module-level ``TRANSLATIONS`` dict).
+    """
+
+    def __init__(self, localedir, domain=DOMAIN, catalogs=None):
+        self.localedir = localedir
+        self.domain = domain
+        self.catalogs = {} if catalogs is None else catalogs
+
+    def catalog(self, lang):
+        catalog = self.catalogs.get(lang)
+        if catalog is None:
+            catalog = self._load(lang)
+            self.catalogs[lang] = catalog
+        return catalog
+
+    def _load(self, lang):
+        po_path, mo_path, catalog_path = source_paths(self.localedir, lang, self.domain)
+        catalog = read_catalog(po_path, mo_path, catalog_path)
+        if catalog is not None:
+            return catalog
+        catalog = build_catalog(po_path, mo_path)
+        if catalog:
+            try:
+                write_catalog(po_path, mo_path, catalog_path, catalog)
+            except OSError:
+                # Read-only install: keep the catalog in memory only
+                pass
+        return catalog
+
+    def gettext_func(self, lang):
+        """Return a ``_`` function for ``lang``: one dict lookup per call."""
+        get = self.catalog(lang).get
+
+        def _(s):
+            return get(s, s)
+        return _
@@ -1,23 +1,71 @@
-import re
+from decimal import ROUND_HALF_UP, Decimal
 
+CENTS_PER_UNIT = 100
+_DIGITS = frozenset('0123456789')
 
-def safe_parse_amount(amount_str):
-    """Try to parse amount string to float. Returns float or None on failure."""
+
+def _is_digits(s):
+    return bool(s) and _DIGITS.issuperset(s)
+
+
+def parse_amount_cents(amount_str):
+    """Parse an amount string into integer cents. Returns int or None on failure.
+
+    Accepts an optional leading '-', commas as thousand separators and any
+    number of decimals (rounded half up to whole cents). No float is
+    involved, so "0.29" is exactly 29.
+    """
+    if amount_str is None:
+        return None
     try:
-        if amount_str is None:
-            return None
-        s = amount_str.strip()
-        if s == "":
-            return None
-        # Allow commas as thousand separators
-        s = s.replace(',', '')
-        # basic numeric check
-        if not re.match(r'^-?\d+(?:\.\d+)?$', s):
-            return None
-        val = float(s)
-        return val
-    except (ValueError, TypeError):
+        s = amount_str.strip().replace(',', '')
+    except AttributeError:
+        return None
+    negative = s.startswith('-')
+    if negative:
+        s = s[1:]
+    units, dot, frac = s.partition('.')
+    if not _is_digits(units) or (dot and not _is_digits(frac)):
         return None
+    cents = int(units) * CENTS_PER_UNIT + int((frac + '00')[:2])
+    if len(frac) > 2 and frac[2] >= '5':
+        cents += 1
+    return -cents if negative else cents
+
+
+def safe_parse_amount(amount_str):
+    """Try to parse amount string to float. Returns float or None on failure.
+
+    Like ``parse_amount_cents``, decimals past the second are rounded half
+    up to whole cents: "12.345" gives 12.35.
+    """
+    cents = parse_amount_cents(amount_str)
+    return None if cents is None else cents / CENTS_PER_UNIT
+
+
+def format_cents(cents):
+    """Format integer cents as a plain decimal string, e.g. 123405 -> "1234.05"."""
+    sign = '-' if cents < 0 else ''
+    units, frac = divmod(abs(cents), CENTS_PER_UNIT)
+    return f"{sign}{units}.{frac:02d}"
+
+
+def expense_cents(doc):
+    """Amount of an expense document in cents.
+
+    Reads ``amount_cents`` and falls back to the float ``amount`` of records
+    written before amounts were stored as integers. That float is converted
+    through its shortest repr and rounded half up, like typed amounts, so
+    0.285 gives 29 (``round(0.285 * 100)`` would give 28).
+    """
+    cents = doc.get('amount_cents')
+    try:
+        if cents is not None:
+            return int(cents)
+        amount = Decimal(str(doc.get('amount') or 0)) * CENTS_PER_UNIT
+        return int(amount.quantize(Decimal(1), rounding=ROUND_HALF_UP))
+    except (TypeError, ValueError, ArithmeticError):
+        return 0
 
 
 def validate_expense(amount_str, category):
@@ -30,7 +78,7 @@ def validate_expense(amount_str, category):
     if str(amount_str).strip() == '' or str(category).strip() == '':
         return False, 'fill_all_fields'
 
-    val = safe_parse_amount(amount_str)
+    val = parse_amount_cents(amount_str)
     if val is None:
         return False, 'invalid_amount'
     if val < 0: